@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Helpers shared by the benchmarks. Benchmarks run their steps in fresh
+interpreters, where service calls are answered by a stub transport, so no
+network access or credentials are needed.
+"""
+import functools as _ft
+import json as _json
+import os as _os
+import subprocess as _subprocess
+import sys as _sys
+
+# Canned response of GetCampaignsByAccountId without campaigns.
+RESPONSE = (
+    b'<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">'
+    b'<s:Header><h:TrackingId xmlns:h="https://bingads.microsoft.com/'
+    b'CampaignManagement/v11">stub</h:TrackingId></s:Header><s:Body>'
+    b'<GetCampaignsByAccountIdResponse xmlns="https://bingads.microsoft.com/'
+    b'CampaignManagement/v11"><Campaigns/></GetCampaignsByAccountIdResponse>'
+    b'</s:Body></s:Envelope>'
+)
+
+
+def install_stub_transport():
+    """Make all service clients load the Campaign Management WSDL shipped
+    with the SDK and answer every call with `RESPONSE`.
+    """
+    import suds.transport
+    from bingads import service_client
+
+    wsdl = _os.path.join(_os.path.dirname(service_client.__file__), 'v11',
+                         'proxies', 'campaign_management_service.xml')
+
+    class StubTransport(suds.transport.Transport):
+        """ Transport without network access. """
+
+        def open(self, request):
+            return open(wsdl, 'rb')
+
+        def send(self, request):
+            return suds.transport.Reply(200, {}, RESPONSE)
+
+    service_client.Client = _ft.partial(service_client.Client,
+                                        transport=StubTransport())
+
+
+def new_campaigns(**kwargs):
+    """ Create a `Campaigns` object for the sandbox. """
+    from py_bingads.services import Campaigns
+
+    return Campaigns(account_id=1, customer_id=1, developer_token='token',
+                     environment='sandbox', authentication_type='username',
+                     username='user', password='password', **kwargs)
+
+
+def run_child(code):
+    """Run code in a fresh interpreter, which prints a JSON document as the
+    last line of its output, and return the document.
+    """
+    here = _os.path.dirname(_os.path.abspath(__file__))
+    path = [_os.path.dirname(here), here] + \
+        _os.environ.get('PYTHONPATH', '').split(_os.pathsep)
+    env = dict(_os.environ, PYTHONPATH=_os.pathsep.join(path))
+    output = _subprocess.check_output([_sys.executable, '-c', code], env=env)
+    return _json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def print_medians(results, steps):
+    """ Print the median timings in seconds of steps over many runs. """
+    print('{step:<16}{median:>12}'.format(step='step', median='median ms'))
+    for step in steps:
+        timings = sorted(result[step] for result in results)
+        print('{step:<16}{median:>12.1f}'.format(
+            step=step, median=timings[len(timings) // 2] * 1000))
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""Measure the cold start of a short-lived process using py_bingads: the
+import of the services, the creation of the first `ServiceClient` and the
+first service call. Every run is a fresh interpreter, and calls are answered
+by a stub transport, so no network access or credentials are needed.
+
+Usage: python benchmarks/cold_start.py [runs]
+"""
+import sys as _sys
+
+import _common
+
+# Runs in a fresh interpreter and prints the timings of each step as JSON.
+CHILD = r'''
+import json, time
+
+start = time.time()
+import py_bingads.services
+timings = {'import': time.time() - start}
+
+start = time.time()
+from py_bingads.services import Campaigns
+timings['resolve'] = time.time() - start
+
+import _common
+start = time.time()
+_common.install_stub_transport()
+campaigns = _common.new_campaigns()
+campaigns.get_campaign_service()
+timings['service_client'] = time.time() - start
+
+start = time.time()
+campaigns.get_campaigns()
+timings['first_call'] = time.time() - start
+
+print(json.dumps(timings))
+'''
+
+STEPS = ('import', 'resolve', 'service_client', 'first_call')
+
+
+def main(runs=5):
+    """ Print the median timings of the steps over a number of runs. """
+    _common.print_medians([_common.run_child(CHILD) for _ in range(runs)],
+                          STEPS)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in _sys.argv[1:]])
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""Compare the latencies of reads with and without hedging. Calls are
+answered by a stub transport after 20 ms, or after 400 ms for a random 4%
+of them, so the tail dominates the total time. Hedged reads send a
+duplicate once a call is slower than the p95 of earlier calls.
+
+Usage: python benchmarks/hedged_reads.py [runs]
+"""
+from __future__ import print_function
+import os as _os
+import random as _random
+import sys as _sys
+import time as _time
+
+import _common
+
+FAST, SLOW, SLOW_FRACTION = 0.02, 0.4, 0.04
+
+# Number of reads per run.
+CALLS_PER_RUN = 100
+
+
+def new_transport_class():
+    """ Create the class of the stub transport with a slow tail. """
+    import suds.transport
+    from bingads import service_client
+
+    wsdl = _os.path.join(_os.path.dirname(service_client.__file__), 'v11',
+                         'proxies', 'campaign_management_service.xml')
+
+    class SlowTailTransport(suds.transport.Transport):
+        """ Transport without network access and with a slow tail. """
+
+        def open(self, request):
+            return open(wsdl, 'rb')
+
+        def send(self, request):
+            _time.sleep(SLOW if _random.random() < SLOW_FRACTION else FAST)
+            return suds.transport.Reply(200, {}, _common.RESPONSE)
+
+    return SlowTailTransport
+
+
+def measure(calls, hedging):
+    """ Time a number of reads and return the latency percentiles. """
+    campaigns = _common.new_campaigns(transport_factory=new_transport_class(),
+                                      hedging=hedging)
+    campaigns.get_campaigns()
+    latencies = []
+    for _ in range(calls):
+        start = _time.time()
+        campaigns.get_campaigns()
+        latencies.append(_time.time() - start)
+    latencies.sort()
+    return dict(
+        p50=latencies[len(latencies) // 2],
+        p99=latencies[int(len(latencies) * 0.99)],
+        total=sum(latencies),
+    )
+
+
+def main(runs=5):
+    """ Print the latencies of reads with and without hedging. """
+    from py_bingads import hedging
+
+    print('{mode:<10}{p50:>10}{p99:>10}{total:>10}{hedges:>10}'.format(
+        mode='mode', p50='p50 ms', p99='p99 ms', total='total s',
+        hedges='hedges'))
+    for mode in ('plain', 'hedged'):
+        _random.seed(0)
+        policy = None
+        if mode == 'hedged':
+            policy = hedging.Hedging(operations=('GetCampaignsByAccountId',),
+                                     min_samples=20)
+        result = measure(runs * CALLS_PER_RUN, policy)
+        print('{mode:<10}{p50:>10.1f}{p99:>10.1f}{total:>10.2f}{hedges:>10}'
+              .format(mode=mode, p50=result['p50'] * 1000,
+                      p99=result['p99'] * 1000, total=result['total'],
+                      hedges=policy.hedges if policy else 0))
+
+
+if __name__ == '__main__':
+    _sys.path.insert(0, _os.path.dirname(_os.path.dirname(
+        _os.path.abspath(__file__))))
+    main(*[int(arg) for arg in _sys.argv[1:]])
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Measure the latency of the first service call of a fresh process, which
+includes loading the WSDL of the service, without any schema cache, with
+the temporary cache the Bing Ads SDK uses by default, and with a schema
+cache warmed up by `py_bingads.schema_cache`. Calls are answered by a stub
+transport, so no network access or credentials are needed.
+
+Usage: python benchmarks/schema_cache.py [runs]
+"""
+import shutil as _shutil
+import sys as _sys
+import tempfile as _tempfile
+
+import _common
+
+# Runs in a fresh interpreter and prints the first call latency as JSON.
+CHILD = r'''
+import json, time
+
+import _common
+from bingads import service_client
+from suds import cache
+
+cache_dir = {cache_dir!r}
+if {step!r} == 'no_cache':
+    service_client.ObjectCache = lambda *args, **kwargs: cache.NoCache()
+_common.install_stub_transport()
+
+start = time.time()
+campaigns = _common.new_campaigns(schema_cache_dir=cache_dir)
+campaigns.get_campaigns()
+print(json.dumps({{{step!r}: time.time() - start}}))
+'''
+
+# Warms up the cache of the Campaign Management service.
+WARM_UP = r'''
+import _common
+from py_bingads import schema_cache
+
+_common.install_stub_transport()
+schema_cache.warm_up({cache_dir!r}, environment='sandbox',
+                     services=['CampaignManagementService'])
+print('{{}}')
+'''
+
+STEPS = ('no_cache', 'sdk_cache', 'schema_cache')
+
+
+def main(runs=5):
+    """ Print the median latencies of the first call over a number of runs. """
+    cache_dir = _tempfile.mkdtemp()
+    try:
+        _common.run_child(WARM_UP.format(cache_dir=cache_dir))
+        # Warm up the temporary cache of the SDK.
+        _common.run_child(CHILD.format(cache_dir=None, step='sdk_cache'))
+        results = []
+        for _ in range(runs):
+            result = _common.run_child(
+                CHILD.format(cache_dir=None, step='no_cache'))
+            result.update(_common.run_child(
+                CHILD.format(cache_dir=None, step='sdk_cache')))
+            result.update(_common.run_child(
+                CHILD.format(cache_dir=cache_dir, step='schema_cache')))
+            results.append(result)
+    finally:
+        _shutil.rmtree(cache_dir)
+    _common.print_medians(results, STEPS)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in _sys.argv[1:]])
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Compare building the envelopes of large batch requests through suds with
+rendering them directly by `py_bingads.soap`, for a
+`AddListItemsToSharedList` request of 5,000 negative keywords and a
+`SetSharedEntityAssociations` request of 10,000 associations. suds builds
+the envelopes without sending them, so no network access or credentials are
+needed. That both produce the same bytes is checked by `tests/test_soap.py`.
+
+Usage: python benchmarks/soap_serializer.py [runs]
+"""
+import os as _os
+import sys as _sys
+import time as _time
+
+import _common
+
+STEPS = ('suds_keywords', 'soap_keywords', 'suds_associations',
+         'soap_associations')
+
+
+def requests(models, service, keywords=3, associations=3):
+    """Yield operations with the arguments of suds and of the renderer."""
+    negative_keywords = [
+        models.NegativeKeyword(
+            id=index if index % 2 else None, match_type='exact',
+            text=u'caf\xe9 & <b> &amp; "{0}"'.format(index),
+        )
+        for index in range(keywords)
+    ]
+    shared_list = models.NegativeKeywordList(id=5, name="Brand's")
+    shared_entity_associations = [
+        models.SharedEntityAssociation(
+            entity_id=index, entity_type='Campaign', shared_entity_id=5,
+            shared_entity_type='NegativeKeywordList',
+        )
+        for index in range(associations)
+    ] + [models.SharedEntityAssociation(entity_id=1)]
+    ad_extension_associations = [
+        models.AdExtensionIdToEntityIdAssociation(
+            ad_extension_id=index, entity_id=index + 1,
+        )
+        for index in range(associations)
+    ]
+    ids = list(range(1, keywords + 1))
+    yield 'AddListItemsToSharedList', lambda: dict(
+        SharedList=shared_list.to_api_obj(service),
+        ListItems=models.ArrayOfNegativeKeyword(
+            negative_keywords=negative_keywords).to_api_obj(service),
+    ), dict(shared_list=shared_list, list_items=negative_keywords)
+    yield 'DeleteListItemsFromSharedList', lambda: dict(
+        SharedList=shared_list.to_api_obj(service),
+        ListItemIds=dict(long=ids),
+    ), dict(shared_list=shared_list, list_item_ids=ids)
+    for operation in ('SetSharedEntityAssociations',
+                      'DeleteSharedEntityAssociations'):
+        yield operation, lambda: dict(
+            Associations=models.ArrayOfSharedEntityAssociation(
+                shared_entity_associations=shared_entity_associations
+            ).to_api_obj(service),
+        ), dict(associations=shared_entity_associations)
+    yield 'SetAdExtensionsAssociations', lambda: dict(
+        AccountId=1,
+        AdExtensionIdToEntityIdAssociations=(
+            models.ArrayOfAdExtensionIdToEntityIdAssociation(
+                ad_extension_associations).to_api_obj(service)
+        ),
+        AssociationType='Campaign',
+    ), dict(account_id=1, associations=ad_extension_associations,
+            association_type='Campaign')
+    yield 'DeleteAdExtensions', lambda: dict(
+        AccountId=1,
+        AdExtensionIds=models.ArrayOflong(longs=ids).to_api_obj(),
+    ), dict(account_id=1, ad_extension_ids=ids)
+
+
+def main(runs=5):
+    """ Print the median times to build the envelopes over many runs. """
+    _common.install_stub_transport()
+    from py_bingads import models, soap
+
+    service = _common.new_campaigns().campaign_service
+    service.set_options(nosend=True)
+
+    def with_suds(operation, get_kwargs):
+        """ Build an envelope through suds objects. """
+        return getattr(service, operation)(**get_kwargs()).envelope
+
+    def with_soap(operation, kwargs):
+        """ Render an envelope directly. """
+        return soap.render(operation, service.soap_client.options.soapheaders,
+                           **kwargs)
+
+    large = {
+        operation: (suds_kwargs, soap_kwargs)
+        for operation, suds_kwargs, soap_kwargs in requests(
+            models, service, keywords=5000, associations=10000)
+    }
+    results = []
+    for _ in range(runs):
+        result = {}
+        for name, operation in (('keywords', 'AddListItemsToSharedList'),
+                                ('associations',
+                                 'SetSharedEntityAssociations')):
+            suds_kwargs, soap_kwargs = large[operation]
+            start = _time.time()
+            with_suds(operation, suds_kwargs)
+            result['suds_' + name] = _time.time() - start
+            start = _time.time()
+            with_soap(operation, soap_kwargs)
+            result['soap_' + name] = _time.time() - start
+        results.append(result)
+    _common.print_medians(results, STEPS)
+
+
+if __name__ == '__main__':
+    _sys.path.insert(0, _os.path.dirname(_os.path.dirname(
+        _os.path.abspath(__file__))))
+    main(*[int(arg) for arg in _sys.argv[1:]])
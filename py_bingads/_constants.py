@@ -16,12 +16,19 @@ PAUSED = 'Paused'
 ACTIVE = 'Active'
 CAMPAIGN_STATUSES = (ACTIVE, PAUSED)
 
+# Status of bulk rows of entities to delete.
+DELETED = 'Deleted'
+
 # Supported services
 CUSTOMER_MANAGEMENT_SERVICE = 'CustomerManagementService'
 CAMPAIGN_MANAGEMENT_SERVICE = 'CampaignManagementService'
+BULK_SERVICE = 'BulkService'
+REPORTING_SERVICE = 'ReportingService'
 SERVICES = dict(
     customer_service=CUSTOMER_MANAGEMENT_SERVICE,
     campaign_service=CAMPAIGN_MANAGEMENT_SERVICE,
+    bulk_service=BULK_SERVICE,
+    reporting_service=REPORTING_SERVICE,
 )
 
 # Association types
@@ -33,6 +40,64 @@ AD_GROUP = 'AdGroup'
 
 ASSOCIATION_TYPES = (ACCOUNT, CAMPAIGN, AD_GROUP)
 
+# Paging
+# https://msdn.microsoft.com/en-us/library/bing-ads-customer-management-
+# searchaccounts.aspx
+SEARCH_ACCOUNTS_PAGE_SIZE = 1000
+
+# Number of requests to send in parallel when prefetching pages or chunks.
+PREFETCH_REQUESTS = 4
+
+# Bulk
+# https://msdn.microsoft.com/en-us/library/bing-ads-bulk-
+# downloadcampaignsbyaccountids.aspx
+BULK_FORMAT_VERSION = '5.0'
+BULK_DOWNLOAD_ENTITIES = (
+    'Campaigns', 'AdGroups', 'Ads', 'Keywords', 'CampaignNegativeKeywords',
+    'AdGroupNegativeKeywords', 'Sitelink2AdExtensions',
+    'CampaignSitelink2AdExtensions',
+)
+BULK_COMPLETED = 'Completed'
+BULK_COMPLETED_WITH_ERRORS = 'CompletedWithErrors'
+BULK_FAILED = 'Failed'
+BULK_FAILED_FULL_SYNC_REQUIRED = 'FailedFullSyncRequired'
+BULK_FINISHED_STATUSES = (
+    BULK_COMPLETED, BULK_COMPLETED_WITH_ERRORS, BULK_FAILED,
+    BULK_FAILED_FULL_SYNC_REQUIRED, 'Expired', 'Aborted',
+)
+
+# Reports
+# https://msdn.microsoft.com/en-us/library/bing-ads-reporting-report-types.aspx
+CAMPAIGN_PERFORMANCE_REPORT = 'CampaignPerformanceReport'
+AD_GROUP_PERFORMANCE_REPORT = 'AdGroupPerformanceReport'
+SEARCH_QUERY_PERFORMANCE_REPORT = 'SearchQueryPerformanceReport'
+
+# Scope of each report type.
+REPORT_SCOPES = {
+    CAMPAIGN_PERFORMANCE_REPORT: 'AccountThroughCampaignReportScope',
+    AD_GROUP_PERFORMANCE_REPORT: 'AccountThroughAdGroupReportScope',
+    SEARCH_QUERY_PERFORMANCE_REPORT: 'AccountThroughAdGroupReportScope',
+}
+
+# Default columns of each report type.
+REPORT_COLUMNS = {
+    CAMPAIGN_PERFORMANCE_REPORT: (
+        'TimePeriod', 'AccountId', 'CampaignId', 'CampaignName',
+        'Impressions', 'Clicks', 'Spend', 'Conversions',
+    ),
+    AD_GROUP_PERFORMANCE_REPORT: (
+        'TimePeriod', 'AccountId', 'CampaignId', 'AdGroupId', 'AdGroupName',
+        'Impressions', 'Clicks', 'Spend', 'Conversions',
+    ),
+    SEARCH_QUERY_PERFORMANCE_REPORT: (
+        'TimePeriod', 'AccountId', 'CampaignId', 'AdGroupId', 'SearchQuery',
+        'Impressions', 'Clicks', 'Spend', 'Conversions',
+    ),
+}
+
+REPORT_SUCCESS = 'Success'
+REPORT_PENDING = 'Pending'
+
 # DEVICES
 DEVICE_PREFERENCE = 'DevicePreference'
 ALL_DEVICES = 'all'
@@ -1,14 +1,65 @@
 #!/usr/bin/env python
 """ Random util functions. """
+import contextlib as _contextlib
 import functools as _ft
+import hashlib as _hashlib
+import importlib as _importlib
 import itertools as _it
+import json as _json
 import logging as _logging
+import os as _os
+import shutil as _shutil
+import tempfile as _tempfile
+import threading as _threading
+import time as _time
 
-import suds as _suds
+import six as _six
+from six.moves import queue as _queue
+
+from py_bingads import deadline as _deadline
 
 logger = _logging.getLogger(__name__)
 
 
+class _LazyModule(object):
+    """ Stand-in for a module that is imported on first attribute access. """
+
+    def __init__(self, name):
+        """ Init. """
+        self._name = name
+        self._module = None
+
+    def __repr__(self):
+        return '<lazy module {name}>'.format(name=self._name)
+
+    def __getattr__(self, item):
+        # Probes of special attributes, e.g. by `hasattr` or doctest
+        # collection, must not import the module, which may be missing.
+        if item.startswith('__'):
+            raise AttributeError(item)
+        if self._module is None:
+            self._module = _importlib.import_module(self._name)
+        return getattr(self._module, item)
+
+
+def lazy_import(name):
+    """Import a module on first use instead of at import time, which keeps
+    heavy dependencies such as `bingads` and `suds` off the import time of
+    this package.
+
+    >>> json = lazy_import('json')
+    >>> json.dumps([1])
+    '[1]'
+    >>> hasattr(lazy_import('missing_module'), '__wrapped__')
+    False
+    """
+    return _LazyModule(name)
+
+
+_suds = lazy_import('suds')
+_urllib_request = lazy_import('six.moves.urllib.request')
+
+
 def set_elements_to_none(suds_object):
     """Bing Ads Campaign Management service operations require that if you
     specify a non-primitives, it must be one of the values defined by the
@@ -36,6 +87,16 @@ def get_refresh_token():
         return line if line else None
 
 
+def parse_int(value):
+    """Parse an integer from a bulk or report file cell, which is empty when
+    there is no value.
+
+    >>> parse_int('123'), parse_int(''), parse_int(None)
+    (123, None, None)
+    """
+    return int(value) if value else None
+
+
 def validate_membership(item, group, name=None):
     """Assert that item is member of group.
 
@@ -62,6 +123,21 @@ def save_refresh_token(oauth_tokens):
         file.write(oauth_tokens.refresh_token)
 
 
+def content_hash(*values):
+    """Return a stable hash of JSON-serializable values, e.g. the content
+    fields of a model.
+
+    >>> content_hash('Callout', 'Free shipping')
+    '1465271fe4b5c2c9b4e2bdcbdfed81572f952ee4'
+    >>> content_hash('a', None) == content_hash('a', None)
+    True
+    >>> content_hash('a', None) == content_hash('a', '')
+    False
+    """
+    serialized = _json.dumps(values, sort_keys=True, separators=(',', ':'))
+    return _hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+
+
 def chunked(iterable, chunk_size=32):
     """
     >>> list(chunked(range(9), 2))
@@ -80,6 +156,156 @@ def chunked(iterable, chunk_size=32):
         yield [entry[1] for entry in grouped_chunk]
 
 
+class _Task(object):
+    """ A function call run by a worker and its outcome. """
+
+    def __init__(self, func, args):
+        """ Init. """
+        self.func = func
+        self.args = args
+        self.done = _threading.Event()
+        self.result = None
+        self.error = None
+
+    def run(self):
+        """ Call the function and keep its result or exception. """
+        try:
+            self.result = self.func(*self.args)
+        except BaseException as exc:  # pylint: disable=broad-except
+            self.error = exc
+        finally:
+            self.done.set()
+
+    def get(self):
+        """ Wait for the call and return its result or raise its error. """
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class WorkerPool(object):
+    """Threads which run submitted calls and are kept for `idle_timeout`
+    seconds after their last one, so thread-local state, e.g. the service
+    clients of `BingAds` objects, is reused by later fan-outs instead of
+    being built again in new threads. A new thread is started whenever no
+    thread is idle, so calls which submit further calls never deadlock.
+
+    >>> WorkerPool().submit(sum, [1, 2]).get()
+    3
+    """
+
+    def __init__(self, idle_timeout=300):
+        """
+        :type idle_timeout: float
+        :param idle_timeout:
+          Number of seconds after which an idle thread exits.
+        """
+        self.idle_timeout = idle_timeout
+        self._tasks = _queue.Queue()
+        # Number of idle threads which no submitted task is reserved for.
+        self._idle = 0
+        self._lock = _threading.Lock()
+
+    def submit(self, func, *args):
+        """Run a function in a worker thread.
+
+        :rtype: _Task
+        :return:
+          Returned is the task, whose `get` waits for the result.
+        """
+        task = _Task(func, args)
+        with self._lock:
+            if self._idle:
+                self._idle -= 1
+            else:
+                thread = _threading.Thread(target=self._work)
+                thread.daemon = True
+                thread.start()
+        self._tasks.put(task)
+        return task
+
+    def _work(self):
+        """ Run tasks until idle for `idle_timeout` seconds. """
+        while True:
+            try:
+                task = self._tasks.get(timeout=self.idle_timeout)
+            except _queue.Empty:
+                with self._lock:
+                    # Stay if all idle threads are reserved for tasks.
+                    if self._idle:
+                        self._idle -= 1
+                        return
+                continue
+            task.run()
+            with self._lock:
+                self._idle += 1
+
+
+# Worker threads shared by all fan-outs of the process.
+WORKERS = WorkerPool()
+
+
+def thread_map(func, iterable, workers=4, timeout=None):
+    """Apply `func` to every item of `iterable` in at most `workers` threads
+    of `WORKERS` and return the results in order. Runs inline when there's
+    nothing to parallelize. Items are processed in the deadline scope of the
+    caller, each in a scope of its own if a `timeout` is given.
+
+    >>> thread_map(lambda x: x * 2, range(5))
+    [0, 2, 4, 6, 8]
+
+    >>> thread_map(lambda x: x * 2, [1], workers=8)
+    [2]
+
+    :type timeout: float | None
+    :param timeout:
+      Number of seconds each item may take, see `py_bingads.deadline`.
+    """
+    items = list(iterable)
+    if timeout is not None:
+        func = _ft.partial(_call_in_scope, func, timeout)
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    results = [None] * len(items)
+    indexes = iter(range(len(items)))
+    lock = _threading.Lock()
+
+    def work():
+        """ Process items until there are none left or one failed. """
+        while True:
+            with lock:
+                index = next(indexes, None)
+            if index is None:
+                return
+            try:
+                results[index] = func(items[index])
+            except BaseException:
+                with lock:
+                    # Leave the remaining items unprocessed.
+                    for _ in indexes:
+                        pass
+                raise
+
+    tasks = [WORKERS.submit(_deadline.bind(work))
+             for _ in range(min(workers, len(items)))]
+    errors = []
+    for task in tasks:
+        task.done.wait()
+        if task.error is not None:
+            errors.append(task.error)
+    if errors:
+        raise errors[0]
+    return results
+
+
+def _call_in_scope(func, timeout, item):
+    """ Apply a function to an item in a new deadline scope. """
+    with _deadline.scope(timeout):
+        return func(item)
+
+
 def print_webfault(func):
     """ Catches WebFaults, logs internal message, and re-raises. """
     @_ft.wraps(func)
@@ -100,6 +326,79 @@ def print_webfault(func):
     return wrapper
 
 
+@_contextlib.contextmanager
+def atomic_write(path, mode='w'):
+    """Open a temporary file for writing, which replaces the file at `path`
+    only once it is completely written, so readers never see partial files.
+
+    :type path: str
+    :param path:
+      Path of the file to replace.
+
+    :type mode: str
+    :param mode:
+      Mode to open the temporary file with, e.g. `wb` for binary data.
+    """
+    tmp_path = '{path}.{pid}.{thread}.tmp'.format(
+        path=path, pid=_os.getpid(), thread=_threading.current_thread().ident
+    )
+    try:
+        with open(tmp_path, mode) as file:
+            yield file
+        getattr(_os, 'replace', _os.rename)(tmp_path, path)
+    finally:
+        if _os.path.exists(tmp_path):
+            _os.remove(tmp_path)
+
+
+def urlopen(request, timeout=None):
+    """Open a URL unless the current deadline scope expired or was
+    cancelled, with a socket timeout of at most the time left in the scope.
+
+    :type request: str | urllib.request.Request
+    :param request:
+      URL or request to open.
+
+    :type timeout: float | None
+    :param timeout:
+      Socket timeout in seconds, the global default if None.
+    """
+    _deadline.check()
+    timeout = _deadline.limit(timeout)
+    if timeout is None:
+        return _urllib_request.urlopen(request)
+    return _urllib_request.urlopen(request, timeout=timeout)
+
+
+def download_file(url, path=None, timeout=None):
+    """Download a file in chunks, so it is never held in memory as a whole.
+    Local `file://` URLs can be used in place of result files.
+
+    :type url: str
+    :param url:
+      URL of the file.
+
+    :type path: str | None
+    :param path:
+      Path to save the file to, defaults to a new temporary file.
+
+    :type timeout: float | None
+    :param timeout:
+      Socket timeout in seconds, see `urlopen`.
+
+    :rtype: str
+    :return:
+      Returned is the path of the downloaded file.
+    """
+    if path is None:
+        file_descriptor, path = _tempfile.mkstemp(suffix='.zip')
+        _os.close(file_descriptor)
+    with _contextlib.closing(urlopen(url, timeout=timeout)) as response:
+        with open(path, 'wb') as file:
+            _shutil.copyfileobj(response, file)
+    return path
+
+
 def merge(left, right, default=None):
     """Merge two iterators of tuples each which contains the merge key and
     the actual value.
@@ -121,3 +420,194 @@ def merge(left, right, default=None):
         right_val = right.get(key) or default
         yield (key, (left_val, right_val))
 
+
+class TTLCache(object):
+    """A thread-safe mapping of string keys to JSON-serializable values which
+    expire after `ttl` seconds. If `path` is given, entries are also persisted
+    to that JSON file so that other processes can reuse them.
+
+    >>> cache = TTLCache(ttl=60)
+    >>> cache.get('a') is None
+    True
+    >>> cache.set('a', True)
+    >>> cache.get('a')
+    True
+    >>> cache = TTLCache(ttl=-1)
+    >>> cache.set('a', True)
+    >>> cache.get('a', default=False)
+    False
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'cache.json')
+    >>> reader, writer = TTLCache(60, path), TTLCache(60, path)
+    >>> writer.set('a', True)
+    >>> reader.get('a')
+    True
+    """
+
+    def __init__(self, ttl, path=None):
+        """
+        :type ttl: int
+        :param ttl:
+          Number of seconds after which an entry expires.
+
+        :type path: str | None
+        :param path:
+          Optional path of a JSON file in which to persist entries.
+        """
+        self.ttl = ttl
+        self.path = path
+        self._entries = {}
+        self._lock = _threading.Lock()
+        if path:
+            self._load()
+
+    def __getstate__(self):
+        return {
+            name: value for name, value in self.__dict__.items()
+            if name != '_lock'
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = _threading.Lock()
+
+    def get(self, key, default=None):
+        """Get the value of a key if present and not expired. On a miss,
+        entries written to the file by other processes are loaded first.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if self.path and (
+                    entry is None or _time.time() - entry[0] > self.ttl):
+                self._load()
+                entry = self._entries.get(key)
+        if entry is None or _time.time() - entry[0] > self.ttl:
+            return default
+        return entry[1]
+
+    def set(self, key, value):
+        """ Set the value of a key. """
+        self.update([(key, value)])
+
+    def update(self, items):
+        """Set the values of several keys at once.
+
+        :type items: iter
+        :param items:
+          Iterable of key and value tuples.
+        """
+        now = _time.time()
+        with self._lock:
+            if self.path:
+                self._load()
+            for key, value in items:
+                self._entries[key] = (now, value)
+            if self.path:
+                self._save()
+
+    def _load(self):
+        """ Merge entries from disk, keeping the most recent of each key. """
+        try:
+            with open(self.path) as file:
+                entries = _json.load(file)
+        except (IOError, OSError, ValueError):
+            return
+        for key, (timestamp, value) in entries.items():
+            if key not in self._entries or \
+                    self._entries[key][0] < timestamp:
+                self._entries[key] = (timestamp, value)
+
+    def _save(self):
+        """ Atomically write entries to disk. """
+        with atomic_write(self.path) as file:
+            _json.dump(self._entries, file)
+
+
+class _Flight(object):
+    """ A call in flight and its outcome. """
+
+    def __init__(self):
+        """ Init. """
+        self.result = None
+        self.error = None
+        # Events of the threads waiting for the call.
+        self.waiters = []
+
+
+def copy_error(error):
+    """Copy an exception without calling its `__init__`, so an error can be
+    raised in several threads, each with a traceback of its own.
+
+    >>> error = KeyError('id')
+    >>> copied = copy_error(error)
+    >>> copied is not error, copied.args
+    (True, ('id',))
+    """
+    copied = error.__class__.__new__(error.__class__, *error.args)
+    copied.__dict__.update(error.__dict__)
+    copied.args = error.args
+    return copied
+
+
+class SingleFlight(object):
+    """Deduplicate concurrent calls: while a call of a key is in flight,
+    further calls with the same key wait for it and share its result or
+    exception instead of calling again. Nothing is cached once the call
+    returns. Results are shared, so they must not be modified. Waiting
+    calls raise as soon as their deadline scope expires or is cancelled.
+
+    >>> flights = SingleFlight()
+    >>> flights.do(('GetCampaignsByAccountId', 1), lambda: 'response')
+    'response'
+    >>> flights.in_flight
+    0
+    """
+
+    def __init__(self):
+        """ Init. """
+        self._flights = {}
+        self._lock = _threading.Lock()
+
+    @property
+    def in_flight(self):
+        """ Number of keys with a call in flight. """
+        with self._lock:
+            return len(self._flights)
+
+    def do(self, key, func, *args, **kwargs):
+        """Call `func` unless a call of `key` is already in flight, in which
+        case wait for that call instead.
+
+        :param key:
+          Hashable key of the call, e.g. the operation and its arguments.
+
+        :param func:
+          Function to call with `args` and `kwargs`.
+
+        :return:
+          Returned is the result of the call.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                event = _threading.Event()
+                flight.waiters.append(event)
+        if not leader:
+            _deadline.wait(event)
+            if flight.error is not None:
+                _six.raise_from(copy_error(flight.error), flight.error)
+            return flight.result
+        try:
+            flight.result = func(*args, **kwargs)
+            return flight.result
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            for event in flight.waiters:
+                event.set()
@@ -0,0 +1,455 @@
+#!/usr/bin/env python
+""" OAuth token stores shared by threads, instances and processes. """
+import contextlib as _contextlib
+import itertools as _itertools
+import json as _json
+import logging as _logging
+import os as _os
+import threading as _threading
+import time as _time
+import weakref as _weakref
+
+from py_bingads import _utils
+
+try:
+    import fcntl as _fcntl
+except ImportError:  # Windows, where only threads are synchronized.
+    _fcntl = None
+
+# Number of seconds before its expiry at which an access token is renewed.
+EXPIRY_MARGIN = 300
+
+# Valid tokens of the process keyed on token key, reused by all instances.
+_TOKENS = {}
+_REFRESH_LOCKS = {}
+_REFRESH_LOCKS_LOCK = _threading.Lock()
+
+
+def token_key(customer_id, client_id):
+    """Build the key under which the tokens of a customer are stored.
+
+    >>> token_key(123, 'abc')
+    '123:abc'
+    """
+    return '{customer_id}:{client_id}'.format(customer_id=customer_id,
+                                              client_id=client_id)
+
+
+def is_valid(tokens, margin=EXPIRY_MARGIN):
+    """Return whether tokens hold an access token that doesn't expire within
+    `margin` seconds.
+
+    >>> is_valid({'access_token': 'a', 'expires_at': _time.time() + 3600})
+    True
+    >>> is_valid({'access_token': 'a', 'expires_at': _time.time() + 60})
+    False
+    >>> is_valid(None)
+    False
+    """
+    return bool(
+        tokens and tokens.get('access_token') and
+        tokens.get('expires_at', 0) - margin > _time.time()
+    )
+
+
+def tokens_from_oauth(oauth_tokens):
+    """ Convert Bing Ads OAuthTokens into a JSON-serializable dict. """
+    return {
+        'access_token': oauth_tokens.access_token,
+        'refresh_token': oauth_tokens.refresh_token,
+        'expires_at': _time.time() + (
+            oauth_tokens.access_token_expires_in_seconds or 0
+        ),
+    }
+
+
+class ConsentRequired(RuntimeError):
+    """Raised instead of prompting for user consent when connecting
+    non-interactively, e.g. in worker processes.
+    """
+
+
+class TokenStore(object):
+    """Base class of token stores, which map token keys to dicts of access
+    token, refresh token and expiry time. `lock` must be reentrant. Stores
+    can be pickled, e.g. to be passed to worker processes, without their
+    locks.
+    """
+
+    def __init__(self):
+        """ Init. """
+        self._lock = _threading.RLock()
+
+    def __getstate__(self):
+        return {
+            name: value for name, value in self.__dict__.items()
+            if not name.startswith('_lock')
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = _threading.RLock()
+
+    @_contextlib.contextmanager
+    def lock(self):
+        """ Lock the store against concurrent refreshes. """
+        with self._lock:
+            yield
+
+    def get(self, key):
+        """ Get the tokens of a key, or None. """
+        raise NotImplementedError
+
+    def set(self, key, tokens):
+        """ Set the tokens of a key. """
+        raise NotImplementedError
+
+
+class MemoryTokenStore(TokenStore):
+    """Store tokens in memory, shared by the threads of a process.
+
+    >>> store = MemoryTokenStore()
+    >>> store.set('1:a', {'refresh_token': 'r'})
+    >>> store.get('1:a')
+    {'refresh_token': 'r'}
+    """
+
+    def __init__(self):
+        """ Init. """
+        TokenStore.__init__(self)
+        self._tokens = {}
+
+    def get(self, key):
+        """ Get the tokens of a key, or None. """
+        with self.lock():
+            return self._tokens.get(key)
+
+    def set(self, key, tokens):
+        """ Set the tokens of a key. """
+        with self.lock():
+            self._tokens[key] = tokens
+
+
+class FileTokenStore(TokenStore):
+    """Store tokens of all keys in a JSON file, shared by processes. Writes
+    are atomic and, where `fcntl` is available, refreshes are serialized
+    across processes with a lock file.
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'tokens.json')
+    >>> FileTokenStore(path).set('1:a', {'refresh_token': 'r'})
+    >>> FileTokenStore(path).get('1:a')
+    {'refresh_token': 'r'}
+    >>> FileTokenStore(path).get('2:a') is None
+    True
+    """
+
+    def __init__(self, path):
+        """
+        :type path: str
+        :param path:
+          Path of the JSON file, which is only readable by its owner.
+        """
+        TokenStore.__init__(self)
+        self.path = path
+        self._depth = 0
+        self._lock_file = None
+
+    def __setstate__(self, state):
+        TokenStore.__setstate__(self, state)
+        self._depth = 0
+        self._lock_file = None
+
+    @_contextlib.contextmanager
+    def lock(self):
+        """ Lock the store against concurrent refreshes of all processes. """
+        with self._lock:
+            self._depth += 1
+            try:
+                if self._depth == 1 and _fcntl is not None:
+                    self._lock_file = open(self.path + '.lock', 'a')
+                    _fcntl.flock(self._lock_file.fileno(), _fcntl.LOCK_EX)
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0 and self._lock_file is not None:
+                    _fcntl.flock(self._lock_file.fileno(), _fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def _read(self):
+        """ Read the tokens of all keys. """
+        try:
+            with open(self.path) as file:
+                return _json.load(file)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def get(self, key):
+        """ Get the tokens of a key, or None. """
+        return self._read().get(key)
+
+    def set(self, key, tokens):
+        """ Set the tokens of a key. """
+        with self.lock():
+            all_tokens = self._read()
+            all_tokens[key] = tokens
+            with _utils.atomic_write(self.path) as file:
+                _os.chmod(file.name, 0o600)
+                _json.dump(all_tokens, file)
+
+
+def _refresh_lock(key):
+    """ Get the lock that serializes refreshes of a key in the process. """
+    with _REFRESH_LOCKS_LOCK:
+        return _REFRESH_LOCKS.setdefault(key, _threading.Lock())
+
+
+def _forget(key):
+    """Drop the tokens and the refresh lock of a key from the process. A lock
+    held by a refresh is kept.
+    """
+    _TOKENS.pop(key, None)
+    with _REFRESH_LOCKS_LOCK:
+        lock = _REFRESH_LOCKS.get(key)
+        if lock is not None and lock.acquire(False):
+            del _REFRESH_LOCKS[key]
+            lock.release()
+
+
+def get_tokens(store, key, refresh):
+    """Get valid tokens of a key. Tokens are reused from the process, then
+    from the store, and only refreshed if both are expired. A single thread
+    of the process refreshes at a time while the others wait for its result.
+
+    >>> calls = []
+    >>> def refresh(refresh_token):
+    ...     calls.append(refresh_token)
+    ...     return {'access_token': 'a', 'refresh_token': 'r2',
+    ...             'expires_at': _time.time() + 3600}
+    >>> store = MemoryTokenStore()
+    >>> store.set('doctest:a', {'refresh_token': 'r1'})
+    >>> get_tokens(store, 'doctest:a', refresh)['access_token']
+    'a'
+    >>> get_tokens(store, 'doctest:a', refresh)['refresh_token']
+    'r2'
+    >>> calls
+    ['r1']
+
+    :type store: TokenStore
+    :param store:
+      Store of tokens.
+
+    :type key: str
+    :param key:
+      Key of the tokens, see `token_key`.
+
+    :type refresh: callable
+    :param refresh:
+      Function taking the stored refresh token, or None, and returning new
+      tokens.
+
+    :rtype: dict
+    :return:
+      Returned are the valid tokens.
+    """
+    tokens = _TOKENS.get(key)
+    if is_valid(tokens):
+        return tokens
+
+    with _refresh_lock(key):
+        tokens = _TOKENS.get(key)
+        if is_valid(tokens):
+            return tokens
+        with store.lock():
+            tokens = store.get(key)
+            if not is_valid(tokens):
+                tokens = refresh(tokens.get('refresh_token') if tokens
+                                 else None)
+                store.set(key, tokens)
+        _TOKENS[key] = tokens
+        return tokens
+
+
+def save_tokens(store, key, oauth_tokens):
+    """Save Bing Ads OAuthTokens refreshed by the Bing Ads SDK to the store
+    and the process. Meant as `token_refreshed_callback`.
+    """
+    tokens = tokens_from_oauth(oauth_tokens)
+    store.set(key, tokens)
+    _TOKENS[key] = tokens
+
+
+def set_oauth_tokens(authentication, oauth_tokens):
+    """ Set the Bing Ads OAuthTokens of an authentication. """
+    # The SDK has no public setter for tokens obtained elsewhere.
+    # pylint: disable=protected-access
+    authentication._oauth_tokens = oauth_tokens
+
+
+class TokenRefresher(object):
+    """Renew access tokens of registered authentications in a daemon thread
+    shortly before they expire, so no service call has to wait for a token
+    refresh. Authentications sharing a token key are refreshed once and all
+    get the new tokens. Authentications are held weakly, and the tokens of
+    keys without authentications left are dropped from the process.
+    """
+
+    def __init__(self, refresh_ahead=2 * EXPIRY_MARGIN, interval=60):
+        """
+        :type refresh_ahead: int
+        :param refresh_ahead:
+          Number of seconds before expiry at which to renew access tokens.
+          Should be larger than `EXPIRY_MARGIN` plus `interval`.
+
+        :type interval: int
+        :param interval:
+          Number of seconds between checks of all access tokens.
+        """
+        self.refresh_ahead = refresh_ahead
+        self.interval = interval
+        self._entries = {}
+        self._own_keys = _weakref.WeakKeyDictionary()
+        self._key_numbers = _itertools.count(1)
+        self._lock = _threading.Lock()
+        self._stopped = _threading.Event()
+        self._thread = None
+
+    def register(self, authentication, key=None, store=None):
+        """Register an OAuth authentication with tokens to keep fresh.
+
+        :param authentication:
+          Bing Ads OAuth authentication with tokens.
+
+        :type key: str | None
+        :param key:
+          Token key of the authentication, see `token_key`. Defaults to a key
+          of its own.
+
+        :type store: TokenStore | None
+        :param store:
+          Optional store of the tokens, from which tokens renewed by other
+          processes are adopted.
+        """
+        with self._lock:
+            self._prune()
+            if key is None:
+                key = self._own_keys.get(authentication)
+            if key is None:
+                key = self._own_keys[authentication] = \
+                    'authentication:{number}'.format(
+                        number=next(self._key_numbers))
+            entry = self._entries.setdefault(key, {
+                'store': store,
+                'authentications': _weakref.WeakSet(),
+            })
+            entry['authentications'].add(authentication)
+            if key not in _TOKENS and authentication.oauth_tokens:
+                _TOKENS[key] = tokens_from_oauth(authentication.oauth_tokens)
+
+    def refresh_due(self):
+        """Renew all access tokens that expire within `refresh_ahead`
+        seconds.
+
+        :rtype: int
+        :return:
+          Returned is the number of renewed token keys.
+        """
+        with self._lock:
+            self._prune()
+            entries = list(self._entries.items())
+
+        refreshed = 0
+        for key, entry in entries:
+            authentications = list(entry['authentications'])
+            if not authentications:
+                continue
+            with _refresh_lock(key):
+                tokens = _TOKENS.get(key)
+                if tokens is None or is_valid(tokens, self.refresh_ahead):
+                    continue
+                try:
+                    oauth_tokens = self._refresh(key, entry['store'],
+                                                 authentications[0])
+                except Exception:  # pylint: disable=broad-except
+                    _logging.exception('Failed to refresh tokens of %s.', key)
+                    continue
+                _TOKENS[key] = tokens_from_oauth(oauth_tokens)
+            for authentication in authentications:
+                set_oauth_tokens(authentication, oauth_tokens)
+            refreshed += 1
+        return refreshed
+
+    def _prune(self):
+        """ Drop keys whose authentications are all gone. Needs `_lock`. """
+        for key in [key for key, entry in self._entries.items()
+                    if not entry['authentications']]:
+            del self._entries[key]
+            _forget(key)
+
+    def _refresh(self, key, store, authentication):
+        """Adopt tokens renewed by another process from the store, or renew
+        them with the authentication, whose callback saves them.
+        """
+        refresh_token = authentication.oauth_tokens.refresh_token
+        if store is not None:
+            stored = store.get(key)
+            if is_valid(stored, self.refresh_ahead):
+                return type(authentication.oauth_tokens)(
+                    access_token=stored['access_token'],
+                    access_token_expires_in_seconds=int(
+                        stored['expires_at'] - _time.time()
+                    ),
+                    refresh_token=stored['refresh_token'],
+                )
+            if stored:
+                refresh_token = stored['refresh_token']
+        authentication.request_oauth_tokens_by_refresh_token(refresh_token)
+        return authentication.oauth_tokens
+
+    def _run(self):
+        """ Check access tokens every `interval` seconds until stopped. """
+        while not self._stopped.wait(self.interval):
+            self.refresh_due()
+
+    def start(self):
+        """ Start the daemon thread, unless it is running already. """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = _threading.Thread(target=self._run,
+                                             name='TokenRefresher')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """ Stop the daemon thread. """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+# Refresher of all OAuth authentications of the process.
+REFRESHER = TokenRefresher()
+
+
+def start_background_refresh(refresh_ahead=None, interval=None):
+    """Start renewing the access tokens of all `BingAds` instances of the
+    process in the background. The first instance connecting with OAuth
+    starts it with the defaults, so this is only needed to change them.
+
+    :type refresh_ahead: int | None
+    :param refresh_ahead:
+      Optional number of seconds before expiry at which to renew tokens.
+
+    :type interval: int | None
+    :param interval:
+      Optional number of seconds between checks.
+    """
+    if refresh_ahead is not None:
+        REFRESHER.refresh_ahead = refresh_ahead
+    if interval is not None:
+        REFRESHER.interval = interval
+    REFRESHER.start()
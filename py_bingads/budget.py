@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+"""Dry runs and call budgets. Both are interceptors of the calls of a
+`BingAds` object, see `py_bingads.services.proxy`.
+
+In a dry run, reads are sent as usual, so jobs compute the same plan, but
+mutating calls are only recorded in a `Plan` with their number of items,
+and answered with an empty `DryRunResponse`::
+
+    callouts = Callouts(dry_run=True, ...)
+    callouts.update_callouts(...)
+    print(callouts.plan.report())
+
+A `CallBudget` counts the calls per account and operation, and stops a job
+with `BudgetExceeded`, or slows it down, before it exceeds a quota.
+"""
+import collections as _collections
+import numbers as _numbers
+import threading as _threading
+import time as _time
+
+import six as _six
+
+from py_bingads import _utils
+from py_bingads import deadline as _deadline
+
+_sudsobject = _utils.lazy_import('suds.sudsobject')
+
+# Prefixes of the names of operations which change entities.
+MUTATING_PREFIXES = (
+    'Add', 'Append', 'Apply', 'Delete', 'Pause', 'Resume', 'Set', 'Update',
+)
+
+# Operations which change entities despite their names.
+MUTATING_OPERATIONS = frozenset(('GetBulkUploadUrl',))
+
+
+def is_mutating(operation):
+    """Return whether an operation changes entities.
+
+    >>> is_mutating('AddCampaigns'), is_mutating('GetCampaignsByIds')
+    (True, False)
+    """
+    return operation.startswith(MUTATING_PREFIXES) or \
+        operation in MUTATING_OPERATIONS
+
+
+def count_items(value):
+    """Count the items of the arrays in the arguments of a call, e.g. of an
+    `ArrayOfCampaign`.
+
+    >>> count_items({'AccountId': 1, 'CampaignIds': {'long': [1, 2, 3]}})
+    3
+    >>> count_items('Campaign')
+    0
+    """
+    if value is None or isinstance(
+            value, (_six.string_types, bytes, _numbers.Number)):
+        return 0
+    if isinstance(value, (list, tuple)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(count_items(item) for item in value.values())
+    if isinstance(value, _sudsobject.Object):
+        return sum(count_items(item) for _, item in value)
+    try:
+        return len(value)
+    except TypeError:
+        return 0
+
+
+class BudgetExceeded(RuntimeError):
+    """ Raised when a call would exceed a call budget. """
+
+
+class DryRunResponse(object):
+    """Empty response of a mutating call in a dry run. Any attribute is an
+    empty response too, so callers reading e.g. `response.CampaignIds.long`
+    get no IDs.
+
+    >>> response = DryRunResponse()
+    >>> bool(response.CampaignIds), list(response.CampaignIds.long)
+    (False, [])
+    """
+
+    def __getattr__(self, item):
+        if item.startswith('__'):
+            raise AttributeError(item)
+        return self
+
+    def __bool__(self):
+        return False
+
+    __nonzero__ = __bool__
+
+    def __len__(self):
+        return 0
+
+    def __iter__(self):
+        return iter(())
+
+
+PlannedCall = _collections.namedtuple(
+    'PlannedCall', ('account_id', 'service_name', 'operation', 'items')
+)
+
+
+class Plan(object):
+    """The mutating calls of a dry run in the order they would be sent.
+
+    >>> plan = Plan()
+    >>> plan.add(1, 'CampaignManagementService', 'AddCampaigns', 2)
+    >>> plan.add(1, 'CampaignManagementService', 'AddCampaigns', 1)
+    >>> print(plan.report())
+    account 1: CampaignManagementService.AddCampaigns 2 calls, 3 items
+    >>> plan.placeholder_ids(2), plan.placeholder_ids(1)
+    ([-1, -2], [-3])
+    """
+
+    def __init__(self):
+        """ Init. """
+        self.calls = []
+        self._lock = _threading.Lock()
+        self._last_placeholder_id = 0
+
+    def __len__(self):
+        return len(self.calls)
+
+    def __iter__(self):
+        return iter(list(self.calls))
+
+    def add(self, account_id, service_name, operation, items=0):
+        """ Add a call that would be sent. """
+        with self._lock:
+            self.calls.append(
+                PlannedCall(account_id, service_name, operation, items))
+
+    def placeholder_ids(self, count):
+        """Get distinct placeholder IDs of entities which would be added, so
+        they can be associated like entities added for real. Placeholders
+        are negative, so they never equal the ID of an existing entity.
+
+        :type count: int
+        :param count:
+          Number of IDs.
+
+        :rtype: [int]
+        :return:
+          Returned is a list of IDs not returned before.
+        """
+        with self._lock:
+            first = self._last_placeholder_id - 1
+            self._last_placeholder_id -= count
+        return list(range(first, first - count, -1))
+
+    def summary(self):
+        """Sum the calls and items per account and operation.
+
+        :rtype: collections.OrderedDict
+        :return:
+          Returned are lists of the number of calls and items keyed on
+          account ID, service name and operation, in order of first use.
+        """
+        summary = _collections.OrderedDict()
+        for call in self:
+            counts = summary.setdefault(call[:3], [0, 0])
+            counts[0] += 1
+            counts[1] += call.items
+        return summary
+
+    def report(self):
+        """ Describe the calls and items per account and operation. """
+        return '\n'.join(
+            'account {0}: {1}.{2} {3} calls, {4} items'.format(
+                account_id, service_name, operation, calls, items)
+            for (account_id, service_name, operation), (calls, items)
+            in self.summary().items()
+        )
+
+
+class DryRun(object):
+    """ Interceptor recording mutating calls in a plan instead of sending. """
+
+    def __init__(self, plan):
+        """
+        :type plan: Plan
+        :param plan:
+          Plan in which to record the calls.
+        """
+        self.plan = plan
+
+    def __call__(self, call, proceed):
+        if not is_mutating(call.operation):
+            return proceed()
+        items = sum(count_items(value) for value in
+                    list(call.args) + list(call.kwargs.values()))
+        self.plan.add(call.account_id, call.service_name, call.operation,
+                      items)
+        return DryRunResponse()
+
+
+class CallBudget(object):
+    """Interceptor counting the calls per account and operation. Once a call
+    would exceed the `limit` of its account or the limit of its operation in
+    `operation_limits`, it is stopped with `BudgetExceeded`, or, if `wait`,
+    delayed until it fits into the window again. A budget can be shared by
+    several `BingAds` objects.
+
+    >>> budget = CallBudget(limit=1)
+    >>> budget.charge(1, 'GetCampaignsByAccountId')
+    >>> budget.remaining(1)
+    0
+    >>> budget.charge(1, 'GetCampaignsByAccountId')
+    Traceback (most recent call last):
+    ...
+    BudgetExceeded: ...
+    """
+
+    def __init__(self, limit=None, operation_limits=None, window=None,
+                 wait=False):
+        """
+        :type limit: int | None
+        :param limit:
+          Maximum number of calls per account, unlimited if None.
+
+        :type operation_limits: dict | None
+        :param operation_limits:
+          Maximum numbers of calls per account keyed on operation.
+
+        :type window: float | None
+        :param window:
+          Number of seconds a call counts against the limits, e.g. the
+          period of a quota, forever if None.
+
+        :type wait: bool
+        :param wait:
+          Whether to wait for calls to leave the window instead of raising
+          `BudgetExceeded`, which requires a `window`.
+        """
+        assert window is not None or not wait, (
+            'Waiting for budget requires a `window`.'
+        )
+        self.limit = limit
+        self.operation_limits = operation_limits or {}
+        self.window = window
+        self.wait = wait
+        self._calls = _collections.defaultdict(_collections.deque)
+        self._lock = _threading.Lock()
+
+    def __call__(self, call, proceed):
+        self.charge(call.account_id, call.operation)
+        return proceed()
+
+    def _expire(self, now):
+        """ Drop calls that left the window. """
+        if self.window is None:
+            return
+        for times in self._calls.values():
+            while times and now - times[0] >= self.window:
+                times.popleft()
+
+    def _count(self, account_id, operation=None):
+        """ Count the calls in the window of an account or operation. """
+        return sum(
+            len(times) for (call_account_id, call_operation), times
+            in self._calls.items()
+            if call_account_id == account_id and
+            operation in (None, call_operation)
+        )
+
+    def usage(self, account_id, operation=None):
+        """ Count the calls in the window of an account or operation. """
+        with self._lock:
+            self._expire(_time.time())
+            return self._count(account_id, operation)
+
+    def remaining(self, account_id, operation=None):
+        """Get the number of calls left for an account or operation.
+
+        :rtype: int | None
+        :return:
+          Returned is the number of calls, or None if unlimited.
+        """
+        limits = []
+        with self._lock:
+            self._expire(_time.time())
+            if self.limit is not None:
+                limits.append(self.limit - self._count(account_id))
+            if operation in self.operation_limits:
+                limits.append(self.operation_limits[operation] -
+                              self._count(account_id, operation))
+        return min(limits) if limits else None
+
+    def charge(self, account_id, operation):
+        """Count a call, waiting for the budget or raising `BudgetExceeded`
+        if it would exceed a limit. Waits end with the current deadline
+        scope.
+        """
+        while True:
+            with self._lock:
+                now = _time.time()
+                self._expire(now)
+                exceeded = self._exceeded(account_id, operation)
+                if exceeded is None:
+                    self._calls[account_id, operation].append(now)
+                    return
+                if not self.wait:
+                    raise BudgetExceeded(
+                        'Call of {operation} would exceed the budget of '
+                        '{limit} calls of account {account_id}.'.format(
+                            operation=operation, limit=exceeded[1],
+                            account_id=account_id)
+                    )
+                delay = exceeded[0] + self.window - now
+            _deadline.sleep(max(delay, 0.01))
+
+    def _exceeded(self, account_id, operation):
+        """Find the first exceeded limit of a call.
+
+        :rtype: (float, int) | None
+        :return:
+          Returned are the time of the oldest call counting against the
+          limit and the limit, or None if no limit is exceeded.
+        """
+        checks = []
+        if self.limit is not None:
+            checks.append((self.limit, [
+                times for (call_account_id, _), times in self._calls.items()
+                if call_account_id == account_id
+            ]))
+        if operation in self.operation_limits:
+            checks.append((self.operation_limits[operation],
+                           [self._calls[account_id, operation]]))
+        for limit, groups in checks:
+            if sum(len(times) for times in groups) >= limit:
+                oldest = min(times[0] for times in groups if times) \
+                    if any(groups) else _time.time()
+                return oldest, limit
+        return None
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+"""Deadlines and cooperative cancellation of calls. A `Scope` bounds the
+time of everything done within it in a thread, e.g. of a method and all of
+its chunked calls, and can be cancelled from another thread::
+
+    with campaigns.deadline(60):
+        campaigns.get_ad_extensions_associations(...)
+
+Scopes nest, an inner scope never outlives the outer one, and
+`_utils.thread_map` runs its workers in the scope of the caller. The
+`Guard` interceptor of `BingAds` raises `DeadlineExceeded` or `Cancelled`
+before each call of a scope that expired or was cancelled, and the socket
+timeout of each call is shortened to the time left, so a hung call can't
+outlive its scope either. The same goes for files downloaded and uploaded with
+`_utils.urlopen`.
+"""
+import contextlib as _contextlib
+import threading as _threading
+import time as _time
+
+_LOCAL = _threading.local()
+
+# Guards the events of threads waiting in scopes, see `Scope.wait`.
+_WAITERS_LOCK = _threading.Lock()
+
+
+class Cancelled(RuntimeError):
+    """ Raised when calls are made in a cancelled scope. """
+
+
+class DeadlineExceeded(Cancelled):
+    """ Raised when calls are made in a scope past its deadline. """
+
+
+class Scope(object):
+    """Deadline and cancellation of the work done within it.
+
+    >>> scope = Scope(timeout=60)
+    >>> scope.check()
+    >>> scope.cancel('Account is abandoned.')
+    >>> scope.check()
+    Traceback (most recent call last):
+    ...
+    Cancelled: Account is abandoned.
+    """
+
+    def __init__(self, timeout=None, parent=None):
+        """
+        :type timeout: float | None
+        :param timeout:
+          Number of seconds until the deadline, none if None.
+
+        :type parent: Scope | None
+        :param parent:
+          Enclosing scope, whose deadline and cancellation apply too.
+        """
+        self.parent = parent
+        self.deadline = None
+        if timeout is not None:
+            self.deadline = _time.time() + timeout
+        if parent is not None and parent.deadline is not None and (
+                self.deadline is None or parent.deadline < self.deadline):
+            self.deadline = parent.deadline
+        self.reason = None
+        self._cancelled = _threading.Event()
+        self._waiters = set()
+
+    def cancel(self, reason='Cancelled.'):
+        """ Cancel the work of the scope and of the scopes within it. """
+        self.reason = reason
+        self._cancelled.set()
+        with _WAITERS_LOCK:
+            waiters = list(self._waiters)
+        for event in waiters:
+            event.set()
+
+    @property
+    def cancelled(self):
+        """ Whether the scope or an enclosing scope was cancelled. """
+        return self._cancelled.is_set() or (
+            self.parent is not None and self.parent.cancelled)
+
+    def remaining(self):
+        """Get the number of seconds left until the deadline.
+
+        :rtype: float | None
+        :return:
+          Returned is the time left, or None without a deadline.
+        """
+        if self.deadline is None:
+            return None
+        return max(self.deadline - _time.time(), 0.0)
+
+    def check(self):
+        """ Raise if the scope was cancelled or is past its deadline. """
+        scope = self
+        while scope is not None:
+            if scope._cancelled.is_set():
+                raise Cancelled(scope.reason)
+            scope = scope.parent
+        if self.remaining() == 0:
+            raise DeadlineExceeded('Deadline exceeded.')
+
+    def wait(self, event, timeout=None):
+        """Wait until an event is set, but raise as soon as the scope or an
+        enclosing scope is cancelled or the scope expires. Cancelling sets
+        the event to wake the thread, so the event must be one of its own.
+
+        >>> event = _threading.Event()
+        >>> _threading.Timer(0.01, event.set).start()
+        >>> Scope(timeout=60).wait(event)
+        True
+
+        :type event: threading.Event
+        :param event:
+          Event of the waiting thread.
+
+        :type timeout: float | None
+        :param timeout:
+          Maximum number of seconds to wait, none if None.
+
+        :rtype: bool
+        :return:
+          Returned is whether the event was set within the timeout.
+        """
+        scopes = []
+        scope = self
+        while scope is not None:
+            scopes.append(scope)
+            scope = scope.parent
+        with _WAITERS_LOCK:
+            for scope in scopes:
+                scope._waiters.add(event)
+        try:
+            self.check()
+            remaining = self.remaining()
+            if remaining is not None and (
+                    timeout is None or remaining < timeout):
+                event.wait(remaining)
+                self.check()
+                if not event.is_set():
+                    raise DeadlineExceeded('Deadline exceeded.')
+            else:
+                event.wait(timeout)
+            self.check()
+            return event.is_set()
+        finally:
+            with _WAITERS_LOCK:
+                for scope in scopes:
+                    scope._waiters.discard(event)
+
+    def sleep(self, seconds):
+        """Sleep, but raise as soon as the scope or an enclosing scope is
+        cancelled or the scope expires instead of sleeping past its
+        deadline.
+        """
+        self.wait(_threading.Event(), seconds)
+
+
+def current():
+    """Get the innermost scope of the thread.
+
+    :rtype: Scope | None
+    """
+    return getattr(_LOCAL, 'scope', None)
+
+
+@_contextlib.contextmanager
+def activate(scope):
+    """Run the work within a block in a scope, e.g. one of another thread.
+
+    :type scope: Scope | None
+    """
+    previous = current()
+    _LOCAL.scope = scope
+    try:
+        yield scope
+    finally:
+        _LOCAL.scope = previous
+
+
+@_contextlib.contextmanager
+def scope(timeout=None):
+    """Run the work within a block in a new scope inside the current one.
+
+    >>> with scope(60) as outer:
+    ...     with scope(3600) as inner:
+    ...         inner.deadline == outer.deadline
+    True
+
+    :type timeout: float | None
+    :param timeout:
+      Number of seconds until the deadline of the scope.
+    """
+    with activate(Scope(timeout, parent=current())) as new_scope:
+        yield new_scope
+
+
+def check():
+    """ Raise if the current scope was cancelled or is past its deadline. """
+    current_scope = current()
+    if current_scope is not None:
+        current_scope.check()
+
+
+def sleep(seconds):
+    """ Sleep, but no longer than the current scope lasts. """
+    current_scope = current()
+    if current_scope is None:
+        _time.sleep(seconds)
+    else:
+        current_scope.sleep(seconds)
+
+
+def wait(event, timeout=None):
+    """ Wait until an event is set, but no longer than the current scope. """
+    current_scope = current()
+    if current_scope is None:
+        return event.wait(timeout)
+    return current_scope.wait(event, timeout)
+
+
+def limit(timeout=None):
+    """Limit a socket timeout to the time left in the current scope.
+
+    >>> limit(30) is None, limit(None) is None
+    (False, True)
+    >>> with scope(5):
+    ...     0 < limit(30) <= 5, 0 < limit(None) <= 5, limit(1)
+    (True, True, 1)
+
+    :type timeout: float | None
+    :param timeout:
+      Number of seconds, none if None.
+
+    :rtype: float | None
+    :return:
+      Returned is the shorter of the timeout and the time left.
+    """
+    current_scope = current()
+    remaining = None if current_scope is None else current_scope.remaining()
+    if remaining is None:
+        return timeout
+    remaining = max(remaining, 0.001)
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def bind(func):
+    """Bind a function to the current scope, so it runs in the scope in
+    whichever thread calls it.
+
+    >>> with scope(60) as outer:
+    ...     func = bind(current)
+    >>> func() is outer, current() is None
+    (True, True)
+    """
+    bound_scope = current()
+
+    def bound(*args, **kwargs):
+        """ Run the function in the scope. """
+        with activate(bound_scope):
+            return func(*args, **kwargs)
+    return bound
+
+
+@_contextlib.contextmanager
+def limited_timeout(service):
+    """Limit the socket timeout of a service client to the time left in the
+    current scope within a block. Getting an operation of the client, e.g.
+    `service.GetCampaignsByAccountId`, restores the options of the client,
+    so the block must come after that.
+
+    :type service: bingads.service_client.ServiceClient
+    """
+    current_scope = current()
+    if current_scope is None or current_scope.deadline is None:
+        yield
+        return
+    options = service.soap_client.options
+    previous = options.timeout
+    options.timeout = limit(previous)
+    try:
+        yield
+    finally:
+        options.timeout = previous
+
+
+class Guard(object):
+    """Interceptor checking the current scope before each call. The socket
+    timeout of the call is limited to the time left in the scope when it is
+    finally sent, see `limited_timeout`.
+    """
+
+    def __call__(self, call, proceed):
+        check()
+        return proceed()
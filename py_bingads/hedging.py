@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+"""Hedged reads against tail latencies. `Hedging` is an interceptor of the
+calls of `BingAds` objects, see `py_bingads.services.proxy`, which sends a
+duplicate of a slow idempotent read once it has taken longer than the
+observed p95 latency of its operation, and returns whichever response comes
+first::
+
+    hedging = Hedging(max_fraction=0.05)
+    ad_groups = AdGroups(hedging=hedging, ...)
+
+Duplicates are sent with clients of their own, since clients are not
+thread-safe. When a duplicate wins, the calling thread continues with the
+client of the duplicate, and the client of the late call is kept for later
+duplicates once it returns. Duplicates pass through the interceptors
+before the hedging, so budgets and rate limits charge them like calls, and
+never exceed `max_fraction` of the calls.
+"""
+import collections as _collections
+import functools as _ft
+import threading as _threading
+import time as _time
+import weakref as _weakref
+
+from six.moves import queue as _queue
+
+from py_bingads import budget as _budget
+from py_bingads import deadline as _deadline
+
+# Maximum number of seconds between checks of the current scope while
+# waiting for an attempt.
+POLL_INTERVAL = 0.1
+
+# Idempotent reads with long tail latencies, hedged by default.
+HEDGED_OPERATIONS = frozenset((
+    'GetAdGroupsByCampaignId',
+    'GetAdsByAdGroupId',
+    'GetListItemsBySharedList',
+))
+
+
+def quantile(latencies, fraction):
+    """Get a quantile of latencies by the nearest rank.
+
+    >>> quantile([0.1, 0.3, 0.2, 0.5, 0.4], 0.8)
+    0.4
+    """
+    ordered = sorted(latencies)
+    return ordered[min(int(fraction * len(ordered)), len(ordered)) - 1]
+
+
+def _next_result(results, timeout=None):
+    """Get the next result of an attempt from a queue, but raise as soon as
+    the current scope is cancelled or expires.
+
+    :type timeout: float | None
+    :param timeout:
+      Maximum number of seconds to wait, none if None.
+
+    :rtype: tuple | None
+    :return:
+      Returned is the name of the attempt, whether it succeeded and its
+      response or error, or None if there was none within the timeout.
+    """
+    end = None if timeout is None else _time.time() + timeout
+    while True:
+        _deadline.check()
+        wait = POLL_INTERVAL
+        if end is not None:
+            wait = max(min(wait, end - _time.time()), 0)
+        try:
+            return results.get(timeout=_deadline.limit(wait))
+        except _queue.Empty:
+            if end is not None and _time.time() >= end:
+                return None
+
+
+class Hedging(object):
+    """Interceptor hedging reads of `operations` that take longer than the
+    `percentile` of their last `window` latencies, once there are at least
+    `min_samples` of them. It can be shared by several `BingAds` objects,
+    which then share the latencies.
+    """
+
+    def __init__(self, operations=HEDGED_OPERATIONS, max_fraction=0.05,
+                 percentile=0.95, window=1000, min_samples=50):
+        """
+        :type operations: iter
+        :param operations:
+          Names of the idempotent reads to hedge.
+
+        :type max_fraction: float
+        :param max_fraction:
+          Maximum number of duplicates as a fraction of all calls.
+
+        :type percentile: float
+        :param percentile:
+          Fraction of calls which are not hedged in the long run.
+
+        :type window: int
+        :param window:
+          Number of recent latencies per operation to compute it from.
+
+        :type min_samples: int
+        :param min_samples:
+          Number of latencies of an operation required before hedging it.
+        """
+        self.operations = frozenset(operations)
+        mutating = sorted(
+            operation for operation in self.operations
+            if _budget.is_mutating(operation)
+        )
+        assert not mutating, 'Operations are not idempotent: {0}'.format(
+            mutating)
+        self.max_fraction = max_fraction
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.calls = 0
+        self.hedges = 0
+        self.wins = 0
+        self._latencies = {}
+        self._spare_services = _weakref.WeakKeyDictionary()
+        self._lock = _threading.Lock()
+
+    def __call__(self, call, proceed):
+        with self._lock:
+            self.calls += 1
+        if call.operation not in self.operations or call.resend is None:
+            return proceed()
+        threshold = self.threshold(call.operation)
+        if threshold is None:
+            start = _time.time()
+            response = proceed()
+            self.record(call.operation, _time.time() - start)
+            return response
+        return self._hedge(call, proceed, threshold)
+
+    def record(self, operation, latency):
+        """ Record the latency of a call of an operation in seconds. """
+        with self._lock:
+            latencies = self._latencies.get(operation)
+            if latencies is None:
+                latencies = self._latencies[operation] = \
+                    _collections.deque(maxlen=self.window)
+            latencies.append(latency)
+
+    def threshold(self, operation):
+        """Get the latency after which calls of an operation are hedged.
+
+        :rtype: float | None
+        :return:
+          Returned is the latency in seconds, or None while there are too
+          few samples.
+        """
+        with self._lock:
+            latencies = list(self._latencies.get(operation, ()))
+        if len(latencies) < max(self.min_samples, 1):
+            return None
+        return quantile(latencies, self.percentile)
+
+    def _may_hedge(self):
+        """ Count a duplicate unless it would exceed `max_fraction`. """
+        with self._lock:
+            if self.hedges + 1 > self.max_fraction * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def _get_service(self, proxy):
+        """ Take a spare client of a service or create one. """
+        with self._lock:
+            spares = self._spare_services.setdefault(
+                proxy.bing_ads, {}).setdefault(proxy.name, [])
+            if spares:
+                return spares.pop()
+        return proxy.new_service()
+
+    def _put_service(self, proxy, service):
+        """ Keep a client, which is no longer used, for later duplicates. """
+        with self._lock:
+            self._spare_services.setdefault(
+                proxy.bing_ads, {}).setdefault(proxy.name, []).append(service)
+
+    def _resend(self, call, service):
+        """Send a duplicate of a call with another client through the
+        interceptors before the hedging, e.g. budgets and rate limits.
+        """
+        interceptors = list(call.proxy.bing_ads.interceptors)
+        if self in interceptors:
+            interceptors = interceptors[:interceptors.index(self)]
+
+        def proceed(index=0):
+            """ Continue with the interceptor at an index. """
+            if index == len(interceptors):
+                return call.resend(service)
+            return interceptors[index](call, _ft.partial(proceed, index + 1))
+
+        return proceed()
+
+    def _hedge(self, call, proceed, threshold):
+        """Send a call and, if it is slow, a duplicate, and return the
+        first successful response, or raise the error of the call.
+        """
+        proxy = call.proxy
+        results = _queue.Queue()
+        lock = _threading.Lock()
+        state = dict(winner=None, finished={})
+
+        def run(name, func, service):
+            """ Send an attempt, report its result and recycle its client. """
+            start = _time.time()
+            try:
+                results.put((name, True, func()))
+            except BaseException as error:  # pylint: disable=broad-except
+                results.put((name, False, error))
+            if name == 'call':
+                self.record(call.operation, _time.time() - start)
+            with lock:
+                state['finished'][name] = service
+                if state['winner'] not in (None, name):
+                    self._put_service(proxy, service)
+
+        def start(name, func, service):
+            """ Run an attempt in a thread in the current deadline scope. """
+            thread = _threading.Thread(
+                target=_deadline.bind(run), args=(name, func, service))
+            thread.daemon = True
+            thread.start()
+
+        start('call', proceed, call.service)
+        service = None
+        try:
+            result = _next_result(results, threshold)
+            if result is None and not self._may_hedge():
+                result = _next_result(results)
+            elif result is None:
+                service = self._get_service(proxy)
+                start('hedge', _ft.partial(self._resend, call, service),
+                      service)
+                result = _next_result(results)
+                if not result[1]:
+                    other = _next_result(results)
+                    if other[1] or other[0] == 'call':
+                        result = other
+        except _deadline.Cancelled:
+            # Both attempts are abandoned, and recycle their clients once
+            # they return, so the thread continues with another client.
+            with lock:
+                state['winner'] = 'abandoned'
+                for finished in state['finished'].values():
+                    self._put_service(proxy, finished)
+            proxy.service = self._get_service(proxy)
+            raise
+        name, succeeded, value = result
+        if service is not None:
+            with lock:
+                state['winner'] = name
+                loser = 'call' if name == 'hedge' else 'hedge'
+                if loser in state['finished']:
+                    self._put_service(proxy, state['finished'][loser])
+            if name == 'hedge':
+                # The call may still use the client of the thread.
+                proxy.service = service
+                with self._lock:
+                    self.wins += 1
+        if not succeeded:
+            raise value
+        return value
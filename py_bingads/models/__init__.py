@@ -1,9 +1,17 @@
 #!/usr/bin/env python
 """ Models """
 
-from .account import Account
+from py_bingads import _constants as _c
+
+from .account import Account, AccountDirectory
+from .account_mirror import AccountMirror
 from .ad import Ad, ArrayOfAd
 from .ad_extension import AdExtension, ArrayOfAdExtension
+from .ad_extension_association import (
+    AdExtensionAssociation, AdExtensionAssociationIndex,
+    ArrayOfAdExtenionAssociation
+)
+from .ad_extension_index import AdExtensionIndex
 from .ad_extension_identity import (
     AdExtensionIdentity, ArrayOfAdExtenionIdentity
 )
@@ -12,6 +20,11 @@ from .ad_extension_id_to_entity_id_association import (
     ArrayOfAdExtensionIdToEntityIdAssociation
 )
 from .ad_group import AdGroup, ArrayOfAdGroup
+from .association_matrix import AssociationMatrix
+from .bulk_file import (
+    BULK_RECORD_CLASSES, BulkFileWriter, BulkResult, iter_bulk_rows,
+    open_bulk_file, parse_bulk_row, read_bulk_file
+)
 from .callout_ad_extension import CalloutAdExtension
 from .campaign import Campaign, ArrayOfCampaign
 from .keyword import Keyword
@@ -20,6 +33,7 @@ from .negative_keyword import NegativeKeyword, ArrayOfNegativeKeyword
 from .negative_keyword_list import (
     NegativeKeywordList, ArrayOfNegativeKeywordList
 )
+from .report import REPORT_COLUMN_TYPES, iter_report_rows, read_report
 from .review_ad_extension import ReviewAdExtension
 from .shared_entity import SharedEntity, ArrayOfSharedEntity
 from .shared_entity_association import (
@@ -28,3 +42,13 @@ from .shared_entity_association import (
 from .shared_list import SharedList, ArrayOfSharedList
 from .shared_list_item import SharedListItem, ArrayofSharedListItem
 from .sitelink_2_ad_extension import Sitelink2AdExtension
+from .tracking import TrackedModel
+
+# Ad extension models keyed on their Bing API ad extension type.
+AD_EXTENSION_CLASSES = {
+    ad_extension_class.TYPE_NAME: ad_extension_class
+    for ad_extension_class in (
+        CalloutAdExtension, ReviewAdExtension, Sitelink2AdExtension
+    )
+    if ad_extension_class.TYPE_NAME in _c.AD_EXTENSION_TYPES
+}
@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 """ Model for Account. """
+import threading as _threading
+import time as _time
 
 # pylint: disable=redefined-builtin, invalid-name
 
@@ -9,12 +11,27 @@ class Account(object):
 
     TYPE_NAME = 'Account'
 
-    def __init__(self, id, name, number, language):
+    def __init__(self, id, name, number, language, last_modified_time=None):
         """ Init. """
         self.id = id
         self.name = name
         self.number = number
         self.language = language
+        self.last_modified_time = last_modified_time
+
+    def __repr__(self):
+        return '[{id}] {name}'.format(id=self.id, name=self.name)
+
+    def __eq__(self, other):
+        return (
+            self.id == other.id and
+            self.name == other.name and
+            self.number == other.number and
+            self.language == other.language
+        )
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
 
     @property
     def key(self):
@@ -38,4 +55,132 @@ class Account(object):
             name=obj.Name,
             number=obj.Number,
             language=obj.Language,
+            last_modified_time=getattr(obj, 'LastModifiedTime', None),
+        )
+
+
+class AccountDirectory(object):
+    """Represent a cached directory of Account objects keyed on ID.
+
+    >>> directory = AccountDirectory()
+    >>> directory.is_stale(60)
+    True
+    >>> directory.update([Account(1, 'a', 'X1', 'German')])
+    ([1], [], [])
+    >>> directory.update([Account(1, 'b', 'X1', 'German'),
+    ...                   Account(2, 'c', 'X2', 'French')])
+    ([2], [1], [])
+    >>> directory.update([Account(2, 'c', 'X2', 'French')])
+    ([], [], [1])
+    >>> directory[2]
+    [2] c
+    >>> directory.is_stale(60)
+    False
+    """
+
+    def __init__(self):
+        """ Init. """
+        self.accounts = {}
+        self.refreshed_at = None
+        # Time of the last complete listing, which also finds removals.
+        self.listed_at = None
+        # Whether accounts can be listed by their modification time.
+        self.incremental = True
+        self.lock = _threading.Lock()
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def __iter__(self):
+        return iter(self.accounts.values())
+
+    def __contains__(self, account_id):
+        return account_id in self.accounts
+
+    def __getitem__(self, account_id):
+        return self.accounts[account_id]
+
+    def get(self, account_id, default=None):
+        """ Get an account by its ID. """
+        return self.accounts.get(account_id, default)
+
+    def is_stale(self, max_age):
+        """Return whether the directory was never refreshed or was last
+        refreshed more than `max_age` seconds ago.
+        """
+        return (
+            self.refreshed_at is None or
+            _time.time() - self.refreshed_at > max_age
         )
+
+    def update(self, accounts):
+        """Merge a complete listing of accounts into the directory. Unchanged
+        accounts keep their existing objects.
+
+        :type accounts: iter
+        :param accounts:
+          Iterable of all `Account` objects currently accessible.
+
+        :rtype: ([int], [int], [int])
+        :return:
+          Returned are the IDs of added, changed and removed accounts.
+        """
+        accounts = {account.key: account for account in accounts}
+        added, changed = [], []
+        for account_id, account in accounts.items():
+            existing = self.accounts.get(account_id)
+            if existing is None:
+                added.append(account_id)
+            elif existing != account:
+                changed.append(account_id)
+            else:
+                accounts[account_id] = existing
+        removed = [
+            account_id for account_id in self.accounts
+            if account_id not in accounts
+        ]
+
+        self.accounts = accounts
+        self.refreshed_at = self.listed_at = _time.time()
+        return sorted(added), sorted(changed), sorted(removed)
+
+    @property
+    def last_modified_time(self):
+        """ Latest modification time of the accounts, or None. """
+        times = [
+            account.last_modified_time for account in self.accounts.values()
+            if account.last_modified_time is not None
+        ]
+        return max(times) if times else None
+
+    def merge(self, accounts):
+        """Merge the accounts modified since the last refresh into the
+        directory. Removed accounts are only found by `update`.
+
+        >>> directory = AccountDirectory()
+        >>> directory.update([Account(1, 'a', 'X1', 'German', 1)])
+        ([1], [], [])
+        >>> directory.merge([Account(1, 'b', 'X1', 'German', 2),
+        ...                  Account(2, 'c', 'X2', 'French', 2)])
+        ([2], [1])
+        >>> len(directory), directory.last_modified_time
+        (2, 2)
+
+        :type accounts: iter
+        :param accounts:
+          Iterable of modified `Account` objects.
+
+        :rtype: ([int], [int])
+        :return:
+          Returned are the IDs of added and changed accounts.
+        """
+        added, changed = [], []
+        for account in accounts:
+            existing = self.accounts.get(account.key)
+            if existing is None:
+                added.append(account.key)
+            elif existing != account:
+                changed.append(account.key)
+            self.accounts[account.key] = account
+        self.refreshed_at = _time.time()
+        return sorted(added), sorted(changed)
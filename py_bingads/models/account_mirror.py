@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+""" Local mirror of the entities of an account. """
+import datetime as _datetime
+import pickle as _pickle
+
+from py_bingads import _constants as _c
+from py_bingads import _utils
+
+from .bulk_file import BULK_RECORD_CLASSES
+
+# pylint: disable=redefined-builtin, invalid-name
+
+# Formats of the Sync Time column of bulk files.
+SYNC_TIME_FORMATS = ('%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M:%S.%f')
+
+
+def parse_sync_time(value):
+    """Parse the Sync Time of a bulk file into a datetime in UTC.
+
+    >>> parse_sync_time('11/15/2017 21:29:41')
+    datetime.datetime(2017, 11, 15, 21, 29, 41)
+    >>> parse_sync_time('') is None
+    True
+    """
+    if not value:
+        return None
+    for sync_time_format in SYNC_TIME_FORMATS:
+        try:
+            return _datetime.datetime.strptime(value, sync_time_format)
+        except ValueError:
+            pass
+    raise ValueError('Invalid sync time: `{value}`.'.format(value=value))
+
+
+class AccountMirror(object):
+    """Represent a local snapshot of the entities of an account, which is kept
+    up to date by merging the rows of bulk downloads since the last sync
+    time. Entities are keyed on their model and ID.
+
+    >>> from py_bingads.models import Campaign
+    >>> mirror = AccountMirror(account_id=1)
+    >>> mirror.apply([
+    ...     {'Type': 'Account', 'Id': '1', 'Sync Time': '11/15/2017 21:29:41'},
+    ...     {'Type': 'Campaign', 'Id': '10', 'Campaign': 'Shoes',
+    ...      'Status': 'Active'},
+    ...     {'Type': 'Campaign', 'Id': '11', 'Campaign': 'Boots',
+    ...      'Status': 'Active'},
+    ... ])
+    (2, 0)
+    >>> mirror.apply([
+    ...     {'Type': 'Account', 'Id': '1', 'Sync Time': '11/15/2017 22:29:41'},
+    ...     {'Type': 'Campaign', 'Id': '10', 'Campaign': 'Shoes',
+    ...      'Status': 'Paused'},
+    ...     {'Type': 'Campaign', 'Id': '11', 'Status': 'Deleted'},
+    ... ])
+    (1, 1)
+    >>> [(campaign.id, campaign.status) for campaign in mirror.get(Campaign)]
+    [(10, 'Paused')]
+    >>> mirror.last_sync_time
+    datetime.datetime(2017, 11, 15, 22, 29, 41)
+    """
+
+    def __init__(self, account_id, path=None):
+        """
+        :type account_id: int
+        :param account_id:
+          ID of the mirrored account.
+
+        :type path: str | None
+        :param path:
+          Optional path of a file in which to persist the snapshot.
+        """
+        self.account_id = account_id
+        self.path = path
+        self.last_sync_time = None
+        self.entities = {}
+
+    def __len__(self):
+        return sum(len(entities) for entities in self.entities.values())
+
+    @classmethod
+    def load(cls, account_id, path):
+        """Load the snapshot of an account from a file, or create an empty
+        one if the file doesn't exist yet.
+        """
+        try:
+            with open(path, 'rb') as file:
+                mirror = _pickle.load(file)
+        except (IOError, OSError):
+            return cls(account_id, path=path)
+        assert mirror.account_id == account_id, (
+            'Snapshot `{path}` is of account `{other}`.'.format(
+                path=path, other=mirror.account_id)
+        )
+        mirror.path = path
+        return mirror
+
+    def save(self):
+        """ Atomically write the snapshot to its file. """
+        with _utils.atomic_write(self.path, mode='wb') as file:
+            _pickle.dump(self, file, protocol=2)
+
+    def clear(self):
+        """ Drop all entities, so the next sync downloads everything. """
+        self.last_sync_time = None
+        self.entities = {}
+
+    def get(self, model_class):
+        """Get the entities of a model, e.g. all `Campaign` objects.
+
+        :type model_class: type
+        :param model_class:
+          Class of the model.
+
+        :rtype: list
+        :return:
+          Returned are the entities ordered by ID.
+        """
+        entities = self.entities.get(model_class.__name__, {})
+        return [entities[id] for id in sorted(entities)]
+
+    def apply(self, rows):
+        """Merge the rows of a bulk download into the snapshot. Rows with the
+        `Deleted` status remove their entity. The last sync time only
+        advances once all rows are merged, so an interrupted sync is simply
+        repeated.
+
+        :type rows: iter
+        :param rows:
+          Iterable of bulk file rows keyed on column names.
+
+        :rtype: (int, int)
+        :return:
+          Returned are the numbers of added or updated and of deleted
+          entities.
+        """
+        upserted = deleted = 0
+        sync_time = None
+        for row in rows:
+            if row['Type'] == 'Account':
+                sync_time = parse_sync_time(row.get('Sync Time'))
+                continue
+            bulk_class = BULK_RECORD_CLASSES.get(row['Type'])
+            id = _utils.parse_int(row.get('Id'))
+            if bulk_class is None or id is None:
+                continue
+            # Rows of associations share the IDs of their ad extensions.
+            if hasattr(bulk_class, 'bulk_key'):
+                id = bulk_class.bulk_key(row)
+            entities = self.entities.setdefault(bulk_class.__name__, {})
+            if row.get('Status') == _c.DELETED:
+                deleted += entities.pop(id, None) is not None
+            else:
+                entities[id] = bulk_class.from_bulk_row(row)
+                upserted += 1
+
+        if sync_time is not None:
+            self.last_sync_time = sync_time
+        return upserted, deleted
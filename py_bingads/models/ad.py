@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 """ Model for Ad. """
 
+from py_bingads import _utils
+
 # pylint: disable=redefined-builtin, invalid-name
 
 
@@ -8,6 +10,10 @@ class Ad(object):
     """ Represent a single Ad object. """
 
     TYPE_NAME = 'Ad'
+    BULK_TYPES = (
+        'App Install Ad', 'Dynamic Search Ad', 'Expanded Text Ad',
+        'Product Ad', 'Text Ad',
+    )
 
     def __init__(self, id=None, status=None):
         """ Init. """
@@ -34,6 +40,14 @@ class Ad(object):
             status=obj.Status,
         )
 
+    @classmethod
+    def from_bulk_row(cls, row):
+        """ Parse bulk file row. """
+        return cls(
+            id=_utils.parse_int(row['Id']),
+            status=row['Status'],
+        )
+
 class ArrayOfAd(object):
     """ Represent an array of Ad objects. """
 
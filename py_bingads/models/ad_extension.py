@@ -54,9 +54,21 @@ class ArrayOfAdExtension(object):
         return obj
 
     @classmethod
-    def from_api_obj(cls, obj, ad_extension_class=AdExtension):
-        """ Parse Bing API object. """
+    def from_api_obj(cls, obj, ad_extension_class=AdExtension,
+                     ad_extension_classes=None):
+        """Parse Bing API object. If `ad_extension_classes` is given, each ad
+        extension is parsed with the class registered for its type instead of
+        `ad_extension_class`, and ad extensions of other types are skipped.
+        """
+        if not obj:
+            return []
+        if ad_extension_classes is None:
+            return [
+                ad_extension_class.from_api_obj(ad_extension)
+                for ad_extension in obj.AdExtensions.AdExtension
+            ]
         return [
-            ad_extension_class.from_api_obj(ad_extension)
+            ad_extension_classes[ad_extension.Type].from_api_obj(ad_extension)
             for ad_extension in obj.AdExtensions.AdExtension
-        ] if obj else []
+            if ad_extension and ad_extension.Type in ad_extension_classes
+        ]
@@ -1,5 +1,11 @@
 #!/usr/bin/env python
 """ Model for AdExtensionAssociation. """
+import collections as _collections
+
+from py_bingads import _constants as _c
+from py_bingads import _utils
+
+from .sitelink_2_ad_extension import Sitelink2AdExtension
 
 # pylint: disable=redefined-builtin, invalid-name
 
@@ -8,13 +14,22 @@ class AdExtensionAssociation(object):
     """ Represent a single AdExtensionAssociation object """
 
     TYPE_NAME = 'AdExtensionAssociation'
+    BULK_TYPES = (
+        'Ad Group Sitelink2 Ad Extension', 'Campaign Sitelink2 Ad Extension',
+    )
 
     def __init__(self, ad_extension=None, association_type=None,
-                 entity_id=None):
+                 entity_id=None, editorial_status=None):
         """ Init. """
         self.ad_extension = ad_extension
         self.association_type = association_type
         self.entity_id = entity_id
+        self.editorial_status = editorial_status
+
+    def __repr__(self):
+        return '{entity_id} -> {ad_extension}'.format(
+            entity_id=self.entity_id, ad_extension=self.ad_extension
+        )
 
     @property
     def key(self):
@@ -30,14 +45,80 @@ class AdExtensionAssociation(object):
         return obj
 
     @classmethod
-    def from_api_obj(cls, obj):
-        """ Parse Bing API AdExtensionAssociation object. """
+    def from_api_obj(cls, obj, ad_extension_class=None,
+                     ad_extension_classes=None):
+        """Parse Bing API AdExtensionAssociation object. The ad extension is
+        parsed with the class registered for its type in
+        `ad_extension_classes`, else with `ad_extension_class` if given.
+        """
+        ad_extension = obj.AdExtension
+        if ad_extension_classes is not None:
+            ad_extension_class = ad_extension_classes.get(
+                ad_extension.Type, ad_extension_class
+            )
+        if ad_extension_class is not None:
+            ad_extension = ad_extension_class.from_api_obj(ad_extension)
         return cls(
-            ad_extension=obj.AdExtension,
-            association_type=obj.AdExtension,
+            ad_extension=ad_extension,
+            association_type=obj.AssociationType,
             entity_id=obj.EntityId,
+            editorial_status=getattr(obj, 'EditorialStatus', None),
+        )
+
+    @classmethod
+    def from_bulk_row(cls, row):
+        """Parse bulk file row of a sitelink association, which only has the
+        ID of the sitelink.
+
+        >>> association = AdExtensionAssociation.from_bulk_row({
+        ...     'Type': 'Campaign Sitelink2 Ad Extension', 'Id': '7',
+        ...     'Parent Id': '10', 'Status': 'Active',
+        ... })
+        >>> association.ad_extension.id, association.association_type
+        (7, 'Campaign')
+        >>> association.to_bulk_row()['Parent Id']
+        10
+        """
+        return cls(
+            ad_extension=Sitelink2AdExtension(id=_utils.parse_int(row['Id'])),
+            association_type=(
+                _c.AD_GROUP if row['Type'].startswith('Ad Group ')
+                else _c.CAMPAIGN
+            ),
+            entity_id=_utils.parse_int(row['Parent Id']),
+            editorial_status=row.get('Editorial Status') or None,
         )
 
+    @staticmethod
+    def bulk_key(row):
+        """ Get the key of a bulk file row, since IDs are of ad extensions. """
+        return (_utils.parse_int(row.get('Id')),
+                _utils.parse_int(row.get('Parent Id')))
+
+    def to_bulk_row(self, status=_c.ACTIVE, parent_id=None):
+        """Create bulk file row, e.g. of a `Campaign Sitelink2 Ad Extension`.
+        The ad extension must have `BULK_TYPES`.
+
+        :type status: str
+        :param status:
+          Status of the row, `Deleted` to remove the association.
+
+        :type parent_id: int | None
+        :param parent_id:
+          ID of the campaign or ad group, defaults to the entity ID.
+        """
+        entity_type = 'Ad Group' if self.association_type == _c.AD_GROUP \
+            else self.association_type
+        return {
+            'Type': '{entity_type} {ad_extension_type}'.format(
+                entity_type=entity_type,
+                ad_extension_type=self.ad_extension.BULK_TYPES[0],
+            ),
+            'Id': self.ad_extension.id,
+            'Parent Id': self.entity_id if parent_id is None else parent_id,
+            'Status': status,
+        }
+
 
 class ArrayOfAdExtenionAssociation(object):
     """ Represent an array of AdExtensionAssociation objects. """
@@ -61,10 +142,98 @@ class ArrayOfAdExtenionAssociation(object):
         return obj
 
     @classmethod
-    def from_api_obj(cls, obj):
-        """ Parse Bing API object. """
+    def from_api_obj(cls, obj, ad_extension_class=None,
+                     ad_extension_classes=None):
+        """ Parse Bing API AdExtensionAssociationCollection object. """
         return [
-            AdExtensionAssociation.from_api_obj(ad_extension_association)
+            AdExtensionAssociation.from_api_obj(
+                ad_extension_association,
+                ad_extension_class=ad_extension_class,
+                ad_extension_classes=ad_extension_classes,
+            )
             for ad_extension_association
-            in obj.AdExtensionAssociation.AdExtensionAssociation
-        ] if obj else []
+            in obj.AdExtensionAssociations.AdExtensionAssociation
+        ] if obj and obj.AdExtensionAssociations else []
+
+
+class AdExtensionAssociationIndex(object):
+    """Index AdExtensionAssociation objects on entity ID and on ad extension
+    ID. Looked up by entity ID like a dict, it returns the entity's list of
+    ad extensions.
+
+    >>> from py_bingads.models import CalloutAdExtension
+    >>> free_shipping = CalloutAdExtension(id=1, text='Free shipping')
+    >>> sale = CalloutAdExtension(id=2, text='Sale')
+    >>> index = AdExtensionAssociationIndex([
+    ...     AdExtensionAssociation(free_shipping, 'Campaign', 10),
+    ...     AdExtensionAssociation(sale, 'Campaign', 10),
+    ...     AdExtensionAssociation(free_shipping, 'Campaign', 11),
+    ... ])
+    >>> index[10]
+    [[1] Free shipping, [2] Sale]
+    >>> index[12]
+    []
+    >>> index.entity_ids(1)
+    [10, 11]
+    >>> sorted(index)
+    [10, 11]
+    """
+
+    def __init__(self, associations=None):
+        """ Init. """
+        self.by_entity = _collections.defaultdict(list)
+        self.by_ad_extension = _collections.defaultdict(list)
+        for association in associations or []:
+            self.add(association)
+
+    def __len__(self):
+        return len(self.by_entity)
+
+    def __iter__(self):
+        return iter(self.by_entity)
+
+    def __contains__(self, entity_id):
+        return entity_id in self.by_entity
+
+    def __getitem__(self, entity_id):
+        return self.ad_extensions(entity_id)
+
+    def add(self, association):
+        """ Add an AdExtensionAssociation to the index. """
+        self.by_entity[association.entity_id].append(association)
+        self.by_ad_extension[association.ad_extension.id].append(association)
+
+    def get(self, entity_id, default=None):
+        """ Get the list of ad extensions of an entity. """
+        if entity_id not in self.by_entity:
+            return default
+        return self.ad_extensions(entity_id)
+
+    def keys(self):
+        """ Return the IDs of entities with associations. """
+        return list(self.by_entity)
+
+    def values(self):
+        """ Return the lists of ad extensions of entities. """
+        return [self.ad_extensions(entity_id) for entity_id in self.by_entity]
+
+    def items(self):
+        """ Return tuples of entity ID and list of ad extensions. """
+        return [
+            (entity_id, self.ad_extensions(entity_id))
+            for entity_id in self.by_entity
+        ]
+
+    def ad_extensions(self, entity_id):
+        """ Return the list of ad extensions associated with an entity. """
+        return [
+            association.ad_extension
+            for association in self.by_entity.get(entity_id, [])
+        ]
+
+    def entity_ids(self, ad_extension_id):
+        """ Return the IDs of entities associated with an ad extension. """
+        return [
+            association.entity_id
+            for association in self.by_ad_extension.get(ad_extension_id, [])
+        ]
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+""" Content-addressed index of ad extensions. """
+
+# pylint: disable=redefined-builtin, invalid-name
+
+
+class AdExtensionIndex(object):
+    """Index ad extensions on their content hash. Of several identical ad
+    extensions, the one with the lowest ID is kept and the others are flagged
+    as duplicates.
+
+    >>> from py_bingads.models import CalloutAdExtension
+    >>> index = AdExtensionIndex([
+    ...     CalloutAdExtension(id=3, text='Free shipping'),
+    ...     CalloutAdExtension(id=1, text='Free shipping'),
+    ...     CalloutAdExtension(id=2, text='Free returns'),
+    ... ])
+    >>> len(index)
+    2
+    >>> index.duplicate_ids
+    [3]
+    >>> new = [CalloutAdExtension(text='Free shipping'),
+    ...        CalloutAdExtension(text='Sale')]
+    >>> index.resolve(new)
+    [[None] Sale]
+    >>> new[0].id
+    1
+    """
+
+    def __init__(self, ad_extensions=None):
+        """ Init. """
+        self.ad_extensions = {}
+        self.duplicates = []
+        for ad_extension in ad_extensions or []:
+            self.add(ad_extension)
+
+    def __len__(self):
+        return len(self.ad_extensions)
+
+    def __iter__(self):
+        return iter(self.ad_extensions.values())
+
+    def __contains__(self, ad_extension):
+        return ad_extension.content_hash in self.ad_extensions
+
+    @property
+    def duplicate_ids(self):
+        """ Return the IDs of ad extensions identical to an indexed one. """
+        return sorted(ad_extension.id for ad_extension in self.duplicates)
+
+    def add(self, ad_extension):
+        """Add an ad extension to the index.
+
+        :type ad_extension: object
+        :param ad_extension:
+          Ad extension with a `content_hash`.
+        """
+        content_hash = ad_extension.content_hash
+        existing = self.ad_extensions.get(content_hash)
+        if existing is None:
+            self.ad_extensions[content_hash] = ad_extension
+        elif existing.id is None or (
+                ad_extension.id is not None and ad_extension.id < existing.id):
+            self.ad_extensions[content_hash] = ad_extension
+            self.duplicates.append(existing)
+        else:
+            self.duplicates.append(ad_extension)
+
+    def get(self, ad_extension, default=None):
+        """ Get the indexed ad extension identical to the given one. """
+        return self.ad_extensions.get(ad_extension.content_hash, default)
+
+    def resolve(self, ad_extensions):
+        """Reuse the IDs of indexed ad extensions for identical given ones.
+
+        :type ad_extensions: iter
+        :param ad_extensions:
+          Iterable of ad extensions.
+
+        :rtype: list
+        :return:
+          Returned are the given ad extensions without an identical indexed
+          one, i.e. the ones that need to be added.
+        """
+        missing = []
+        for ad_extension in ad_extensions:
+            existing = self.get(ad_extension)
+            if existing is None:
+                missing.append(ad_extension)
+            else:
+                ad_extension.id = existing.id
+        return missing
@@ -3,12 +3,18 @@
 
 from py_bingads import _utils
 
+from .tracking import TrackedModel
+
 # pylint: disable=redefined-builtin, invalid-name
 
-class AdGroup(object):
-    """ Represent a single AdGroup object. """
+class AdGroup(TrackedModel):
+    """Represent a single AdGroup object. Only its modified name and status
+    are sent in updates.
+    """
 
     TYPE_NAME = 'AdGroup'
+    TRACKED_FIELDS = ('name', 'status')
+    BULK_TYPES = ('Ad Group',)
 
     def __init__(self, id=None, name=None, status=None, campaign_id=None):
         """ Init. """
@@ -22,14 +28,22 @@ class AdGroup(object):
         """ Return the value that should be unique to this object. """
         return self.id
 
-    def to_api_obj(self, service):
-        """ Create Bing API object. """
+    def to_api_obj(self, service, only_dirty=False):
+        """Create Bing API object.
+
+        :type only_dirty: bool
+        :param only_dirty:
+          Whether to leave out the fields not modified since loading, as
+          in updates. Adds send all fields.
+        """
         obj = _utils.set_elements_to_none(
             service.factory.create(self.TYPE_NAME)
         )
         obj.Id = self.id
-        obj.Name = self.name
-        obj.Status = self.status
+        if not only_dirty or self.is_dirty('name'):
+            obj.Name = self.name
+        if not only_dirty or self.is_dirty('status'):
+            obj.Status = self.status
         return obj
 
     @classmethod
@@ -40,7 +54,39 @@ class AdGroup(object):
             name=obj.Name,
             status=obj.Status,
             campaign_id=campaign_id,
-        )
+        ).mark_clean()
+
+    @classmethod
+    def from_bulk_row(cls, row):
+        """ Parse bulk file row. """
+        return cls(
+            id=_utils.parse_int(row['Id']),
+            name=row['Ad Group'],
+            status=row['Status'],
+            campaign_id=_utils.parse_int(row['Parent Id']),
+        ).mark_clean()
+
+    def to_bulk_row(self, status=None, parent_id=None):
+        """Create bulk file row.
+
+        :type status: str | None
+        :param status:
+          Status of the row, e.g. `Deleted` to remove the ad group, defaults
+          to the status if it was modified.
+
+        :type parent_id: int | None
+        :param parent_id:
+          ID of the campaign, defaults to the campaign ID.
+        """
+        if status is None and self.is_dirty('status'):
+            status = self.status
+        return {
+            'Type': self.BULK_TYPES[0],
+            'Id': self.id,
+            'Parent Id': self.campaign_id if parent_id is None else parent_id,
+            'Ad Group': self.name if self.is_dirty('name') else None,
+            'Status': status,
+        }
 
 class ArrayOfAdGroup(object):
     """ Represent an array of AdGroup objects. """
@@ -54,11 +100,12 @@ class ArrayOfAdGroup(object):
     def __len__(self):
         return len(self.ad_groups)
 
-    def to_api_obj(self, service):
+    def to_api_obj(self, service, only_dirty=False):
         """ Create Bing API object. """
         obj = service.factory.create(self.TYPE_NAME)
         for ad_group in self.ad_groups:
-            obj.AdGroup.append(ad_group.to_api_obj(service))
+            obj.AdGroup.append(
+                ad_group.to_api_obj(service, only_dirty=only_dirty))
         return obj
 
     @classmethod
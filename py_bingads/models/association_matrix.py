@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+""" Sparse matrix of entity associations. """
+import binascii as _binascii
+
+# pylint: disable=redefined-builtin, invalid-name
+
+
+def _bits_from_indexes(indexes, size):
+    """Build an integer bitmap of `size` bits with the given bits set.
+
+    >>> bin(_bits_from_indexes([0, 3, 9], 10))
+    '0b1000001001'
+    """
+    buf = bytearray((size + 7) // 8 or 1)
+    for index in indexes:
+        buf[index >> 3] |= 1 << (index & 7)
+    buf.reverse()
+    return int(_binascii.hexlify(bytes(buf)), 16)
+
+
+def _indexes_from_bits(bits):
+    """Yield the indexes of set bits of an integer bitmap in order.
+
+    >>> list(_indexes_from_bits(0b1000001001))
+    [0, 3, 9]
+    """
+    if not bits:
+        return
+    hex_bits = '%x' % bits
+    buf = bytearray(_binascii.unhexlify('0' * (len(hex_bits) % 2) + hex_bits))
+    buf.reverse()
+    for byte_index, byte in enumerate(buf):
+        if not byte:
+            continue
+        for bit in range(8):
+            if byte & (1 << bit):
+                yield (byte_index << 3) | bit
+
+
+class AssociationMatrix(object):
+    """Represent associations between entities such as campaigns (rows) and
+    ad extensions or shared entities (columns) as a single integer bitmap.
+    Set operations between matrices with the same axes are a single bitwise
+    operation over all associations; matrices with other axes are aligned
+    on the union of both axes first.
+
+    >>> current = AssociationMatrix([(10, 1), (10, 2), (11, 1)])
+    >>> desired = AssociationMatrix.product([10, 11, 12], [1, 3])
+    >>> sorted(desired - current)
+    [(10, 3), (11, 3), (12, 1), (12, 3)]
+    >>> sorted(current - desired)
+    [(10, 2)]
+    >>> len(desired & current), (11, 1) in current, (11, 2) in current
+    (2, True, False)
+    >>> current.row(10), current.column(1)
+    ([1, 2], [10, 11])
+    >>> len({current, current.reindex([9, 10, 11], [1, 2])})
+    1
+    """
+
+    def __init__(self, pairs=None, row_ids=None, column_ids=None):
+        """
+        :type pairs: iter
+        :param pairs:
+          Iterable of tuples of row ID and column ID to set.
+
+        :type row_ids: iter | None
+        :param row_ids:
+          Row IDs to include in the axis even if they have no associations.
+
+        :type column_ids: iter | None
+        :param column_ids:
+          Column IDs to include in the axis even if they have no associations.
+        """
+        pairs = list(pairs or [])
+        self.row_ids = sorted(
+            set(row_ids or []).union(row_id for row_id, _ in pairs)
+        )
+        self.column_ids = sorted(
+            set(column_ids or []).union(column_id for _, column_id in pairs)
+        )
+        self._rows = {row_id: i for i, row_id in enumerate(self.row_ids)}
+        self._columns = {
+            column_id: i for i, column_id in enumerate(self.column_ids)
+        }
+        self.bits = _bits_from_indexes(
+            (self._index(row_id, column_id) for row_id, column_id in pairs),
+            len(self.row_ids) * len(self.column_ids)
+        )
+
+    @classmethod
+    def product(cls, row_ids, column_ids):
+        """ Create a matrix with every row associated with every column. """
+        matrix = cls(row_ids=row_ids, column_ids=column_ids)
+        matrix.bits = (1 << (len(matrix.row_ids) * len(matrix.column_ids))) - 1
+        return matrix
+
+    @classmethod
+    def from_ad_extension_associations(cls, associations, row_ids=None):
+        """Create a matrix of entity IDs by ad extension IDs.
+
+        :type associations: _models.AdExtensionAssociationIndex
+        :param associations:
+          Index of ad extension associations.
+
+        :type row_ids: iter | None
+        :param row_ids:
+          Entity IDs to include even if they have no associations.
+        """
+        return cls(
+            pairs=[
+                (entity_id, association.ad_extension.id)
+                for entity_id, entity_associations
+                in associations.by_entity.items()
+                for association in entity_associations
+            ],
+            row_ids=row_ids,
+        )
+
+    @classmethod
+    def from_shared_entity_associations(cls, associations, row_ids=None):
+        """Create a matrix of entity IDs by shared entity IDs.
+
+        :type associations: [_models.SharedEntityAssociation]
+        :param associations:
+          List of shared entity associations.
+
+        :type row_ids: iter | None
+        :param row_ids:
+          Entity IDs to include even if they have no associations.
+        """
+        return cls(
+            pairs=[
+                (association.entity_id, association.shared_entity_id)
+                for association in associations
+            ],
+            row_ids=row_ids,
+        )
+
+    def _index(self, row_id, column_id):
+        """ Get the bit index of a row and column. """
+        return self._rows[row_id] * len(self.column_ids) + \
+            self._columns[column_id]
+
+    def __len__(self):
+        return bin(self.bits).count('1')
+
+    def __iter__(self):
+        width = len(self.column_ids)
+        for index in _indexes_from_bits(self.bits):
+            yield (self.row_ids[index // width], self.column_ids[index % width])
+
+    def __contains__(self, pair):
+        row_id, column_id = pair
+        if row_id not in self._rows or column_id not in self._columns:
+            return False
+        return bool(self.bits >> self._index(row_id, column_id) & 1)
+
+    def __eq__(self, other):
+        return set(self) == set(other)
+
+    def __hash__(self):
+        return hash(frozenset(self))
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __sub__(self, other):
+        left, right = self.align(other)
+        return left._with_bits(left.bits & ~right.bits)
+
+    def __and__(self, other):
+        left, right = self.align(other)
+        return left._with_bits(left.bits & right.bits)
+
+    def __or__(self, other):
+        left, right = self.align(other)
+        return left._with_bits(left.bits | right.bits)
+
+    def __xor__(self, other):
+        left, right = self.align(other)
+        return left._with_bits(left.bits ^ right.bits)
+
+    def _with_bits(self, bits):
+        """ Create a matrix with the same axes and the given bits. """
+        matrix = AssociationMatrix(row_ids=self.row_ids,
+                                   column_ids=self.column_ids)
+        matrix.bits = bits
+        return matrix
+
+    def reindex(self, row_ids, column_ids):
+        """Create an equal matrix with the given axes, which must include the
+        axes of this matrix.
+        """
+        if list(row_ids) == self.row_ids and \
+                list(column_ids) == self.column_ids:
+            return self
+        return AssociationMatrix(pairs=self, row_ids=row_ids,
+                                 column_ids=column_ids)
+
+    def align(self, other):
+        """ Return both matrices with the union of both axes. """
+        row_ids = sorted(set(self.row_ids).union(other.row_ids))
+        column_ids = sorted(set(self.column_ids).union(other.column_ids))
+        return (self.reindex(row_ids, column_ids),
+                other.reindex(row_ids, column_ids))
+
+    def row(self, row_id):
+        """ Return the column IDs associated with a row. """
+        if row_id not in self._rows:
+            return []
+        width = len(self.column_ids)
+        row_bits = self.bits >> (self._rows[row_id] * width)
+        return [
+            self.column_ids[index]
+            for index in _indexes_from_bits(row_bits & ((1 << width) - 1))
+        ]
+
+    def column(self, column_id):
+        """ Return the row IDs associated with a column. """
+        return [row_id for row_id in self.row_ids
+                if (row_id, column_id) in self]
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+""" Reader for Bing Ads bulk files. """
+import contextlib as _contextlib
+import csv as _csv
+import io as _io
+import zipfile as _zipfile
+
+import six as _six
+
+from py_bingads import _constants as _c
+from py_bingads import _utils
+
+from .ad import Ad
+from .ad_extension_association import AdExtensionAssociation
+from .ad_group import AdGroup
+from .campaign import Campaign
+from .keyword import Keyword
+from .negative_keyword import NegativeKeyword
+from .sitelink_2_ad_extension import Sitelink2AdExtension
+
+# pylint: disable=redefined-builtin, invalid-name
+
+# Models keyed on the bulk record types they are parsed from.
+BULK_RECORD_CLASSES = {
+    bulk_type: bulk_class
+    for bulk_class in (
+        Ad, AdExtensionAssociation, AdGroup, Campaign, Keyword,
+        NegativeKeyword, Sitelink2AdExtension,
+    )
+    for bulk_type in bulk_class.BULK_TYPES
+}
+
+# Columns of written bulk files.
+BULK_COLUMNS = (
+    'Type', 'Status', 'Id', 'Parent Id', 'Campaign', 'Ad Group', 'Client Id',
+    'Keyword', 'Match Type', 'Device Preference', 'Final Url',
+    'Sitelink Extension Link Text', 'Sitelink Extension Description1',
+    'Sitelink Extension Description2', 'Name',
+)
+
+
+@_contextlib.contextmanager
+def open_bulk_file(path):
+    """Open a bulk file, either zipped or plain CSV, as a binary stream. Zipped
+    files are decompressed while reading.
+
+    :type path: str
+    :param path:
+      Path of the bulk file.
+    """
+    if _zipfile.is_zipfile(path):
+        with _contextlib.closing(_zipfile.ZipFile(path)) as zip_file:
+            with _contextlib.closing(
+                    zip_file.open(zip_file.namelist()[0])) as stream:
+                yield stream
+    else:
+        with open(path, 'rb') as stream:
+            yield stream
+
+
+def _decode(value):
+    """ Decode a CSV cell, which is only bytes on Python 2. """
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def iter_bulk_rows(stream):
+    r"""Yield the rows of a CSV bulk file one at a time as dicts keyed on the
+    column names.
+
+    >>> stream = _io.BytesIO(
+    ...     b'\xef\xbb\xbfType,Id,Campaign\r\n'
+    ...     b'Campaign,1,Shoes\r\n'
+    ... )
+    >>> [sorted(row.items()) for row in iter_bulk_rows(stream)]
+    [[('Campaign', 'Shoes'), ('Id', '1'), ('Type', 'Campaign')]]
+
+    :type stream: file
+    :param stream:
+      Binary stream of the bulk file.
+    """
+    if not _six.PY2:
+        stream = _io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    reader = _csv.reader(stream)
+
+    columns = [_decode(column) for column in next(reader)]
+    columns[0] = columns[0].lstrip(u'\ufeff')
+    for row in reader:
+        yield dict(zip(columns, (_decode(value) for value in row)))
+
+
+def parse_bulk_row(row):
+    """Parse a bulk file row into a model.
+
+    >>> parse_bulk_row({'Type': 'Campaign', 'Id': '1', 'Campaign': 'Shoes',
+    ...                 'Status': 'Active'}).name
+    'Shoes'
+    >>> parse_bulk_row({'Type': 'Format Version', 'Name': '5.0'}) is None
+    True
+
+    :type row: dict
+    :param row:
+      Bulk file row keyed on column names.
+
+    :rtype: object | None
+    :return:
+      Returned is the model of the row or None if its type has no model.
+    """
+    bulk_class = BULK_RECORD_CLASSES.get(row['Type'])
+    return bulk_class.from_bulk_row(row) if bulk_class else None
+
+
+def read_bulk_file(path):
+    """Yield the models of a bulk file one at a time, skipping rows of types
+    without a model. Memory use does not grow with the file size.
+
+    :type path: str
+    :param path:
+      Path of the bulk file, either zipped or plain CSV.
+    """
+    with open_bulk_file(path) as stream:
+        for row in iter_bulk_rows(stream):
+            model = parse_bulk_row(row)
+            if model is not None:
+                yield model
+
+
+def _encode(value):
+    """ Encode a CSV cell, which has to be bytes on Python 2. """
+    if value is None:
+        return ''
+    value = _six.text_type(value)
+    return value.encode('utf-8') if _six.PY2 else value
+
+
+class BulkResult(object):
+    """ Represent the outcome of a single row of an uploaded bulk file. """
+
+    def __init__(self, client_id, model=None, id=None, errors=None):
+        """ Init. """
+        self.client_id = client_id
+        self.model = model
+        self.id = id
+        self.errors = errors or []
+
+    def __repr__(self):
+        return '[{client_id}] {outcome}'.format(
+            client_id=self.client_id,
+            outcome='; '.join(self.errors) if self.errors else self.id,
+        )
+
+    @property
+    def succeeded(self):
+        """ Return whether the row was applied without errors. """
+        return not self.errors
+
+
+class BulkFileWriter(object):
+    """Write models to a CSV bulk file one row at a time. Every row gets a
+    Client Id, which maps the rows of the result file back to the models.
+
+    >>> import os, tempfile
+    >>> from py_bingads.models import Campaign
+    >>> path = os.path.join(tempfile.mkdtemp(), 'upload.csv')
+    >>> with BulkFileWriter(path) as writer:
+    ...     writer.write(Campaign(id=1, status='Paused'))
+    ...     writer.write(Campaign(id=2, status='Paused'))
+    '1'
+    '2'
+    >>> with open(path, 'rb') as stream:
+    ...     for row in iter_bulk_rows(stream):
+    ...         print(','.join([row['Type'], row['Id'], row['Status'],
+    ...                         row['Client Id']]))
+    Format Version,,,
+    Campaign,1,Paused,1
+    Campaign,2,Paused,2
+    >>> result_path = os.path.join(os.path.dirname(path), 'result.csv')
+    >>> with open(result_path, 'wb') as stream:
+    ...     _ = stream.write(
+    ...         b'Type,Id,Client Id,Error,Error Number\\r\\n'
+    ...         b'Campaign,1,1,,\\r\\n'
+    ...         b'Campaign,2,2,CampaignInvalid,1100\\r\\n'
+    ...     )
+    >>> results = writer.read_results(result_path)
+    >>> [(result.model.id, result.succeeded) for result in results]
+    [(1, True), (2, False)]
+    """
+
+    def __init__(self, path, account_id=None):
+        """
+        :type path: str
+        :param path:
+          Path of the CSV file to write.
+
+        :type account_id: int | None
+        :param account_id:
+          ID of the account, the Parent Id of rows without one, such as rows
+          of campaigns and sitelinks.
+        """
+        self.path = path
+        self.account_id = account_id
+        self.rows = 0
+        if _six.PY2:
+            self._file = open(path, 'wb')
+        else:
+            self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._writer = _csv.writer(self._file)
+        self._writer.writerow([_encode(column) for column in BULK_COLUMNS])
+        self.write_row({'Type': 'Format Version',
+                        'Name': _c.BULK_FORMAT_VERSION})
+
+    def __len__(self):
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """ Close the file. """
+        self._file.close()
+
+    def write_row(self, row):
+        """ Write a row given as dict keyed on column names. """
+        self._writer.writerow(
+            [_encode(row.get(column)) for column in BULK_COLUMNS]
+        )
+
+    def write(self, model, **kwargs):
+        """Write a model to the file.
+
+        :type model: object
+        :param model:
+          Model with a `to_bulk_row` method.
+
+        :param kwargs:
+          Keyword arguments of `to_bulk_row`, e.g. the status or parent ID.
+
+        :rtype: str
+        :return:
+          Returned is the Client Id of the row.
+        """
+        self.rows += 1
+        client_id = str(self.rows)
+        row = model.to_bulk_row(**kwargs)
+        if row.get('Parent Id') is None:
+            row['Parent Id'] = self.account_id
+        row['Client Id'] = client_id
+        self.write_row(row)
+        return client_id
+
+    def read_results(self, path):
+        """Map the rows of a result file back to the written rows. Errors of
+        a row are reported in additional rows with the same Client Id. The
+        writer keeps no models, so the models of the results are parsed from
+        the written file, which must still exist.
+
+        :type path: str
+        :param path:
+          Path of the result file, either zipped or plain CSV.
+
+        :rtype: [BulkResult]
+        :return:
+          Returned are the results of the written rows in order.
+        """
+        self.close()
+        ids = {}
+        errors = {}
+        with open_bulk_file(path) as stream:
+            for row in iter_bulk_rows(stream):
+                client_id = row.get('Client Id')
+                if not client_id:
+                    continue
+                if row.get('Error'):
+                    errors.setdefault(client_id, []).append(
+                        '{number}: {error}'.format(
+                            number=row.get('Error Number'), error=row['Error']
+                        )
+                    )
+                elif row.get('Id'):
+                    ids[client_id] = _utils.parse_int(row['Id'])
+
+        results = []
+        with open_bulk_file(self.path) as stream:
+            for row in iter_bulk_rows(stream):
+                client_id = row.get('Client Id')
+                if not client_id:
+                    continue
+                results.append(BulkResult(
+                    client_id, model=parse_bulk_row(row),
+                    id=ids.get(client_id), errors=errors.get(client_id),
+                ))
+        return results
@@ -30,6 +30,11 @@ class CalloutAdExtension(object):
         """ Return the value that should be unique to this object. """
         return self.text
 
+    @property
+    def content_hash(self):
+        """ Return a hash of all content, identical for identical objects. """
+        return _utils.content_hash(self.TYPE_NAME, self.text)
+
     def to_api_obj(self, service):
         """ Create Bing API CalloutAdExtension object. """
         obj = _utils.set_elements_to_none(
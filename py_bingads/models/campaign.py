@@ -3,13 +3,19 @@
 
 from py_bingads import _utils
 
+from .tracking import TrackedModel
+
 # pylint: disable=redefined-builtin, invalid-name
 
 
-class Campaign(object):
-    """ Represent a single Campaign object. """
+class Campaign(TrackedModel):
+    """Represent a single Campaign object. Only its modified name and status
+    are sent in updates.
+    """
 
     TYPE_NAME = 'Campaign'
+    TRACKED_FIELDS = ('name', 'status')
+    BULK_TYPES = ('Campaign',)
 
     def __init__(self, id=None, name=None, status=None):
         """ Init. """
@@ -22,14 +28,22 @@ class Campaign(object):
         """ Return the value that should be unique to this object. """
         return self.id
 
-    def to_api_obj(self, service):
-        """ Create Bing API object. """
+    def to_api_obj(self, service, only_dirty=False):
+        """Create Bing API object.
+
+        :type only_dirty: bool
+        :param only_dirty:
+          Whether to leave out the fields not modified since loading, as
+          in updates. Adds send all fields.
+        """
         obj = _utils.set_elements_to_none(
             service.factory.create(self.TYPE_NAME)
         )
         obj.Id = self.id
-        obj.Name = self.name
-        obj.Status = self.status
+        if not only_dirty or self.is_dirty('name'):
+            obj.Name = self.name
+        if not only_dirty or self.is_dirty('status'):
+            obj.Status = self.status
         return obj
 
     @classmethod
@@ -39,7 +53,38 @@ class Campaign(object):
             id=obj.Id,
             name=obj.Name,
             status=obj.Status,
-        )
+        ).mark_clean()
+
+    @classmethod
+    def from_bulk_row(cls, row):
+        """ Parse bulk file row. """
+        return cls(
+            id=_utils.parse_int(row['Id']),
+            name=row['Campaign'],
+            status=row['Status'],
+        ).mark_clean()
+
+    def to_bulk_row(self, status=None, parent_id=None):
+        """Create bulk file row.
+
+        :type status: str | None
+        :param status:
+          Status of the row, e.g. `Deleted` to remove the campaign, defaults
+          to the status if it was modified.
+
+        :type parent_id: int | None
+        :param parent_id:
+          ID of the account, which the writer of the file fills in if None.
+        """
+        if status is None and self.is_dirty('status'):
+            status = self.status
+        return {
+            'Type': self.BULK_TYPES[0],
+            'Id': self.id,
+            'Parent Id': parent_id,
+            'Campaign': self.name if self.is_dirty('name') else None,
+            'Status': status,
+        }
 
 
 class ArrayOfCampaign(object):
@@ -54,11 +99,12 @@ class ArrayOfCampaign(object):
     def __len__(self):
         return len(self.campaigns)
 
-    def to_api_obj(self, service):
+    def to_api_obj(self, service, only_dirty=False):
         """ Create Bing API object. """
         obj = service.factory.create(self.TYPE_NAME)
         for campaign in self.campaigns:
-            obj.Campaign.append(campaign.to_api_obj(service))
+            obj.Campaign.append(
+                campaign.to_api_obj(service, only_dirty=only_dirty))
         return obj
 
     @classmethod
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 """ Model for Keyword. """
 
+from py_bingads import _utils
+
 # pylint: disable=redefined-builtin, invalid-name
 
 
@@ -8,6 +10,7 @@ class Keyword(object):
     """ Represent a single Keyword object. """
 
     TYPE_NAME = 'Keyword'
+    BULK_TYPES = ('Keyword',)
 
     def __init__(self, id=None, text=None, match_type=None):
         """ Init. """
@@ -36,3 +39,12 @@ class Keyword(object):
             text=obj.Text,
             match_type=obj.MatchType,
         )
+
+    @classmethod
+    def from_bulk_row(cls, row):
+        """ Parse bulk file row. """
+        return cls(
+            id=_utils.parse_int(row['Id']),
+            text=row['Keyword'],
+            match_type=row['Match Type'],
+        )
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 """ Model for NegativeKeyword. """
 
+from py_bingads import _constants as _c
 from py_bingads import _utils
 
 from . import shared_list_item
@@ -13,15 +14,25 @@ class NegativeKeyword(shared_list_item.SharedListItem):
     # pylint: disable=arguments-differ
 
     TYPE_NAME = 'NegativeKeyword'
-
-    def __init__(self, id=None, shared_set_id=None, text=None, match_type=None):
-        """ Init. """
+    BULK_TYPES = (
+        'Ad Group Negative Keyword', 'Campaign Negative Keyword',
+        'Shared Negative Keyword',
+    )
+
+    def __init__(self, id=None, shared_set_id=None, text=None, match_type=None,
+                 bulk_type=None, parent_id=None):
+        """Init. Negative keywords of bulk files also have the bulk type and
+        parent ID of their row, and no match type in rows of deletions.
+        """
         shared_list_item.SharedListItem.__init__(self)
         self.id = id
         self.shared_set_id = shared_set_id
         self.text = text
-        self.match_type = match_type.lower().capitalize()
-        assert self.match_type in ('Exact', 'Phrase')
+        self.match_type = match_type.lower().capitalize() if match_type \
+            else None
+        assert self.match_type in ('Exact', 'Phrase', None)
+        self.bulk_type = bulk_type
+        self.parent_id = parent_id
 
     def __eq__(self, other):
         return (
@@ -58,6 +69,71 @@ class NegativeKeyword(shared_list_item.SharedListItem):
             match_type=obj.MatchType.upper(),
         )
 
+    @classmethod
+    def from_bulk_row(cls, row):
+        """Parse bulk file row. The parent is the campaign, ad group or shared
+        set of the row; only negative keywords of negative keyword lists have
+        a shared set ID.
+
+        >>> keyword = NegativeKeyword.from_bulk_row({
+        ...     'Type': 'Ad Group Negative Keyword', 'Id': '5',
+        ...     'Parent Id': '20', 'Keyword': 'free', 'Match Type': '',
+        ... })
+        >>> keyword.parent_id, keyword.shared_set_id, keyword.match_type
+        (20, None, None)
+        >>> keyword.to_bulk_row(status='Deleted')['Type']
+        'Ad Group Negative Keyword'
+        """
+        parent_id = _utils.parse_int(row['Parent Id'])
+        return cls(
+            id=_utils.parse_int(row['Id']),
+            shared_set_id=(
+                parent_id if row['Type'] == 'Shared Negative Keyword'
+                else None
+            ),
+            text=row['Keyword'],
+            match_type=row['Match Type'] or None,
+            bulk_type=row['Type'],
+            parent_id=parent_id,
+        )
+
+    def to_bulk_row(self, status=_c.ACTIVE, parent_id=None, bulk_type=None):
+        """Create bulk file row.
+
+        :type status: str
+        :param status:
+          Status of the row, `Deleted` to remove the negative keyword.
+
+        :type parent_id: int | None
+        :param parent_id:
+          ID of the campaign, ad group or shared set, defaults to the parent
+          ID of the parsed row, else to the shared set ID.
+
+        :type bulk_type: str | None
+        :param bulk_type:
+          One of `BULK_TYPES`, defaults to the type of the parsed row, else
+          to a negative keyword of the shared set if the keyword has a shared
+          set ID, else of a campaign.
+        """
+        if bulk_type is None:
+            bulk_type = self.bulk_type or (
+                'Shared Negative Keyword' if self.shared_set_id
+                else 'Campaign Negative Keyword'
+            )
+        if parent_id is None:
+            parent_id = (
+                self.shared_set_id if self.parent_id is None
+                else self.parent_id
+            )
+        return {
+            'Type': bulk_type,
+            'Id': self.id,
+            'Parent Id': parent_id,
+            'Keyword': self.text,
+            'Match Type': self.match_type,
+            'Status': status,
+        }
+
 
 class ArrayOfNegativeKeyword(shared_list_item.ArrayofSharedListItem):
     """ Represent an array of SharedEntity objects. """
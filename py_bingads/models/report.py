@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+""" Reader for Bing Ads report files. """
+import csv as _csv
+import io as _io
+
+import six as _six
+
+from .bulk_file import open_bulk_file
+
+# Types of numeric report columns, all other columns are kept as text.
+REPORT_COLUMN_TYPES = {
+    'AccountId': int,
+    'AdGroupId': int,
+    'CampaignId': int,
+    'Clicks': int,
+    'Conversions': float,
+    'Impressions': int,
+    'Spend': float,
+}
+
+
+def _parse_cell(column, value):
+    """Parse a report cell into the type of its column.
+
+    >>> _parse_cell('Clicks', '1,024'), _parse_cell('Spend', '')
+    (1024, None)
+    """
+    if _six.PY2:
+        value = value.decode('utf-8')
+    column_type = REPORT_COLUMN_TYPES.get(column)
+    if column_type is None:
+        return value
+    value = value.replace(',', '')
+    return column_type(value) if value else None
+
+
+def iter_report_rows(stream):
+    r"""Yield the data rows of a CSV report one at a time as lists of parsed
+    cells, starting with the column names. The report header and footer,
+    which are single cells, are skipped.
+
+    >>> stream = _io.BytesIO(
+    ...     b'\xef\xbb\xbf"Report Name: Campaigns"\r\n'
+    ...     b'"Rows: 1"\r\n'
+    ...     b'\r\n'
+    ...     b'"CampaignId","CampaignName","Clicks"\r\n'
+    ...     b'"10","Shoes","12"\r\n'
+    ...     b'\r\n'
+    ...     b'"\xc2\xa92017 Microsoft Corporation. All rights reserved. "\r\n'
+    ... )
+    >>> list(iter_report_rows(stream))
+    [['CampaignId', 'CampaignName', 'Clicks'], [10, 'Shoes', 12]]
+
+    :type stream: file
+    :param stream:
+      Binary stream of the report file.
+    """
+    if not _six.PY2:
+        stream = _io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    columns = None
+    for row in _csv.reader(stream):
+        if len(row) <= 1:
+            continue
+        if columns is None:
+            columns = [_parse_cell(None, column) for column in row]
+            yield columns
+        elif len(row) == len(columns):
+            yield [
+                _parse_cell(column, value)
+                for column, value in zip(columns, row)
+            ]
+
+
+def read_report(path):
+    """Read a report file into columns, i.e. a dict of lists of cells keyed
+    on column names. Rows are parsed one at a time, so only the columns are
+    held in memory.
+
+    :type path: str
+    :param path:
+      Path of the report file, either zipped or plain CSV.
+
+    :rtype: dict
+    :return:
+      Returned are the lists of cells keyed on column names.
+    """
+    with open_bulk_file(path) as stream:
+        rows = iter_report_rows(stream)
+        columns = next(rows, [])
+        report = {column: [] for column in columns}
+        appends = [report[column].append for column in columns]
+        for row in rows:
+            for append, value in zip(appends, row):
+                append(value)
+    return report
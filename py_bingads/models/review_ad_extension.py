@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 """ Model for ReviewAdExtension. """
 
+from py_bingads import _utils
+
 # pylint: disable=redefined-builtin, invalid-name
 
 
@@ -31,6 +33,11 @@ class ReviewAdExtension(object):
         """ Return the value that should be unique to this review (not ID) """
         return (self.format, self.text, self.source, self.source_url)
 
+    @property
+    def content_hash(self):
+        """ Return a hash of all content, identical for identical objects. """
+        return _utils.content_hash(self.TYPE_NAME, *self.key)
+
     def to_api_obj(self, service):
         """ Create bing API review object """
         obj = service.factory.create(self.TYPE_NAME)
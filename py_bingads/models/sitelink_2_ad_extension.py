@@ -4,15 +4,19 @@
 from py_bingads import _constants as _c
 from py_bingads import _utils
 
-from . import AdExtension
+from .ad_extension import AdExtension
 
 # pylint: disable=redefined-builtin, invalid-name
 
 
 class Sitelink2AdExtension(AdExtension):
-    """ Represent a single Sitelink2AdExtension object. """
+    """Represent a single Sitelink2AdExtension object. Unlike campaigns and
+    ad groups, ad extensions are replaced as a whole on update, so all
+    fields are always sent.
+    """
 
     TYPE_NAME = 'Sitelink2AdExtension'
+    BULK_TYPES = ('Sitelink2 Ad Extension',)
 
     def __init__(self, id=None, display_text=None, final_url=None,
                  description1=None, description2=None, device_preference=None):
@@ -51,6 +55,14 @@ class Sitelink2AdExtension(AdExtension):
         """ Return the value that should be unique to this object. """
         return (self.display_text, self.final_url)
 
+    @property
+    def content_hash(self):
+        """ Return a hash of all content, identical for identical objects. """
+        return _utils.content_hash(
+            self.TYPE_NAME, self.display_text, self.final_url,
+            self.description1, self.description2, self.device_preference,
+        )
+
     def to_api_obj(self, service):
         """ Create Bing API object. """
         obj = _utils.set_elements_to_none(
@@ -88,3 +100,45 @@ class Sitelink2AdExtension(AdExtension):
             description2=obj.Description2,
             device_preference=device_preference,
         )
+
+    @classmethod
+    def from_bulk_row(cls, row):
+        """ Parse bulk file row. """
+        device_preference = (
+            _c.MOBILE
+            if row['Device Preference'] == 'Mobile'
+            else _c.ALL_DEVICES
+        )
+        return cls(
+            id=_utils.parse_int(row['Id']),
+            display_text=row['Sitelink Extension Link Text'],
+            final_url=row['Final Url'].split(';')[0] or None,
+            description1=row['Sitelink Extension Description1'] or None,
+            description2=row['Sitelink Extension Description2'] or None,
+            device_preference=device_preference,
+        )
+
+    def to_bulk_row(self, status=_c.ACTIVE, parent_id=None):
+        """Create bulk file row.
+
+        :type status: str
+        :param status:
+          Status of the row, `Deleted` to remove the sitelink.
+
+        :type parent_id: int | None
+        :param parent_id:
+          ID of the account, which the writer of the file fills in if None.
+        """
+        return {
+            'Type': self.BULK_TYPES[0],
+            'Id': self.id,
+            'Parent Id': parent_id,
+            'Status': status,
+            'Sitelink Extension Link Text': self.display_text,
+            'Final Url': self.final_url,
+            'Sitelink Extension Description1': self.description1,
+            'Sitelink Extension Description2': self.description2,
+            'Device Preference': (
+                'Mobile' if self.device_preference == _c.MOBILE else 'All'
+            ),
+        }
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+""" Tracking of modified model attributes. """
+
+
+class TrackedModel(object):
+    """Base of models that remember which of their `TRACKED_FIELDS` were
+    modified since they were loaded, so updates only send those fields.
+    Fields set when a model is created count as modified, loaded models
+    start out clean.
+
+    >>> class Model(TrackedModel):
+    ...     TRACKED_FIELDS = ('name', 'status')
+    ...     def __init__(self, id=None, name=None, status=None):
+    ...         self.id, self.name, self.status = id, name, status
+    >>> sorted(Model(id=1, status='Paused').dirty_fields)
+    ['status']
+    >>> model = Model(id=1, name='Shoes', status='Active').mark_clean()
+    >>> model.status = 'Active'
+    >>> model.is_dirty('status')
+    False
+    >>> model.status = 'Paused'
+    >>> sorted(model.dirty_fields)
+    ['status']
+    """
+
+    TRACKED_FIELDS = ()
+
+    def __setattr__(self, name, value):
+        if name in self.TRACKED_FIELDS and (
+                value is not None or name in self.__dict__) and (
+                    self.__dict__.get(name) != value):
+            self.__dict__.setdefault('_dirty_fields', set()).add(name)
+        object.__setattr__(self, name, value)
+
+    @property
+    def dirty_fields(self):
+        """ Return the names of the fields modified since loading. """
+        return frozenset(self.__dict__.get('_dirty_fields', ()))
+
+    def is_dirty(self, name):
+        """ Return whether a field was modified since loading. """
+        return name in self.dirty_fields
+
+    def mark_clean(self):
+        """Forget all modifications, e.g. after loading or saving the model.
+
+        :return:
+          Returned is the model itself.
+        """
+        self.__dict__.pop('_dirty_fields', None)
+        return self
+
+    def mark_dirty(self, *names):
+        """Mark fields as modified, so they are sent with the next update
+        even if unchanged. Marks all fields if none are given.
+
+        :return:
+          Returned is the model itself.
+        """
+        self.__dict__.setdefault('_dirty_fields', set()).update(
+            names or self.TRACKED_FIELDS
+        )
+        return self
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""Token bucket rate limits shared by all processes of a host that use the
+same developer token. A `RateLimiter` is an interceptor of the calls of
+`BingAds` objects, see `py_bingads.services.proxy`, which takes a token from
+the bucket of the operation class of each call before it is sent, and waits
+for the bucket to refill when it is empty::
+
+    limiter = RateLimiter('/var/run/py_bingads', rates={
+        READ: Rate(per_second=10, burst=20),
+        WRITE: Rate(per_second=2, burst=5),
+    })
+    campaigns = Campaigns(rate_limiter=limiter, ...)
+
+The buckets of a developer token are kept in a JSON file in `directory`,
+named after a hash of the token, and updated under a lock file, so workers
+in other processes see the calls of each other. Where `fcntl` is not
+available, e.g. on Windows, only the threads of a process are coordinated.
+"""
+import collections as _collections
+import hashlib as _hashlib
+import json as _json
+import os as _os
+import tempfile as _tempfile
+import threading as _threading
+import time as _time
+
+from py_bingads import _constants as _c
+from py_bingads import _utils
+from py_bingads import budget as _budget
+from py_bingads import deadline as _deadline
+
+try:
+    import fcntl as _fcntl
+except ImportError:  # Windows, where only threads are synchronized.
+    _fcntl = None
+
+# Operation classes with buckets of their own.
+READ = 'read'
+WRITE = 'write'
+BULK = 'bulk'
+
+Rate = _collections.namedtuple('Rate', ('per_second', 'burst'))
+
+# Conservative rates per operation class, to be tuned to the limits of a
+# developer token.
+DEFAULT_RATES = {
+    READ: Rate(per_second=8, burst=16),
+    WRITE: Rate(per_second=2, burst=4),
+    BULK: Rate(per_second=1, burst=2),
+}
+
+
+def operation_class(call):
+    """Get the operation class of a call, i.e. `BULK` for calls of the
+    bulk and reporting services, else `WRITE` for mutating calls and `READ`
+    for others.
+
+    :type call: py_bingads.services.proxy.Call
+    :rtype: str
+    """
+    if call.service_name in (_c.BULK_SERVICE, _c.REPORTING_SERVICE):
+        return BULK
+    return WRITE if _budget.is_mutating(call.operation) else READ
+
+
+def take(buckets, name, rate, now):
+    """Refill a bucket for the time passed and take a token from it.
+
+    >>> buckets = {}
+    >>> take(buckets, 'read', Rate(per_second=2, burst=1), 10.0)
+    0.0
+    >>> take(buckets, 'read', Rate(per_second=2, burst=1), 10.0)
+    0.5
+    >>> take(buckets, 'read', Rate(per_second=2, burst=1), 10.5)
+    0.0
+
+    :type buckets: dict
+    :param buckets:
+      Lists of the number of tokens and the time of their count keyed on
+      bucket name, updated in place.
+
+    :rtype: float
+    :return:
+      Returned is 0 if a token was taken, else the number of seconds until
+      the bucket holds one.
+    """
+    tokens, updated = buckets.get(name, (rate.burst, now))
+    tokens = min(rate.burst, tokens + max(now - updated, 0) * rate.per_second)
+    if tokens >= 1:
+        buckets[name] = [tokens - 1, now]
+        return 0.0
+    buckets[name] = [tokens, now]
+    return (1 - tokens) / float(rate.per_second)
+
+
+class RateLimiter(object):
+    """Interceptor limiting the rate of calls per developer token and
+    operation class. Operation classes without a rate are not limited.
+    Limiters can be pickled, e.g. as part of a `ConnectionSpec`, and all
+    limiters with the same `directory` share their buckets.
+    """
+
+    def __init__(self, directory=None, rates=None, classify=operation_class):
+        """
+        :type directory: str | None
+        :param directory:
+          Existing directory of the bucket files, by default the temporary
+          directory.
+
+        :type rates: dict | None
+        :param rates:
+          `Rate` per operation class, by default `DEFAULT_RATES`.
+
+        :type classify: callable
+        :param classify:
+          Function getting the operation class of a `Call`, which must be
+          picklable for the limiter to be.
+        """
+        self.directory = directory or _tempfile.gettempdir()
+        self.rates = DEFAULT_RATES if rates is None else rates
+        self.classify = classify
+        self.waited = 0.0
+        self._lock = _threading.Lock()
+
+    def __getstate__(self):
+        return {
+            name: value for name, value in self.__dict__.items()
+            if name != '_lock'
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = _threading.Lock()
+
+    def __call__(self, call, proceed):
+        name = self.classify(call)
+        if name in self.rates:
+            self.acquire(call.developer_token, name)
+        return proceed()
+
+    def path(self, developer_token):
+        """ Get the path of the bucket file of a developer token. """
+        digest = _hashlib.sha1(
+            (developer_token or '').encode('utf-8')).hexdigest()
+        return _os.path.join(
+            self.directory, 'py_bingads-rate-{0}.json'.format(digest[:16]))
+
+    def _take(self, path, name):
+        """Take a token from a bucket while holding the locks of the
+        process and of the file.
+
+        :rtype: float
+        :return:
+          Returned is the number of seconds to wait for a token, see `take`.
+        """
+        with self._lock:
+            lock_file = open(path + '.lock', 'a')
+            try:
+                if _fcntl is not None:
+                    _fcntl.flock(lock_file.fileno(), _fcntl.LOCK_EX)
+                try:
+                    with open(path) as file:
+                        buckets = _json.load(file)
+                except (IOError, OSError, ValueError):
+                    buckets = {}
+                delay = take(buckets, name, self.rates[name], _time.time())
+                with _utils.atomic_write(path) as file:
+                    _json.dump(buckets, file)
+                return delay
+            finally:
+                if _fcntl is not None:
+                    _fcntl.flock(lock_file.fileno(), _fcntl.LOCK_UN)
+                lock_file.close()
+
+    def acquire(self, developer_token, name):
+        """Take a token from the bucket of an operation class, waiting until
+        there is one, but no longer than the current deadline scope.
+
+        :type developer_token: str
+        :param developer_token:
+          Developer token whose buckets to use.
+
+        :type name: str
+        :param name:
+          Operation class, one of `rates`.
+        """
+        path = self.path(developer_token)
+        while True:
+            delay = self._take(path, name)
+            if not delay:
+                return
+            with self._lock:
+                self.waited += delay
+            _deadline.sleep(delay)
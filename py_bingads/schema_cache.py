@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Versioned location of the parsed WSDLs and schemas of the Bing Ads
+services. The Bing Ads SDK already keeps parsed WSDLs in a temporary cache
+which expires after a day. A `schema_cache_dir` passes an `ObjectCache` in
+a directory of the API version and environment to the SDK instead, through
+its `cache` option, so a cache warmed up by `warm_up`, e.g. at deploy time,
+never expires and never serves the schema of another version.
+
+There is no measurable speed-up: in `benchmarks/schema_cache.py` the first
+call of a fresh process takes 260 to 330 ms without any cache, with the
+temporary cache of the SDK and with a warmed up schema cache alike, with
+differences within the noise between runs.
+"""
+import os as _os
+
+from py_bingads import _constants as _c
+from py_bingads import _utils
+
+_suds_cache = _utils.lazy_import('suds.cache')
+_service_client = _utils.lazy_import('bingads.service_client')
+# Lazily, since the services import this module.
+_base = _utils.lazy_import('py_bingads.services.base')
+
+
+def cache_location(cache_dir, version, environment):
+    """Get the directory of the cache of an API version and environment, so
+    a new version never loads the schema of another. Cached schemas don't
+    expire, since they are versioned by their directory.
+
+    >>> cache_location('cache', 11, 'sandbox').split(_os.sep)
+    ['cache', 'v11', 'sandbox']
+    """
+    return _os.path.join(cache_dir, 'v{version}'.format(version=version),
+                         environment)
+
+
+def warm_up(cache_dir, environment=_c.PRODUCTION, version=None,
+            services=None):
+    """Download and parse the WSDLs of services into the cache.
+
+    :type cache_dir: str
+    :param cache_dir:
+      Root directory of the cache.
+
+    :type environment: str
+    :param environment:
+      Either `production` or `sandbox`.
+
+    :type version: int | None
+    :param version:
+      Version of the Bing Ads API, defaults to the one of `BingAds`.
+
+    :type services: iter | None
+    :param services:
+      Names of the services, defaults to all services in `SERVICES`.
+
+    :rtype: str
+    :return:
+      Returned is the directory of the cache.
+    """
+    _utils.validate_membership(environment, _c.ENVIRONMENTS,
+                               name='environment')
+    if version is None:
+        version = _base.BingAds.VERSION
+    if services is None:
+        services = sorted(_c.SERVICES.values())
+    for service in services:
+        _service_client.ServiceClient(
+            service, environment=environment, version=version,
+            cache=_suds_cache.ObjectCache(
+                cache_location(cache_dir, version, environment)),
+        )
+    return cache_location(cache_dir, version, environment)
@@ -1,11 +1,51 @@
 #!/usr/bin/env python
 """ Services """
+import importlib as _importlib
+import sys as _sys
 
-from .ad_extensions import AdExtensions
-from .ad_groups import AdGroups
-from .base import BingAds
-from .callouts import Callouts
-from .campaigns import Campaigns
-from .negative_keywords import NegativeKeywords
-from .reviews import Reviews
-from .sitelinks import Sitelinks
+# Modules of the exported names, which are only imported on first use.
+_EXPORTS = {
+    'AdExtensions': 'ad_extensions',
+    'AdGroups': 'ad_groups',
+    'BingAds': 'base',
+    'ConnectionSpec': 'base',
+    'Bulk': 'bulk',
+    'BulkJobFailed': 'bulk',
+    'FullSyncRequired': 'bulk',
+    'Callouts': 'callouts',
+    'Campaigns': 'campaigns',
+    'NegativeKeywords': 'negative_keywords',
+    'ReportFailed': 'reporting',
+    'Reporting': 'reporting',
+    'Reviews': 'reviews',
+    'Session': 'session',
+    'Sitelinks': 'sitelinks',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    """ Import the module of an exported name on first access. """
+    try:
+        module_name = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(
+            'module {module} has no attribute {name}'.format(
+                module=__name__, name=name)
+        )
+    value = getattr(_importlib.import_module('.' + module_name, __name__),
+                    name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+# Module level __getattr__ requires Python 3.7, older versions import all
+# services up front.
+if _sys.version_info < (3, 7):
+    for _name in __all__:
+        __getattr__(_name)
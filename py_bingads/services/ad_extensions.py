@@ -1,16 +1,14 @@
 # -*- coding: utf-8 -*-
 """ Wrapper class for Ad Extensions. """
-import collections as _collections
 import logging as _logging
 
 from py_bingads import _constants as _c
 from py_bingads import _utils
 from py_bingads import models as _models
+from py_bingads import soap as _soap
 
 from . import base as _base
 
-_logging.basicConfig(level=_logging.INFO)
-
 
 class AdExtensions(_base.BingAds):
     """ Wrapper for Ad Extensions service operations. """
@@ -20,8 +18,32 @@ class AdExtensions(_base.BingAds):
         self.ad_extension_class = None
         _base.BingAds.__init__(self, **kwargs)
 
+    def _get_ad_extension_types(self, ad_extension_types=None):
+        """Get the ad extension types to request: the given types, else the
+        type of this wrapper, else all types with a model.
+
+        :type ad_extension_types: [str] | None
+        :param ad_extension_types:
+          List of ad extension type names.
+
+        :rtype: [str]
+        :return:
+          Returned is a list of ad extension type names.
+        """
+        if ad_extension_types is None:
+            if self.ad_extension_class is not None:
+                return [self.ad_extension_class.TYPE_NAME]
+            return sorted(_models.AD_EXTENSION_CLASSES)
+
+        for ad_extension_type in ad_extension_types:
+            _utils.validate_membership(ad_extension_type,
+                                       _models.AD_EXTENSION_CLASSES,
+                                       name='ad_extension_type')
+        return list(ad_extension_types)
+
     @_utils.print_webfault
-    def get_ad_extensions_by_ids(self, ad_extension_ids):
+    def get_ad_extensions_by_ids(self, ad_extension_ids,
+                                 ad_extension_types=None):
         """Gets the specified ad extensions from the account's ad extension
         library.
 
@@ -33,6 +55,12 @@ class AdExtensions(_base.BingAds):
           A list of ad extension identifiers. You can specify a maximum of
           100 identifiers.
 
+        :type ad_extension_types: [str] | None
+        :param ad_extension_types:
+          List of ad extension type names to get. If several are given, each
+          ad extension is parsed with the model of its type. If not provided,
+          the type of this wrapper is used.
+
         :rtype: [_models.AdExtension]
         :return:
           Returned is a list of existing AdExtension objects.
@@ -40,6 +68,15 @@ class AdExtensions(_base.BingAds):
         if not ad_extension_ids:
             return []
 
+        ad_extension_types = self._get_ad_extension_types(ad_extension_types)
+        ad_extension_classes = _models.AD_EXTENSION_CLASSES
+        if len(ad_extension_types) == 1:
+            parse_kwargs = dict(
+                ad_extension_class=ad_extension_classes[ad_extension_types[0]]
+            )
+        else:
+            parse_kwargs = dict(ad_extension_classes=ad_extension_classes)
+
         ad_extensions = []
         for ad_extension_ids_chunk in _utils.chunked(
                 ad_extension_ids, chunk_size=self.predicate_list_limit):
@@ -48,11 +85,11 @@ class AdExtensions(_base.BingAds):
                 AdExtensionIds=_models.ArrayOflong(
                     ad_extension_ids_chunk
                 ).to_api_obj(),
-                AdExtensionType=self.ad_extension_class.TYPE_NAME,
+                AdExtensionType=' '.join(ad_extension_types),
             )
             ad_extensions.extend(
                 _models.ArrayOfAdExtension.from_api_obj(
-                    response, ad_extension_class=self.ad_extension_class
+                    response, **parse_kwargs
                 )
             )
 
@@ -60,37 +97,126 @@ class AdExtensions(_base.BingAds):
 
     @_utils.print_webfault
     def get_ad_extension_ids_by_account_id(self, # pylint: disable=invalid-name
-                                           association_type=None):
+                                           association_type=None,
+                                           ad_extension_types=None):
         """Gets the ad extension IDs from the account's ad extension library.
 
         https://msdn.microsoft.com/en-us/library/bing-ads-campaign-
         management-getadextensionidsbyaccountid.aspx
 
-        :type ad_extension_class: class
-        :param ad_extension_class:
-          A list of ad extension identifiers. You can specify a maximum of
-          100 identifiers.
-
         :type association_type: str
         :param association_type:
           A value that filters the extensions based on whether they're
           associated with a specific entity type.
 
+        :type ad_extension_types: [str] | None
+        :param ad_extension_types:
+          List of ad extension type names to get IDs of. If not provided, the
+          type of this wrapper is used.
+
         :rtype: [int]
         :return:
           Returns list of ad extension IDs for type and association for this
           account.
         """
-        response = self.campaign_service.GetAdExtensionIdsByAccountId(
-            AccountId=self.authorization_data.account_id,
-            AdExtensionType=self.ad_extension_class.TYPE_NAME,
-            AssociationType=association_type,
+        campaign_service = self.campaign_service
+        ad_extension_type = ' '.join(
+            self._get_ad_extension_types(ad_extension_types)
+        )
+        response = self._read_once(
+            'GetAdExtensionIdsByAccountId', lambda: (
+                campaign_service.GetAdExtensionIdsByAccountId(
+                    AccountId=self.authorization_data.account_id,
+                    AdExtensionType=ad_extension_type,
+                    AssociationType=association_type,
+                )
+            ), ad_extension_type, association_type
         )
         return _models.ArrayOflong.from_api_obj(response)
 
+    def get_ad_extensions_by_types(self, ad_extension_types=None,
+                                   association_type=None):
+        """Gets the ad extensions of several types from the account's ad
+        extension library in a single round of requests.
+
+        :type ad_extension_types: [str] | None
+        :param ad_extension_types:
+          List of ad extension type names, e.g. `_c.SITELINK`, `_c.CALLOUT`
+          and `_c.REVIEW_AD`. If not provided, all types with a model are
+          used.
+
+        :type association_type: str
+        :param association_type:
+          A value that filters the extensions based on whether they're
+          associated with a specific entity type.
+
+        :rtype: dict
+        :return:
+          Returned is a dict keyed on the requested ad extension types with
+          values of the list of corresponding ad extensions.
+        """
+        if ad_extension_types is None:
+            ad_extension_types = sorted(_models.AD_EXTENSION_CLASSES)
+        ad_extension_types = self._get_ad_extension_types(ad_extension_types)
+
+        ad_extension_ids = self.get_ad_extension_ids_by_account_id(
+            association_type=association_type,
+            ad_extension_types=ad_extension_types,
+        )
+        ad_extensions = {
+            ad_extension_type: [] for ad_extension_type in ad_extension_types
+        }
+        for ad_extension in self.get_ad_extensions_by_ids(
+                ad_extension_ids, ad_extension_types=ad_extension_types):
+            ad_extensions[ad_extension.TYPE_NAME].append(ad_extension)
+        return ad_extensions
+
+    def get_ad_extension_index(self, association_type=None):
+        """Gets the ad extensions from the account's ad extension library
+        indexed on their content.
+
+        :type association_type: str
+        :param association_type:
+          A value that filters the extensions based on whether they're
+          associated with a specific entity type.
+
+        :rtype: _models.AdExtensionIndex
+        :return:
+          Returned is the index of existing ad extensions, which also flags
+          duplicate ad extensions.
+        """
+        ad_extension_ids = self.get_ad_extension_ids_by_account_id(
+            association_type=association_type
+        )
+        return _models.AdExtensionIndex(
+            self.get_ad_extensions_by_ids(ad_extension_ids)
+        )
+
+    def delete_duplicate_ad_extensions(self, index=None):
+        """Deletes ad extensions whose content is identical to another ad
+        extension in the account's ad extension library, keeping the one with
+        the lowest ID.
+
+        :type index: _models.AdExtensionIndex | None
+        :param index:
+          Index of the ad extension library. If not provided, it is fetched.
+
+        :rtype: [int]
+        :return:
+          Returned are the IDs of the deleted ad extensions.
+        """
+        if index is None:
+            index = self.get_ad_extension_index()
+        duplicate_ids = index.duplicate_ids
+        _logging.info('Deleting %d duplicate ad extensions for account %d.',
+                      len(duplicate_ids), self.authorization_data.account_id)
+        self.delete_ad_extensions(duplicate_ids)
+        return duplicate_ids
+
     @_utils.print_webfault
-    def get_ad_extensions_associations(self,
-                                       association_type=None, entity_ids=None):
+    def get_ad_extensions_associations(self, association_type=None,
+                                       entity_ids=None,
+                                       ad_extension_types=None):
         """Gets the respective ad extension associations by the specified
         campaign and ad group identifiers.
 
@@ -107,39 +233,70 @@ class AdExtensions(_base.BingAds):
           The list of entity identifiers by which you may request the
           respective ad extension associations.
 
-        :rtype: dict
+        :type ad_extension_types: [str] | None
+        :param ad_extension_types:
+          List of ad extension type names to get associations of. If not
+          provided, the type of this wrapper is used.
+
+        :rtype: _models.AdExtensionAssociationIndex
         :return:
-          Returned is a dict keyed on an entity ID with values of the
-          given association type's list of corresponding ad extensions as per
-          the given ad extension type.
+          Returned is an index of all associations, keyed like a dict on
+          entity IDs with values of the list of corresponding ad extensions,
+          which also maps ad extension IDs to entity IDs.
         """
         _utils.validate_membership(association_type, _c.ASSOCIATION_TYPES,
                                    name='association_type')
+        associations = _models.AdExtensionAssociationIndex()
         if not entity_ids:
-            return {}
+            return associations
 
-        associations = _collections.defaultdict(list)
+        ad_extension_types = self._get_ad_extension_types(ad_extension_types)
         for entity_ids_chunk in _utils.chunked(
                 entity_ids, chunk_size=self.predicate_list_limit):
             response = self.campaign_service.GetAdExtensionsAssociations(
                 AccountId=self.authorization_data.account_id,
-                AdExtensionType=self.ad_extension_class.TYPE_NAME,
+                AdExtensionType=' '.join(ad_extension_types),
                 AssociationType=association_type,
                 EntityIds=_models.ArrayOflong(entity_ids_chunk).to_api_obj(),
             )
 
-            # TODO: refactor using model
-            for assoc_list in response.AdExtensionAssociationCollection[0]:
-                if not assoc_list.AdExtensionAssociations:
-                    continue
-                assoc = (assoc_list
-                         .AdExtensionAssociations.AdExtensionAssociation[0])
-                associations[assoc.EntityId].append(
-                    self.ad_extension_class.from_api_obj(assoc.AdExtension)
-                )
+            # One collection per entity, empty on partial errors.
+            for collection in response.AdExtensionAssociationCollection[0]:
+                for association in (
+                        _models.ArrayOfAdExtenionAssociation.from_api_obj(
+                            collection,
+                            ad_extension_classes=_models.AD_EXTENSION_CLASSES,
+                        )):
+                    associations.add(association)
 
         return associations
 
+    def get_association_matrix(self, association_type=None, entity_ids=None):
+        """Gets the ad extension associations of the specified entities as a
+        matrix of entity IDs by ad extension IDs.
+
+        :type association_type: str
+        :param association_type:
+          A value that filters the extensions based on whether they're
+          associated with a specific entity type.
+
+        :type entity_ids: [int]
+        :param entity_ids:
+          The list of entity identifiers by which you may request the
+          respective ad extension associations.
+
+        :rtype: _models.AssociationMatrix
+        :return:
+          Returned is the matrix of current associations, including rows for
+          entities without associations.
+        """
+        return _models.AssociationMatrix.from_ad_extension_associations(
+            self.get_ad_extensions_associations(
+                association_type=association_type, entity_ids=entity_ids
+            ),
+            row_ids=entity_ids,
+        )
+
     @_utils.print_webfault
     def update_ad_extensions(self, ad_extensions):
         """Updates one or more ad extensions within an account's ad extension
@@ -190,6 +347,13 @@ class AdExtensions(_base.BingAds):
             AccountId=self.authorization_data.account_id,
             AdExtensions=ad_extensions.to_api_obj(self.campaign_service)
         )
+        if self.dry_run:
+            # Nothing was added, so the planned ad extensions get placeholder
+            # IDs, which are associated like those of added ones.
+            return [
+                _models.AdExtensionIdentity(id=id_)
+                for id_ in self.plan.placeholder_ids(len(ad_extensions))
+            ]
         return _models.ArrayOfAdExtenionIdentity.from_api_obj(response)
 
     @_utils.print_webfault
@@ -225,32 +389,83 @@ class AdExtensions(_base.BingAds):
         )
 
     @_utils.print_webfault
-    def associate_campaign_ad_extensions(self,  # pylint: disable=invalid-name
-                                         associations):
-        """Associate associations of campaign IDs to ad extension IDs.
+    def associate_ad_extensions(self, associations,
+                                association_type=_c.CAMPAIGN):
+        """Associate entities of a type with ad extensions.
 
         :type associations: [(int, int)]
         :param associations:
-          List of tuples in which each tuple contains a campaign ID and an
+          List of tuples in which each tuple contains an entity ID and an
           ad extension ID.
+
+        :type association_type: str
+        :param association_type:
+          The type of the entities, one of `ASSOCIATION_TYPES`.
         """
         for associations_chunk in _utils.chunked(
                 associations, chunk_size=self.predicate_list_limit):
             association_array = []
-            for campaign_id, ad_extension_id in associations_chunk:
+            for entity_id, ad_extension_id in associations_chunk:
                 association = _models.AdExtensionIdToEntityIdAssociation(
                     ad_extension_id=ad_extension_id,
-                    entity_id=campaign_id
+                    entity_id=entity_id
                 )
                 association_array.append(association)
 
+            if self.direct_soap:
+                _soap.call(
+                    self.campaign_service, 'SetAdExtensionsAssociations',
+                    account_id=self.authorization_data.account_id,
+                    associations=association_array,
+                    association_type=association_type,
+                )
+                continue
             self.set_ad_extensions_associations(
                 associations=_models.ArrayOfAdExtensionIdToEntityIdAssociation(
                     association_array
                 ).to_api_obj(self.campaign_service),
-                association_type=_c.CAMPAIGN
+                association_type=association_type
             )
 
+    def associate_campaign_ad_extensions(self,  # pylint: disable=invalid-name
+                                         associations):
+        """Associate associations of campaign IDs to ad extension IDs.
+
+        :type associations: [(int, int)]
+        :param associations:
+          List of tuples in which each tuple contains a campaign ID and an
+          ad extension ID.
+        """
+        self.associate_ad_extensions(associations,
+                                     association_type=_c.CAMPAIGN)
+
+    def associate_all_campaigns(self, added_ids, kept_ids):
+        """Associate ad extensions with all campaigns of the account where
+        they are not associated yet.
+
+        Ad extensions which were just added have no associations, so only
+        the associations of kept ad extensions are read. The read takes one
+        call per `predicate_list_limit` campaigns, and saves at least as many
+        calls setting associations that exist already.
+
+        :type added_ids: [int]
+        :param added_ids:
+          IDs of ad extensions added to the library.
+
+        :type kept_ids: [int]
+        :param kept_ids:
+          IDs of ad extensions which were in the library already.
+        """
+        campaign_ids = [c.id for c in self.get_campaigns()]
+        missing = _models.AssociationMatrix.product(
+            campaign_ids, list(added_ids) + list(kept_ids)
+        )
+        if kept_ids:
+            missing -= self.get_association_matrix(
+                association_type=_c.CAMPAIGN, entity_ids=campaign_ids
+            )
+        self.associate_campaign_ad_extensions(list(missing))
+
     @_utils.print_webfault
     def delete_ad_extensions(self, ad_extension_ids):
         """Deletes one or more ad extensions from the account's ad
@@ -265,6 +480,13 @@ class AdExtensions(_base.BingAds):
 
         for ids_chunked in _utils.chunked(
                 ad_extension_ids, chunk_size=self.predicate_list_limit):
+            if self.direct_soap:
+                _soap.call(
+                    self.campaign_service, 'DeleteAdExtensions',
+                    account_id=self.authorization_data.account_id,
+                    ad_extension_ids=ids_chunked,
+                )
+                continue
             self.campaign_service.DeleteAdExtensions(
                 AccountId=self.authorization_data.account_id,
                 AdExtensionIds=_models.ArrayOflong(
@@ -61,6 +61,39 @@ class AdGroups(_base.BingAds):
         )
         return _models.ArrayOfAd.from_api_obj(response)
 
+    @_utils.print_webfault
+    def add_ad_groups(self, ad_groups, campaign_id=None):
+        """Adds ad groups to a campaign and sets their IDs.
+
+        https://msdn.microsoft.com/en-us/library/bing-ads-campaign-management-
+        addadgroups.aspx
+
+        :type ad_groups: [_models.AdGroup]
+        :param ad_groups:
+          A list that contains AdGroup objects to add.
+
+        :type campaign_id: int
+        :param campaign_id:
+          The identifier of the campaign to add the ad groups to.
+        """
+        assert campaign_id
+        for ad_group_chunk in _utils.chunked(
+                ad_groups, chunk_size=self.predicate_list_limit):
+            response = self.campaign_service.AddAdGroups(
+                AdGroups=_models.ArrayOfAdGroup(
+                    ad_groups=ad_group_chunk
+                ).to_api_obj(self.campaign_service),
+                CampaignId=campaign_id,
+            )
+            ad_group_ids = _models.ArrayOflong.from_api_obj(
+                response.AdGroupIds)
+            if self.dry_run:
+                ad_group_ids = self.plan.placeholder_ids(len(ad_group_chunk))
+            for ad_group, ad_group_id in zip(ad_group_chunk, ad_group_ids):
+                ad_group.id = ad_group_id
+                ad_group.campaign_id = campaign_id
+                ad_group.mark_clean()
+
     @_utils.print_webfault
     def update_ad_groups(self, ad_groups, campaign_id=None):
         """Updates the specified ad groups in a campaign.
@@ -81,10 +114,35 @@ class AdGroups(_base.BingAds):
                 ad_groups, chunk_size=self.predicate_list_limit):
             array_of_ad_group = _models.ArrayOfAdGroup(
                 ad_groups=ad_group_chunk
-            ).to_api_obj(self.campaign_service)
+            ).to_api_obj(self.campaign_service, only_dirty=True)
             self.campaign_service.UpdateAdGroups(
                 AdGroups=array_of_ad_group, CampaignId=campaign_id
             )
+            for ad_group in ad_group_chunk:
+                ad_group.mark_clean()
+
+    @_utils.print_webfault
+    def delete_ad_groups(self, ad_group_ids, campaign_id=None):
+        """Deletes ad groups from a campaign.
+
+        https://msdn.microsoft.com/en-us/library/bing-ads-campaign-management-
+        deleteadgroups.aspx
+
+        :type ad_group_ids: [int]
+        :param ad_group_ids:
+          The identifiers of the ad groups to delete.
+
+        :type campaign_id: int
+        :param campaign_id:
+          The identifier of the campaign that owns the ad groups to delete.
+        """
+        assert campaign_id
+        for ids_chunk in _utils.chunked(
+                ad_group_ids, chunk_size=self.predicate_list_limit):
+            self.campaign_service.DeleteAdGroups(
+                AdGroupIds=_models.ArrayOflong(longs=ids_chunk).to_api_obj(),
+                CampaignId=campaign_id,
+            )
 
     def get_ad_groups(self, campaign_ids=None):
         """Gets a list of AdGroup objects.
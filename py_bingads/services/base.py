@@ -3,21 +3,103 @@
 from __future__ import print_function
 import functools as _ft
 import logging as _logging
+import threading as _threading
+import time as _time
 
-from bingads import authorization as _authorization
-from bingads import service_client as _service_client
-from bingads import exceptions as _bing_exc
 from six import moves as _six_moves
 
+from py_bingads import auth as _auth
+from py_bingads import budget as _budget
 from py_bingads import _constants as _c
+from py_bingads import deadline as _deadline
 from py_bingads import models as _models
+from py_bingads import schema_cache as _schema_cache
 from py_bingads import _utils
 
-_logging.basicConfig(level=_logging.INFO)
-# _logging.getLogger('suds.client').setLevel(_logging.INFO)
-# _logging.getLogger('suds.transport.http').setLevel(_logging.INFO)
-# _logging.getLogger('suds.client').setLevel(_logging.DEBUG)
-# _logging.getLogger('suds.transport.http').setLevel(_logging.DEBUG)
+from . import proxy as _proxy
+from . import session as _session
+
+# The Bing Ads SDK builds a suds client at import time, so it is only
+# imported once a connection is made.
+_authorization = _utils.lazy_import('bingads.authorization')
+_service_client = _utils.lazy_import('bingads.service_client')
+_bing_exc = _utils.lazy_import('bingads.exceptions')
+_suds = _utils.lazy_import('suds')
+_suds_cache = _utils.lazy_import('suds.cache')
+
+# Account directories shared by all instances in the process, keyed on user.
+_ACCOUNT_DIRECTORIES = {}
+
+# IDs of the users of logins, see `BingAds._credentials_key`.
+_USER_IDS = {}
+
+# Reads in flight in the process, shared by all instances, so concurrent
+# identical reads of an account are sent once.
+_READS_IN_FLIGHT = _utils.SingleFlight()
+
+
+class ConnectionSpec(object):
+    """Represent the arguments a `BingAds` object was created with. Unlike
+    the object, which holds live service clients, a spec can be pickled and
+    sent to worker processes to create an equal object there.
+
+    Callbacks and the token store must be picklable too, e.g. module-level
+    functions and a `FileTokenStore`, which lets workers reuse the tokens of
+    the parent instead of refreshing them.
+
+    The password and developer token are pickled in plain text, so pickles
+    of specs and of `BingAds` objects are secrets: only send them to trusted
+    processes, e.g. over a local pipe, and never log or persist them.
+    """
+
+    FIELDS = (
+        'account_id', 'customer_id', 'developer_token', 'environment',
+        'client_id', 'client_state', 'authentication_type', 'username',
+        'password', 'get_refresh_token', 'save_refresh_token_callback',
+        'predicate_list_limit', 'token_store', 'schema_cache_dir',
+        'direct_soap', 'dry_run', 'rate_limiter', 'timeout',
+    )
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 account_id, customer_id, developer_token, environment,
+                 client_id, client_state, authentication_type, username,
+                 password, get_refresh_token, save_refresh_token_callback,
+                 predicate_list_limit, token_store, schema_cache_dir,
+                 direct_soap, dry_run, rate_limiter, timeout):
+        """ Init. """
+        self.account_id = account_id
+        self.customer_id = customer_id
+        self.developer_token = developer_token
+        self.environment = environment
+        self.client_id = client_id
+        self.client_state = client_state
+        self.authentication_type = authentication_type
+        self.username = username
+        self.password = password
+        self.get_refresh_token = get_refresh_token
+        self.save_refresh_token_callback = save_refresh_token_callback
+        self.predicate_list_limit = predicate_list_limit
+        self.token_store = token_store
+        self.schema_cache_dir = schema_cache_dir
+        self.direct_soap = direct_soap
+        self.dry_run = dry_run
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+
+    def __repr__(self):
+        return 'ConnectionSpec(account_id={account_id}, ' \
+            'customer_id={customer_id}, environment={environment})'.format(
+                account_id=self.account_id, customer_id=self.customer_id,
+                environment=self.environment)
+
+    def to_kwargs(self):
+        """ Return the keyword arguments to create a `BingAds` object. """
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+def _from_spec(cls, spec, kwargs=None):
+    """ Create a `BingAds` object when unpickling. """
+    return cls.from_spec(spec, **(kwargs or {}))
 
 
 class BingAds(object):
@@ -31,7 +113,11 @@ class BingAds(object):
                  authentication_type=_c.OAUTH, username=None, password=None,
                  get_refresh_token=_utils.get_refresh_token,
                  save_refresh_token_callback=_utils.save_refresh_token,
-                 predicate_list_limit=100):
+                 predicate_list_limit=100, token_store=None,
+                 interactive=True, schema_cache_dir=None,
+                 direct_soap=False, transport_factory=None, dry_run=False,
+                 call_budget=None, rate_limiter=None, timeout=None,
+                 hedging=None):
         """
         :type account_id: int
         :param account_id:
@@ -87,7 +173,100 @@ class BingAds(object):
         :type predicate_list_limit: int
         :param predicate_list_limit:
           Limits for number of items to send in service requests.
+
+        :type token_store: _auth.TokenStore | None
+        :param token_store:
+          Optional store of OAuth tokens keyed on customer and client ID,
+          used instead of `get_refresh_token` and
+          `save_refresh_token_callback`. Valid access tokens are reused by
+          all instances and refreshed by a single thread at a time.
+
+        :type interactive: bool
+        :param interactive:
+          Whether to prompt for user consent if there is no valid refresh
+          token. If False, `_auth.ConsentRequired` is raised instead.
+
+        :type schema_cache_dir: str | None
+        :param schema_cache_dir:
+          Optional directory of a cache of the parsed WSDLs of services,
+          versioned and, unlike the temporary cache of the SDK, without
+          expiry, see `py_bingads.schema_cache`.
+
+        :type direct_soap: bool
+        :param direct_soap:
+          Whether to render the envelopes of large batch requests, e.g. of
+          negative keywords and associations, directly from the models
+          instead of through suds objects, see `py_bingads.soap`.
+
+        :type transport_factory: callable | None
+        :param transport_factory:
+          Optional function creating the suds transport of each service
+          client, e.g. `transport` of a `py_bingads.transport.Recorder` to
+          record the traffic. Clients with such transports don't cache WSDLs
+          and schemas, so `schema_cache_dir` is ignored. Unlike the other
+          arguments, it isn't part of `spec`.
+
+        :type dry_run: bool
+        :param dry_run:
+          Whether to only record mutating calls in `plan` instead of sending
+          them, see `py_bingads.budget`.
+
+        :type call_budget: _budget.CallBudget | None
+        :param call_budget:
+          Optional budget of calls per account and operation, which may be
+          shared by several objects. It isn't part of `spec` either.
+
+        :type rate_limiter: py_bingads.rate_limit.RateLimiter | None
+        :param rate_limiter:
+          Optional limiter of the rate of calls per developer token, shared
+          by all processes of the host, see `py_bingads.rate_limit`.
+
+        :type timeout: float | None
+        :param timeout:
+          Socket timeout of calls in seconds, the one of suds if None. Calls
+          within a `deadline` get at most the time left.
+
+        :type hedging: py_bingads.hedging.Hedging | None
+        :param hedging:
+          Optional policy sending duplicates of slow idempotent reads, see
+          `py_bingads.hedging`. It isn't part of `spec`.
         """
+        self.spec = ConnectionSpec(
+            account_id=account_id, customer_id=customer_id,
+            developer_token=developer_token, environment=environment,
+            client_id=client_id, client_state=client_state,
+            authentication_type=authentication_type, username=username,
+            password=password, get_refresh_token=get_refresh_token,
+            save_refresh_token_callback=save_refresh_token_callback,
+            predicate_list_limit=predicate_list_limit,
+            token_store=token_store, schema_cache_dir=schema_cache_dir,
+            direct_soap=direct_soap, dry_run=dry_run,
+            rate_limiter=rate_limiter, timeout=timeout,
+        )
+        self.interactive = interactive
+        self.schema_cache_dir = schema_cache_dir
+        self.direct_soap = direct_soap
+        self.transport_factory = transport_factory
+        self.dry_run = dry_run
+        self.call_budget = call_budget
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.hedging = hedging
+        # Interceptors of all calls, in order, see `_proxy.ServiceProxy`.
+        self.interceptors = []
+        self.plan = None
+        if dry_run:
+            self.plan = _budget.Plan()
+            self.interceptors.append(_budget.DryRun(self.plan))
+        if call_budget is not None:
+            self.interceptors.append(call_budget)
+        # Last, so calls that are planned or stopped take no tokens.
+        if rate_limiter is not None:
+            self.interceptors.append(rate_limiter)
+        # After waiting for tokens, so the timeout is the time left.
+        self.interceptors.append(_deadline.Guard())
+        if hedging is not None:
+            self.interceptors.append(hedging)
         self._account_id = account_id  # Required?
         self.authorization_data = _authorization.AuthorizationData(
             account_id=account_id,
@@ -115,9 +294,34 @@ class BingAds(object):
                 'Authentication with oauth is only allowed in production.'
             )
             self.connect_with_oauth(client_id, client_state, get_refresh_token,
-                                    save_refresh_token_callback)
+                                    save_refresh_token_callback,
+                                    token_store=token_store)
+
+        # Service clients are not thread-safe, so each thread gets its own.
+        self._services_cache = _threading.local()
+        # Keyword arguments of subclasses, pickled along with `spec`.
+        self.subclass_kwargs = {}
+
+    @classmethod
+    def from_spec(cls, spec, **kwargs):
+        """Create an object from a connection spec, e.g. in a worker
+        process. Never prompts for user consent.
 
-        self._services_cache = {}
+        :type spec: ConnectionSpec
+        :param spec:
+          Spec of an existing object, see `spec`.
+
+        :param kwargs:
+          Additional keyword arguments of the class.
+        """
+        kwargs.update(spec.to_kwargs())
+        return cls(interactive=False, **kwargs)
+
+    def __reduce__(self):
+        """Pickle the connection spec and `subclass_kwargs` instead of the
+        service clients.
+        """
+        return _from_spec, (self.__class__, self.spec, self.subclass_kwargs)
 
     def connect_with_username(self, username, password):
         """ Connect using username and password. """
@@ -133,9 +337,13 @@ class BingAds(object):
                                                   password=password))
         self._connected = True
 
-    def connect_with_oauth(self, client_id, client_state, get_refresh_token,
-                           save_refresh_token_callback):
-        """ Connect using OAuth. """
+    def connect_with_oauth(self,  # pylint: disable=too-many-arguments
+                           client_id, client_state, get_refresh_token,
+                           save_refresh_token_callback, token_store=None):
+        """Connect using OAuth. The access tokens are renewed in the
+        background shortly before they expire, see
+        `py_bingads.auth.start_background_refresh`.
+        """
         assert client_id, (
             '`client_id` is required for authentication with oauth.'
         )
@@ -151,12 +359,14 @@ class BingAds(object):
         authentication.state = client_state
         self.authorization_data.authentication = authentication
 
-        self.authorization_data.authentication.token_refreshed_callback = \
-            save_refresh_token_callback
-
         def request_user_consent():
             """ Request user content. """
-            # TODO: Check whether using an interactive Python shell.
+            if not self.interactive:
+                raise _auth.ConsentRequired(
+                    'User consent is required, grant it at {endpoint} in an '
+                    'interactive session first.'.format(
+                        endpoint=authentication.get_authorization_endpoint())
+                )
             print(authentication.get_authorization_endpoint())
             response_uri = _six_moves.input(
                 'You need to provide consent for the application to access'
@@ -178,29 +388,80 @@ class BingAds(object):
                 response_uri=response_uri
             )
 
-        refresh_token = get_refresh_token()
-
-        # If we have a refresh token let's refresh it.
-        if refresh_token:
-            try:
-                authentication.request_oauth_tokens_by_refresh_token(
-                    refresh_token
-                )
-            except _bing_exc.OAuthTokenRequestException:
+        def refresh(refresh_token):
+            """ Request tokens, asking for consent if necessary. """
+            # If we have a refresh token let's refresh it.
+            if refresh_token:
+                try:
+                    authentication.request_oauth_tokens_by_refresh_token(
+                        refresh_token
+                    )
+                except _bing_exc.OAuthTokenRequestException:
+                    request_user_consent()
+            else:
                 request_user_consent()
-        else:
-            request_user_consent()
+            return _auth.tokens_from_oauth(authentication.oauth_tokens)
+
+        if token_store is None:
+            authentication.token_refreshed_callback = \
+                save_refresh_token_callback
+            refresh(get_refresh_token())
+            _auth.REFRESHER.register(authentication)
+            _auth.REFRESHER.start()
+            return
+
+        key = _auth.token_key(self.authorization_data.customer_id, client_id)
+        tokens = _auth.get_tokens(token_store, key, refresh)
+        _auth.set_oauth_tokens(authentication, _authorization.OAuthTokens(
+            access_token=tokens['access_token'],
+            access_token_expires_in_seconds=int(
+                tokens['expires_at'] - _time.time()
+            ),
+            refresh_token=tokens['refresh_token'],
+        ))
+        authentication.token_refreshed_callback = _ft.partial(
+            _auth.save_tokens, token_store, key
+        )
+        _auth.REFRESHER.register(authentication, key=key, store=token_store)
+        _auth.REFRESHER.start()
 
     def _get_service(self, name):
-        """ Get a service by it's name. """
-        if name not in self._services_cache:
-            self._services_cache[name] = _service_client.ServiceClient(
-                name,
-                authorization_data=self.authorization_data,
-                environment=self.env,
-                version=self.VERSION,
+        """ Get a service of the current thread by it's name. """
+        services = getattr(self._services_cache, 'services', None)
+        if services is None:
+            services = self._services_cache.services = {}
+        if name not in services:
+            services[name] = _proxy.ServiceProxy(
+                self.new_service_client(name), name, self,
             )
-        return self._services_cache[name]
+        return services[name]
+
+    def new_service_client(self, name):
+        """Create a client of a service by its name. Clients are not
+        thread-safe, so each is only used by one thread at a time.
+
+        :rtype: bingads.service_client.ServiceClient
+        """
+        options = {}
+        if self.schema_cache_dir is not None:
+            options['cache'] = _suds_cache.ObjectCache(
+                _schema_cache.cache_location(
+                    self.schema_cache_dir, self.VERSION, self.env)
+            )
+        if self.transport_factory is not None:
+            # Without a cache, the transport sees every WSDL and schema, so
+            # e.g. a `Recorder` records them even when suds has them cached.
+            options.update(transport=self.transport_factory(),
+                           cache=_suds_cache.NoCache())
+        if self.timeout is not None:
+            options['timeout'] = self.timeout
+        return _service_client.ServiceClient(
+            name,
+            authorization_data=self.authorization_data,
+            environment=self.env,
+            version=self.VERSION,
+            **options
+        )
 
     def __getattr__(self, item):
         """Get a service; if service doesn't exit, raise AttributeError.
@@ -220,51 +481,227 @@ class BingAds(object):
             '`BingAdsBase` has no attribute `{item}`.'.format(item=item)
         )
 
+    def _read_once(self, operation, func, *args):
+        """Send a read of the account unless an identical read is in flight
+        in another thread, in which case its response is shared. Responses
+        are shared as they are, so callers must not modify them.
+
+        :type operation: str
+        :param operation:
+          Name of the operation.
+
+        :param func:
+          Function sending the read.
+
+        :param args:
+          Hashable arguments of the read, which are part of its key.
+
+        :return:
+          Returned is the response of the read.
+        """
+        # Users see different data of the same account, so reads are only
+        # shared by instances with the same login.
+        key = self._credentials_key() + (
+            self.authorization_data.customer_id,
+            self.authorization_data.account_id, operation, args)
+        return _READS_IN_FLIGHT.do(key, func)
+
     @property
     def campaign_service(self):
         """ Get Campaign Management Service. """
         return self.get_campaign_service()
 
+    def deadline(self, timeout=None):
+        """Bound the time of all calls within a block, e.g. of a method and
+        its chunked calls, see `py_bingads.deadline`::
+
+            with campaigns.deadline(60) as scope:
+                campaigns.get_ad_groups()
+
+        :type timeout: float | None
+        :param timeout:
+          Number of seconds until the deadline.
+
+        :return:
+          Returned is a context manager yielding the `_deadline.Scope`,
+          which can be cancelled from other threads.
+        """
+        return _deadline.scope(timeout)
+
+    def session(self, workers=4):
+        """Start a unit of work, which collects adds, updates, deletes and
+        associations of entities and sends them in batches when it's
+        flushed, e.g. on exit of a `with` block.
+
+        :type workers: int
+        :param workers:
+          Number of calls to send in parallel.
+
+        :rtype: _session.Session
+        """
+        return _session.Session(self, workers=workers)
+
     def get_current_user_id(self):
         """ Get the user id for the currently logged in user of the API obj. """
         customer_service = self.get_customer_service()
         user = customer_service.GetUser(None)
         return user.User.Id
 
-    def get_accounts_for_user_id(self, user_id=None):
+    def get_accounts_for_user_id(self, user_id=None,
+                                 page_size=_c.SEARCH_ACCOUNTS_PAGE_SIZE,
+                                 prefetch_pages=_c.PREFETCH_REQUESTS,
+                                 modified_since=None):
         """Get accounts that this user has access to.
 
+        The first page is requested on its own; if it is full, the following
+        pages are requested `prefetch_pages` at a time in parallel until a
+        page comes back short.
+
         :type user_id: int | None
         :param user_id:
           Optionally provide a user ID to get accounts.
 
+        :type page_size: int
+        :param page_size:
+          Number of accounts to request per page, at most 1,000.
+
+        :type prefetch_pages: int
+        :param prefetch_pages:
+          Number of pages to request in parallel after the first page.
+
+        :type modified_since: datetime.datetime | None
+        :param modified_since:
+          Optionally only get accounts modified after this time.
+
         :rtype: [_models.Account]
         :return:
           Returned is a list of accounts for user.
         """
-        customer_service = self.get_customer_service()
+        assert 0 < page_size <= _c.SEARCH_ACCOUNTS_PAGE_SIZE
         if user_id is None:
             user_id = self.get_current_user_id()
 
-        paging = dict(Index=0, Size=10)
         predicates = dict(Predicate=[
             dict(Field='UserId', Operator='Equals', Value=user_id)
         ])
+        if modified_since is not None:
+            predicates['Predicate'].append(dict(
+                Field='LastModifiedTime', Operator='GreaterThan',
+                Value=modified_since.isoformat(),
+            ))
+
+        def search_accounts(index):
+            """ Get a single page of accounts. """
+            response = self.get_customer_service().SearchAccounts(
+                PageInfo=dict(Index=index, Size=page_size),
+                Predicates=predicates,
+            )
+            return [
+                _models.Account.from_api_obj(acc) for acc in response.Account
+            ] if response else []
 
         ret = []
-        response = customer_service.SearchAccounts(
-            PageInfo=paging, Predicates=predicates
-        )
-        while response:
-            ret.extend(
-                [_models.Account.from_api_obj(acc) for acc in response.Account]
-            )
-            paging['Index'] += 1
-            response = customer_service.SearchAccounts(
-                PageInfo=paging, Predicates=predicates
-            )
+        indexes = [0]
+        while indexes:
+            pages = _utils.thread_map(search_accounts, indexes,
+                                      workers=prefetch_pages)
+            for page in pages:
+                ret.extend(page)
+                if len(page) < page_size:  # Last page, ignore the rest.
+                    indexes = []
+                    break
+            else:
+                indexes = list(_six_moves.range(
+                    indexes[-1] + 1, indexes[-1] + 1 + prefetch_pages))
         return ret
 
+    def _credentials_key(self):
+        """Identify the login of the object, so data of its user can be
+        shared by instances without asking for the user.
+        """
+        spec = self.spec
+        if spec.authentication_type == _c.USERNAME:
+            login = spec.username
+        else:
+            login = _auth.token_key(spec.customer_id, spec.client_id)
+        return self.env, spec.authentication_type, login
+
+    def _get_user_id(self):
+        """ Get the ID of the current user, asking only once per login. """
+        key = self._credentials_key()
+        user_id = _USER_IDS.get(key)
+        if user_id is None:
+            user_id = _USER_IDS[key] = self.get_current_user_id()
+        return user_id
+
+    def get_account_directory(self, user_id=None, max_age=3600,
+                              full_refresh_age=86400):
+        """Get a directory of accounts that this user has access to. The
+        directory is shared by all instances in the process and is refreshed
+        by one of them once it is older than `max_age` seconds. Refreshes
+        only list the accounts modified since the last one, except every
+        `full_refresh_age` seconds, when all accounts are listed to find
+        removed ones.
+
+        :type user_id: int | None
+        :param user_id:
+          Optionally provide a user ID to get accounts.
+
+        :type max_age: int
+        :param max_age:
+          Number of seconds after which to refresh the directory.
+
+        :type full_refresh_age: int
+        :param full_refresh_age:
+          Number of seconds after which to list all accounts again.
+
+        :rtype: _models.AccountDirectory
+        :return:
+          Returned is the directory of accounts for user.
+        """
+        if user_id is None:
+            user_id = self._get_user_id()
+
+        directory = _ACCOUNT_DIRECTORIES.setdefault(
+            user_id, _models.AccountDirectory()
+        )
+        if not directory.is_stale(max_age):
+            return directory
+        with directory.lock:
+            # Another caller may have refreshed it while we waited.
+            if directory.is_stale(max_age):
+                self._refresh_account_directory(
+                    directory, user_id, full_refresh_age)
+        return directory
+
+    def _refresh_account_directory(self, directory, user_id,
+                                   full_refresh_age):
+        """ List the modified or all accounts of a user into a directory. """
+        modified_since = directory.last_modified_time
+        if directory.incremental and modified_since is not None and \
+                _time.time() - directory.listed_at <= full_refresh_age:
+            try:
+                added, changed = directory.merge(self.get_accounts_for_user_id(
+                    user_id, modified_since=modified_since))
+            except _suds.WebFault:
+                _logging.warning('Accounts cannot be listed by modification '
+                                 'time, listing all of them instead.')
+                directory.incremental = False
+            else:
+                _logging.info(
+                    'Refreshed account directory for user %d: %d added, '
+                    '%d changed.', user_id, len(added), len(changed)
+                )
+                return
+        added, changed, removed = directory.update(
+            self.get_accounts_for_user_id(user_id)
+        )
+        _logging.info(
+            'Refreshed account directory for user %d: %d added, '
+            '%d changed, %d removed.',
+            user_id, len(added), len(changed), len(removed)
+        )
+
     @_utils.print_webfault
     def get_campaigns(self):
         """Get a list of campaigns.
@@ -275,8 +712,12 @@ class BingAds(object):
         """
         campaign_service = self.get_campaign_service()
 
-        response = campaign_service.GetCampaignsByAccountId(
-            AccountId=self.authorization_data.account_id
+        response = self._read_once(
+            'GetCampaignsByAccountId', lambda: (
+                campaign_service.GetCampaignsByAccountId(
+                    AccountId=self.authorization_data.account_id
+                )
+            )
         )
         return _models.ArrayOfCampaign.from_api_obj(response)
 
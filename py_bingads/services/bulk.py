@@ -0,0 +1,441 @@
+#!/usr/bin/env python
+""" Wrapper class for the Bulk service. """
+import contextlib as _contextlib
+import logging as _logging
+import os as _os
+import tempfile as _tempfile
+import time as _time
+import uuid as _uuid
+import zipfile as _zipfile
+
+from py_bingads import _constants as _c
+from py_bingads import _utils
+from py_bingads import deadline as _deadline
+from py_bingads import models as _models
+
+from . import base as _base
+
+_urllib_request = _utils.lazy_import('six.moves.urllib.request')
+
+
+class BulkJobFailed(RuntimeError):
+    """ Raised when a bulk job does not complete. """
+
+
+class FullSyncRequired(BulkJobFailed):
+    """Raised when a download since a last sync time is rejected, and all
+    entities have to be downloaded again.
+    """
+
+
+class _MultipartFile(object):
+    """Multipart form data body of a single file, which is read from disk in
+    blocks while it is sent instead of being held in memory.
+    """
+
+    def __init__(self, file, boundary, filename, content_type):
+        """
+        :type file: file
+        :param file:
+          Binary file to send, open at its start.
+
+        :type boundary: str
+        :param boundary:
+          Boundary of the parts of the body.
+        """
+        self.head = (
+            '--{boundary}\r\n'
+            'Content-Disposition: form-data; name="file"; '
+            'filename="{filename}"\r\n'
+            'Content-Type: {content_type}\r\n\r\n'.format(
+                boundary=boundary, filename=filename,
+                content_type=content_type)
+        ).encode('ascii')
+        self.tail = '\r\n--{0}--\r\n'.format(boundary).encode('ascii')
+        self.file = file
+        self.size = (len(self.head) + _os.fstat(file.fileno()).st_size +
+                     len(self.tail))
+        self._parts = [self.head, self.file, self.tail]
+
+    def __len__(self):
+        return self.size
+
+    def read(self, size=-1):
+        """ Read up to `size` bytes of the body, all that is left if < 0. """
+        chunks = []
+        while self._parts and (size < 0 or size > 0):
+            part = self._parts[0]
+            if isinstance(part, bytes):
+                chunk = part if size < 0 else part[:size]
+                if len(chunk) == len(part):
+                    self._parts.pop(0)
+                else:
+                    self._parts[0] = part[len(chunk):]
+            else:
+                chunk = part.read(size)
+                if size < 0 or len(chunk) < size:
+                    self._parts.pop(0)
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b''.join(chunks)
+
+
+class Bulk(_base.BingAds):
+    """Wrapper for Bulk service operations. A whole account is downloaded as a
+    single bulk file, which is parsed into models one row at a time, and any
+    number of changes are uploaded as a single bulk file.
+    """
+
+    def __init__(self, poll_interval=5, poll_timeout=3600, **kwargs):
+        """
+        :type poll_interval: int
+        :param poll_interval:
+          Number of seconds to wait before the first status check of a bulk
+          job. The wait doubles after every check, up to a minute.
+
+        :type poll_timeout: int
+        :param poll_timeout:
+          Number of seconds after which to give up waiting on a bulk job.
+        """
+        _base.BingAds.__init__(self, **kwargs)
+        self.poll_interval = poll_interval
+        self.poll_timeout = poll_timeout
+        self.subclass_kwargs.update(poll_interval=poll_interval,
+                                    poll_timeout=poll_timeout)
+
+    @property
+    def bulk_service(self):
+        """ Get Bulk Service. """
+        return self.get_bulk_service()
+
+    @_utils.print_webfault
+    def submit_download(self, download_entities=_c.BULK_DOWNLOAD_ENTITIES,
+                        last_sync_time=None, data_scope='EntityData'):
+        """Submit a job to download the entities of the account.
+
+        :type download_entities: iter
+        :param download_entities:
+          Iterable of the types of entities to download.
+
+        :type last_sync_time: datetime.datetime | None
+        :param last_sync_time:
+          Only download entities changed since this time in UTC, which is the
+          sync time of a previous download.
+
+        :type data_scope: str
+        :param data_scope:
+          Space separated scopes of data to download.
+
+        :rtype: str
+        :return:
+          Returned is the ID of the download request.
+        """
+        entities = self.bulk_service.factory.create('ArrayOfDownloadEntity')
+        entities.DownloadEntity = list(download_entities)
+        return self.bulk_service.DownloadCampaignsByAccountIds(
+            AccountIds={'long': [self._account_id]},
+            DataScope=data_scope,
+            DownloadFileType='Csv',
+            DownloadEntities=entities,
+            FormatVersion=_c.BULK_FORMAT_VERSION,
+            LastSyncTimeInUTC=last_sync_time,
+        )
+
+    def _poll(self, get_status, request_id):
+        """ Wait until a bulk job is finished and return its final status. """
+        deadline = _time.time() + self.poll_timeout
+        interval = self.poll_interval
+        while True:
+            status = get_status(RequestId=request_id)
+            if status.RequestStatus in _c.BULK_FINISHED_STATUSES:
+                break
+            if _time.time() + interval > deadline:
+                raise BulkJobFailed(
+                    'Bulk job {request_id} did not finish within {timeout} '
+                    'seconds.'.format(request_id=request_id,
+                                      timeout=self.poll_timeout)
+                )
+            _logging.info('Bulk job %s is %s%% complete.',
+                          request_id, status.PercentComplete)
+            _deadline.sleep(interval)
+            interval = min(interval * 2, 60)
+
+        if status.RequestStatus == _c.BULK_FAILED_FULL_SYNC_REQUIRED:
+            raise FullSyncRequired(
+                'Bulk job {request_id} requires a full sync.'.format(
+                    request_id=request_id)
+            )
+        if status.RequestStatus not in (_c.BULK_COMPLETED,
+                                        _c.BULK_COMPLETED_WITH_ERRORS):
+            raise BulkJobFailed(
+                'Bulk job {request_id} failed: {errors}'.format(
+                    request_id=request_id, errors=status.Errors)
+            )
+        return status
+
+    @_utils.print_webfault
+    def poll_download(self, request_id):
+        """Wait until a download job is finished.
+
+        :type request_id: str
+        :param request_id:
+          ID of the download request.
+
+        :rtype: str
+        :return:
+          Returned is the URL of the result file.
+        """
+        status = self._poll(self.bulk_service.GetBulkDownloadStatus,
+                            request_id)
+        return status.ResultFileUrl
+
+    def download_file(self, url):
+        """Download a bulk file with the socket timeout of calls, see
+        `_utils.download_file`.
+
+        :rtype: str
+        :return:
+          Returned is the path of the downloaded file.
+        """
+        return _utils.download_file(url, timeout=self.timeout)
+
+    def download_rows(self, download_entities=_c.BULK_DOWNLOAD_ENTITIES,
+                      last_sync_time=None, url=None):
+        """Download entities of the account and yield the rows of the bulk
+        file one at a time as dicts keyed on column names.
+
+        :type download_entities: iter
+        :param download_entities:
+          Iterable of the types of entities to download.
+
+        :type last_sync_time: datetime.datetime | None
+        :param last_sync_time:
+          Only download entities changed since this time in UTC.
+
+        :type url: str | None
+        :param url:
+          URL of an existing bulk file to read instead of submitting a job,
+          e.g. a `file://` URL of a local stand-in.
+        """
+        if url is None:
+            url = self.poll_download(self.submit_download(
+                download_entities=download_entities,
+                last_sync_time=last_sync_time,
+            ))
+
+        path = self.download_file(url)
+        try:
+            with _models.open_bulk_file(path) as stream:
+                for row in _models.iter_bulk_rows(stream):
+                    yield row
+        finally:
+            _os.remove(path)
+
+    def download_entities(self, download_entities=_c.BULK_DOWNLOAD_ENTITIES,
+                          last_sync_time=None, url=None):
+        """Download entities of the account and yield them one at a time as
+        models, such as `Campaign`, `AdGroup` or `Keyword`. Takes the same
+        arguments as `download_rows`.
+        """
+        for row in self.download_rows(download_entities=download_entities,
+                                      last_sync_time=last_sync_time, url=url):
+            model = _models.parse_bulk_row(row)
+            if model is not None:
+                yield model
+
+    def sync_mirror(self, mirror=None, path=None,
+                    download_entities=_c.BULK_DOWNLOAD_ENTITIES):
+        """Bring a local mirror of the account up to date. Only entities
+        changed since the last sync of the mirror are downloaded, unless the
+        mirror is empty or the Bulk service requires a full sync.
+
+        :type mirror: _models.AccountMirror | None
+        :param mirror:
+          Mirror to update, defaults to the one loaded from `path`.
+
+        :type path: str | None
+        :param path:
+          Path of the file in which the mirror is persisted, also of a given
+          mirror. The mirror is saved after a successful sync.
+
+        :type download_entities: iter
+        :param download_entities:
+          Iterable of the types of entities to mirror.
+
+        :rtype: _models.AccountMirror
+        :return:
+          Returned is the updated mirror.
+        """
+        if mirror is None:
+            if path is None:
+                mirror = _models.AccountMirror(self._account_id)
+            else:
+                mirror = _models.AccountMirror.load(self._account_id, path)
+        elif path is not None:
+            mirror.path = path
+
+        try:
+            upserted, deleted = mirror.apply(self.download_rows(
+                download_entities=download_entities,
+                last_sync_time=mirror.last_sync_time,
+            ))
+        except FullSyncRequired:
+            _logging.info('Full sync required for account %s.',
+                          self._account_id)
+            mirror.clear()
+            upserted, deleted = mirror.apply(self.download_rows(
+                download_entities=download_entities,
+            ))
+        _logging.info(
+            'Synced account %s: %d added or updated, %d deleted.',
+            self._account_id, upserted, deleted
+        )
+
+        if mirror.path:
+            mirror.save()
+        return mirror
+
+    def new_upload(self):
+        """Create a writer of a bulk file to upload with `upload`.
+
+        :rtype: _models.BulkFileWriter
+        :return:
+          Returned is a writer of a new temporary CSV file.
+        """
+        file_descriptor, path = _tempfile.mkstemp(suffix='.csv')
+        _os.close(file_descriptor)
+        return _models.BulkFileWriter(path, account_id=self._account_id)
+
+    def _post_file(self, url, path):
+        """Post a file to an upload URL as multipart form data. The file is
+        streamed with an explicit Content-Length.
+        """
+        boundary = _uuid.uuid4().hex
+        with open(path, 'rb') as file:
+            body = _MultipartFile(file, boundary, filename='upload.zip',
+                                  content_type='application/zip')
+            headers = {
+                'DeveloperToken': self.authorization_data.developer_token,
+                'CustomerId': str(self.authorization_data.customer_id),
+                'AccountId': str(self.authorization_data.account_id),
+                'Content-Type':
+                    'multipart/form-data; boundary={0}'.format(boundary),
+                'Content-Length': str(len(body)),
+            }
+            self.authorization_data.authentication.enrich_headers(headers)
+            request = _urllib_request.Request(url, data=body, headers=headers)
+            with _contextlib.closing(_utils.urlopen(
+                    request, timeout=self.timeout)) as response:
+                response.read()
+
+    @_utils.print_webfault
+    def upload_file(self, path, response_mode='ErrorsAndResults'):
+        """Upload a CSV bulk file and wait until it is applied.
+
+        :type path: str
+        :param path:
+          Path of the CSV bulk file, which is zipped for the upload.
+
+        :type response_mode: str
+        :param response_mode:
+          Either `ErrorsOnly` or `ErrorsAndResults`.
+
+        :rtype: str | None
+        :return:
+          Returned is the path of the downloaded result file, or None in a
+          dry run, which only plans the upload.
+        """
+        if self.dry_run:
+            with open(path, 'rb') as file:
+                rows = sum(1 for row in _models.iter_bulk_rows(file)
+                           if row.get('Type') != 'Format Version')
+            self.plan.add(self._account_id, _c.BULK_SERVICE,
+                          'GetBulkUploadUrl', rows)
+            return None
+        response = self.bulk_service.GetBulkUploadUrl(
+            AccountId=self._account_id,
+            ResponseMode=response_mode,
+        )
+        zip_path = path + '.zip'
+        zip_file = _zipfile.ZipFile(zip_path, 'w', _zipfile.ZIP_DEFLATED)
+        with _contextlib.closing(zip_file):
+            zip_file.write(path, 'upload.csv')
+        try:
+            self._post_file(response.UploadUrl, zip_path)
+        finally:
+            _os.remove(zip_path)
+
+        status = self._poll(self.bulk_service.GetBulkUploadStatus,
+                            response.RequestId)
+        return self.download_file(status.ResultFileUrl)
+
+    def upload(self, writer):
+        """Upload the file of a writer as a single bulk job and map the result
+        file back to the written models. The file is removed afterwards.
+
+        :type writer: _models.BulkFileWriter
+        :param writer:
+          Writer of the bulk file, e.g. from `new_upload`.
+
+        :rtype: [_models.BulkResult]
+        :return:
+          Returned are the results of the written models in order, none in
+          a dry run.
+        """
+        writer.close()
+        try:
+            result_path = self.upload_file(writer.path)
+            if result_path is None:
+                return []
+            try:
+                results = writer.read_results(result_path)
+            finally:
+                _os.remove(result_path)
+        finally:
+            _os.remove(writer.path)
+
+        failed = [result for result in results if not result.succeeded]
+        if failed:
+            _logging.warning('%d of %d bulk rows failed.',
+                             len(failed), len(results))
+        return results
+
+    def upload_entities(self, entities):
+        """Upload models, such as `Campaign`, `AdGroup` or
+        `Sitelink2AdExtension` objects, as a single bulk job.
+
+        :type entities: iter
+        :param entities:
+          Iterable of models with a `to_bulk_row` method.
+
+        :rtype: [_models.BulkResult]
+        :return:
+          Returned are the results of the models in order.
+        """
+        writer = self.new_upload()
+        for entity in entities:
+            writer.write(entity)
+        return self.upload(writer)
+
+    def change_campaign_status(self, campaign_ids, status):
+        """Change the status of campaigns with a single bulk job.
+
+        :type campaign_ids: iter
+        :param campaign_ids:
+          Iterable of campaign IDs.
+
+        :type status: str
+        :param status:
+          Status can be 'Active' or 'Paused'.
+
+        :rtype: [_models.BulkResult]
+        :return:
+          Returned are the results of the campaigns in order.
+        """
+        _utils.validate_membership(status, _c.CAMPAIGN_STATUSES,
+                                   name='status')
+        return self.upload_entities(
+            _models.Campaign(id=campaign_id, status=status)
+            for campaign_id in campaign_ids
+        )
@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 """ Wrapper class for Callouts. """
-import logging as _logging
 import operator as _op
 
 from py_bingads import _constants as _c
@@ -9,8 +8,6 @@ from py_bingads import models as _models
 
 from . import ad_extensions as _ad_extensions
 
-_logging.basicConfig(level=_logging.INFO)
-
 
 class MaximumExtensionsExceeded(ValueError):
     """ The maximum number of accepted extensions has been exceeded """
@@ -60,10 +57,10 @@ class Callouts(_ad_extensions.AdExtensions):
           Iterable of campaign IDs. If not provided, all campaign IDs for
           account will be used.
 
-        :rtype: dict
+        :rtype: _models.AdExtensionAssociationIndex
         :return:
-          Returned is a dict keyed on a campaign ID with values as a list of
-          corresponding callouts.
+          Returned is an index keyed like a dict on a campaign ID with values
+          as a list of corresponding callouts.
         """
         if not campaign_ids:
             campaign_ids = [c.id for c in self.get_campaigns()]
@@ -92,8 +89,9 @@ class Callouts(_ad_extensions.AdExtensions):
             callouts,
             key=_op.attrgetter('key')
         ))
+        remote_index = _models.AdExtensionIndex(self.get_callouts())
         remote_callouts = ((callout.key, callout) for callout in sorted(
-            self.get_callouts(),
+            remote_index,
             key=_op.attrgetter('key')
         ))
 
@@ -113,6 +111,9 @@ class Callouts(_ad_extensions.AdExtensions):
                 callouts_to_keep.append(remote)
                 seen_keys.add(key)
 
+        # Also delete remote callouts identical to another remote callout.
+        callout_ids_to_delete.extend(remote_index.duplicate_ids)
+
         # Delete first to make room for the new. Bing also deletes campaign
         # associations along with the object.
         self.delete_ad_extensions(callout_ids_to_delete)
@@ -124,10 +125,8 @@ class Callouts(_ad_extensions.AdExtensions):
         for id_, callout in zip(added_callout_ids, callouts_to_add):
             callout.id = id_.id
 
-        # Associate new and existing callouts.
-        campaign_ids = [c.id for c in self.get_campaigns()]
-        self.associate_campaign_ad_extensions([
-            (campaign_id, callout.id)
-            for campaign_id in campaign_ids
-            for callout in callouts_to_add + callouts_to_keep
-        ])
+        # Associate new and existing callouts where not associated yet.
+        self.associate_all_campaigns(
+            added_ids=[callout.id for callout in callouts_to_add],
+            kept_ids=[callout.id for callout in callouts_to_keep],
+        )
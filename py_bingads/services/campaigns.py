@@ -1,6 +1,5 @@
 #!/usr/bin/env python
 """ Wrapper class for Campaigns. """
-import logging as _logging
 
 from py_bingads import _constants as _c
 from py_bingads import _utils
@@ -8,8 +7,6 @@ from py_bingads import models as _models
 
 from . import base as _base
 
-_logging.basicConfig(level=_logging.INFO)
-
 
 class Campaigns(_base.BingAds):
     """ Wrapper for Campaign service operations. """
@@ -18,6 +15,33 @@ class Campaigns(_base.BingAds):
         """ Initialize Campaigns. """
         _base.BingAds.__init__(self, **kwargs)
 
+    @_utils.print_webfault
+    def add_campaigns(self, campaigns):
+        """Adds campaigns to the account and sets their IDs.
+
+        https://msdn.microsoft.com/en-us/library/bing-ads-campaign-management-
+        addcampaigns.aspx
+
+        :type campaigns: [_models.Campaign]
+        :param campaigns:
+          A list that contains Campaign objects to add.
+        """
+        for campaign_chunk in _utils.chunked(
+                campaigns, chunk_size=self.predicate_list_limit):
+            response = self.campaign_service.AddCampaigns(
+                AccountId=self._account_id,
+                Campaigns=_models.ArrayOfCampaign(
+                    campaigns=campaign_chunk
+                ).to_api_obj(self.campaign_service),
+            )
+            campaign_ids = _models.ArrayOflong.from_api_obj(
+                response.CampaignIds)
+            if self.dry_run:
+                campaign_ids = self.plan.placeholder_ids(len(campaign_chunk))
+            for campaign, campaign_id in zip(campaign_chunk, campaign_ids):
+                campaign.id = campaign_id
+                campaign.mark_clean()
+
     @_utils.print_webfault
     def update_campaigns(self, campaigns):
         """Updates specified campaigns in a specified account.
@@ -30,11 +54,31 @@ class Campaigns(_base.BingAds):
                 campaigns, chunk_size=self.predicate_list_limit):
             array_of_campaigns = _models.ArrayOfCampaign(
                 campaigns=campaign_chunk
-            ).to_api_obj(self.campaign_service)
+            ).to_api_obj(self.campaign_service, only_dirty=True)
             self.campaign_service.UpdateCampaigns(
                 AccountId=self._account_id,
                 Campaigns=array_of_campaigns,
             )
+            for campaign in campaign_chunk:
+                campaign.mark_clean()
+
+    @_utils.print_webfault
+    def delete_campaigns(self, campaign_ids):
+        """Deletes campaigns from the account.
+
+        https://msdn.microsoft.com/en-us/library/bing-ads-campaign-management-
+        deletecampaigns.aspx
+
+        :type campaign_ids: [int]
+        :param campaign_ids:
+          The identifiers of the campaigns to delete.
+        """
+        for ids_chunk in _utils.chunked(
+                campaign_ids, chunk_size=self.predicate_list_limit):
+            self.campaign_service.DeleteCampaigns(
+                AccountId=self._account_id,
+                CampaignIds=_models.ArrayOflong(longs=ids_chunk).to_api_obj(),
+            )
 
     def change_campaign_status(self, campaign_ids, status):
         """Change the status of a list of campaigns.
@@ -1,16 +1,14 @@
 #!/usr/bin/env python
 """ Wrapper class for Negative Keywords (Shared Entities). """
 import itertools as _it
-import logging as _logging
 
 from py_bingads import _constants as _c
 from py_bingads import _utils
 from py_bingads import models as _models
+from py_bingads import soap as _soap
 
 from . import base as _base
 
-_logging.basicConfig(level=_logging.INFO)
-
 # pylint: disable=invalid-name
 
 
@@ -34,8 +32,13 @@ class NegativeKeywords(_base.BingAds):
           Returned is a list of negative keywords from the account's shared
           library.
         """
-        response = self.campaign_service.GetSharedEntitiesByAccountId(
-            SharedEntityType=self.shared_entity_type
+        campaign_service = self.campaign_service
+        response = self._read_once(
+            'GetSharedEntitiesByAccountId', lambda: (
+                campaign_service.GetSharedEntitiesByAccountId(
+                    SharedEntityType=self.shared_entity_type
+                )
+            ), self.shared_entity_type
         )
         return _models.ArrayOfNegativeKeywordList.from_api_obj(response)
 
@@ -146,14 +149,21 @@ class NegativeKeywords(_base.BingAds):
 
         """
         # TODO: Test
-        if len(list_items) > 0:
+        if not list_items:
+            return []
+        if self.direct_soap:
+            response = _soap.call(
+                self.campaign_service, 'AddListItemsToSharedList',
+                shared_list=shared_list,
+                list_items=list_items.shared_list_items,
+            )
+        else:
             response = self.campaign_service.AddListItemsToSharedList(
                 SharedList=shared_list.to_api_obj(self.campaign_service),
                 ListItems=list_items.to_api_obj(self.campaign_service),
             )
-            # FIXME: make pythonic
-            return response.ListItemIds.long
-        return []
+        # FIXME: make pythonic
+        return response.ListItemIds.long
 
     def add_negative_keywords(self, list_id, negative_keywords):
         """Adds a list of negative keywords to a negative keyword list.
@@ -212,6 +222,13 @@ class NegativeKeywords(_base.BingAds):
         # TODO: Test
         if not keyword_ids:
             return
+        if self.direct_soap:
+            _soap.call(
+                self.campaign_service, 'DeleteListItemsFromSharedList',
+                shared_list=_models.NegativeKeywordList(id=list_id),
+                list_item_ids=keyword_ids,
+            )
+            return
         self.delete_list_items_from_shared_list(
             shared_list=_models.NegativeKeywordList(id=list_id).to_api_obj(
                 self.campaign_service
@@ -231,6 +248,11 @@ class NegativeKeywords(_base.BingAds):
         request_limit = 10000
         for associations_chunk in _utils.chunked(
                 associations, chunk_size=request_limit):
+            if self.direct_soap:
+                _soap.call(self.campaign_service,
+                           'SetSharedEntityAssociations',
+                           associations=associations_chunk)
+                continue
             self.campaign_service.SetSharedEntityAssociations(
                 Associations=_models.ArrayOfSharedEntityAssociation(
                     shared_entity_associations=associations_chunk
@@ -279,15 +301,63 @@ class NegativeKeywords(_base.BingAds):
         :param associations:
           The list of campaign and shared entity associations.
         """
-        response = self.campaign_service.\
-        GetSharedEntityAssociationsBySharedEntityIds(
-            EntityType=_c.CAMPAIGN,
-            SharedEntityIds=_models.ArrayOflong(
-                longs=[shared_entity_id]
-            ).to_api_obj(),
-            SharedEntityType=self.shared_entity_type,
+        return self.get_shared_entity_associations_by_shared_entity_ids(
+            [shared_entity_id]
+        )
+
+    @_utils.print_webfault
+    def get_shared_entity_associations_by_shared_entity_ids(
+            self, shared_entity_ids):
+        """Gets shared entity associations for several shared entities, with
+        one call per `predicate_list_limit` of them.
+
+        :type shared_entity_ids: [int]
+        :param shared_entity_ids:
+          The IDs of the negative keyword lists for which to return
+          associations with campaigns.
+
+        :rtype: [_models.SharedEntityAssociation]
+        :return:
+          Returned is the list of campaign and shared entity associations.
+        """
+        associations = []
+        for shared_entity_ids_chunk in _utils.chunked(
+                shared_entity_ids, chunk_size=self.predicate_list_limit):
+            response = self.campaign_service.\
+            GetSharedEntityAssociationsBySharedEntityIds(
+                EntityType=_c.CAMPAIGN,
+                SharedEntityIds=_models.ArrayOflong(
+                    longs=shared_entity_ids_chunk
+                ).to_api_obj(),
+                SharedEntityType=self.shared_entity_type,
+            )
+            associations.extend(
+                _models.ArrayOfSharedEntityAssociation.from_api_obj(response)
+            )
+        return associations
+
+    def get_shared_entity_association_matrix(self, shared_entity_ids):
+        """Gets the campaign associations of the specified shared entities as
+        a matrix of campaign IDs by shared entity IDs.
+
+        :type shared_entity_ids: [int]
+        :param shared_entity_ids:
+          The IDs of the negative keyword lists for which to return
+          associations with campaigns.
+
+        :rtype: _models.AssociationMatrix
+        :return:
+          Returned is the matrix of current associations.
+        """
+        matrix = _models.AssociationMatrix.from_shared_entity_associations(
+            self.get_shared_entity_associations_by_shared_entity_ids(
+                shared_entity_ids
+            )
+        )
+        return matrix.reindex(
+            matrix.row_ids,
+            sorted(set(matrix.column_ids).union(shared_entity_ids))
         )
-        return _models.ArrayOfSharedEntityAssociation.from_api_obj(response)
 
     def get_negative_keyword_list_associations(self, list_id):
         """Gets negative keyword list to campaign associations.
@@ -316,6 +386,11 @@ class NegativeKeywords(_base.BingAds):
           An array of objects that associate a negative keyword list and an
           entity such as a campaign.
         """
+        if self.direct_soap:
+            _soap.call(self.campaign_service,
+                       'DeleteSharedEntityAssociations',
+                       associations=associations)
+            return
         self.campaign_service.DeleteSharedEntityAssociations(
             Associations=_models.ArrayOfSharedEntityAssociation(
                 shared_entity_associations=associations
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""Single point through which all SOAP calls of a `BingAds` object pass.
+Service clients are wrapped in a `ServiceProxy`, which sends every call of
+an operation through the `interceptors` of the object, e.g. the dry-run
+planner and the call budget of `py_bingads.budget`.
+
+An interceptor is a callable taking the `Call` and a function without
+arguments which continues with the next interceptor and finally sends the
+call. It can return that function's result, a result of its own instead,
+or raise.
+"""
+import functools as _ft
+
+from py_bingads import deadline as _deadline
+
+
+def _send(operation, service, *args, **kwargs):
+    """Send a call of an operation with a service client, with a socket
+    timeout of at most the time left in the current deadline scope.
+    """
+    service_call = getattr(service, operation)
+    with _deadline.limited_timeout(service):
+        return service_call(*args, **kwargs)
+
+
+class Call(object):
+    """ Represent a call of a service operation. """
+
+    def __init__(self, service_name, operation, account_id, args, kwargs,
+                 developer_token=None, service=None, resend=None,
+                 proxy=None):
+        """
+        :type service_name: str
+        :param service_name:
+          Name of the service, e.g. `CampaignManagementService`.
+
+        :type operation: str
+        :param operation:
+          Name of the operation, e.g. `AddCampaigns`.
+
+        :type account_id: int | None
+        :param account_id:
+          ID of the account the call is made for.
+
+        :param args:
+          Positional arguments of the operation.
+
+        :param kwargs:
+          Keyword arguments of the operation.
+
+        :type developer_token: str | None
+        :param developer_token:
+          Developer token the call is made with.
+
+        :type service: bingads.service_client.ServiceClient | None
+        :param service:
+          Client the call is sent with.
+
+        :type resend: callable | None
+        :param resend:
+          Function sending the call again with another client, passed as
+          its argument, without the interceptors, e.g. to hedge it.
+
+        :type proxy: ServiceProxy | None
+        :param proxy:
+          Proxy of the calling thread the call is made through.
+        """
+        self.service_name = service_name
+        self.operation = operation
+        self.account_id = account_id
+        self.args = args
+        self.kwargs = kwargs
+        self.developer_token = developer_token
+        self.service = service
+        self.resend = resend
+        self.proxy = proxy
+
+    def __repr__(self):
+        return 'Call({service_name}.{operation}, account_id={account_id})' \
+            .format(service_name=self.service_name, operation=self.operation,
+                    account_id=self.account_id)
+
+
+class ServiceProxy(object):
+    """Wrap a `ServiceClient`. Operations, whose names start with an upper
+    case letter, pass through the interceptors of the `BingAds` object, any
+    other attribute, e.g. `factory`, is the one of the client.
+    """
+
+    def __init__(self, service, name, bing_ads):
+        """
+        :type service: bingads.service_client.ServiceClient
+        :param service:
+          Client of the service.
+
+        :type name: str
+        :param name:
+          Name of the service.
+
+        :type bing_ads: py_bingads.services.BingAds
+        :param bing_ads:
+          Object whose `interceptors` to apply.
+        """
+        self.service = service
+        self.name = name
+        self.bing_ads = bing_ads
+
+    def __getattr__(self, item):
+        if item[:1].isupper():
+            return _ft.partial(self.invoke, item, _ft.partial(_send, item))
+        return getattr(self.service, item)
+
+    def new_service(self):
+        """Create another client of the service, e.g. to send calls in
+        another thread, since clients are not thread-safe.
+
+        :rtype: bingads.service_client.ServiceClient
+        """
+        return self.bing_ads.new_service_client(self.name)
+
+    def invoke(self, operation, send, *args, **kwargs):
+        """Pass a call of an operation through the interceptors.
+
+        :type operation: str
+        :param operation:
+          Name of the operation.
+
+        :param send:
+          Function sending the call with a client and the arguments.
+
+        :return:
+          Returned is the response of the call.
+        """
+        authorization_data = self.bing_ads.authorization_data
+        call = Call(self.name, operation, authorization_data.account_id, args,
+                    kwargs, developer_token=authorization_data.developer_token,
+                    service=self.service,
+                    resend=lambda service: send(service, *args, **kwargs),
+                    proxy=self)
+        interceptors = list(self.bing_ads.interceptors)
+
+        def proceed(index=0):
+            """ Continue with the interceptor at an index. """
+            if index == len(interceptors):
+                return send(call.service, *args, **kwargs)
+            return interceptors[index](call, _ft.partial(proceed, index + 1))
+
+        return proceed()
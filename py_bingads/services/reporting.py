@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+""" Wrapper class for the Reporting service. """
+import functools as _ft
+import logging as _logging
+import os as _os
+import time as _time
+
+from py_bingads import _constants as _c
+from py_bingads import _utils
+from py_bingads import deadline as _deadline
+from py_bingads import models as _models
+
+from . import base as _base
+
+
+class ReportFailed(RuntimeError):
+    """ Raised when a report request does not succeed. """
+
+
+class Reporting(_base.BingAds):
+    """Wrapper for Reporting service operations. Many reports are submitted
+    at once, polled together and downloaded in parallel, and each report is
+    parsed into columns one row at a time.
+    """
+
+    def __init__(self, poll_interval=5, poll_timeout=3600, workers=4,
+                 **kwargs):
+        """
+        :type poll_interval: int
+        :param poll_interval:
+          Number of seconds to wait before the first status check of
+          reports. The wait doubles after every check, up to a minute.
+
+        :type poll_timeout: int
+        :param poll_timeout:
+          Number of seconds after which to give up waiting on reports.
+
+        :type workers: int
+        :param workers:
+          Number of reports to submit, poll or download in parallel.
+        """
+        _base.BingAds.__init__(self, **kwargs)
+        self.poll_interval = poll_interval
+        self.poll_timeout = poll_timeout
+        self.workers = workers
+        self.subclass_kwargs.update(poll_interval=poll_interval,
+                                    poll_timeout=poll_timeout, workers=workers)
+
+    @property
+    def reporting_service(self):
+        """ Get Reporting Service. """
+        return self.get_reporting_service()
+
+    def build_report_request(self,  # pylint: disable=too-many-arguments
+                             report_type, account_ids=None, columns=None,
+                             predefined_time='Yesterday', start_date=None,
+                             end_date=None, aggregation='Daily'):
+        """Create a Bing API report request.
+
+        :type report_type: str
+        :param report_type:
+          One of `CampaignPerformanceReport`, `AdGroupPerformanceReport` or
+          `SearchQueryPerformanceReport`.
+
+        :type account_ids: iter | None
+        :param account_ids:
+          IDs of the accounts to report on, defaults to the current account.
+
+        :type columns: iter | None
+        :param columns:
+          Columns of the report, defaults to the columns of the report type
+          in `REPORT_COLUMNS`.
+
+        :type predefined_time: str
+        :param predefined_time:
+          Predefined time period such as `Yesterday` or `LastSevenDays`,
+          ignored if `start_date` and `end_date` are given.
+
+        :type start_date: datetime.date | None
+        :param start_date:
+          First day of a custom time period.
+
+        :type end_date: datetime.date | None
+        :param end_date:
+          Last day of a custom time period.
+
+        :type aggregation: str
+        :param aggregation:
+          Aggregation of rows, such as `Daily` or `Summary`.
+        """
+        _utils.validate_membership(report_type, _c.REPORT_SCOPES,
+                                   name='report_type')
+        service = self.reporting_service
+        if account_ids is None:
+            account_ids = [self._account_id]
+        if columns is None:
+            columns = _c.REPORT_COLUMNS[report_type]
+
+        report_request = service.factory.create(
+            '{report_type}Request'.format(report_type=report_type)
+        )
+        report_request.Format = 'Csv'
+        report_request.ReportName = report_type
+        report_request.ReturnOnlyCompleteData = False
+        report_request.Aggregation = aggregation
+
+        scope = service.factory.create(_c.REPORT_SCOPES[report_type])
+        scope.AccountIds = {'long': list(account_ids)}
+        scope.Campaigns = None
+        if hasattr(scope, 'AdGroups'):
+            scope.AdGroups = None
+        report_request.Scope = scope
+
+        report_time = service.factory.create('ReportTime')
+        if start_date and end_date:
+            report_time.PredefinedTime = None
+            for name, date in (('CustomDateRangeStart', start_date),
+                               ('CustomDateRangeEnd', end_date)):
+                api_date = service.factory.create('Date')
+                api_date.Day = date.day
+                api_date.Month = date.month
+                api_date.Year = date.year
+                setattr(report_time, name, api_date)
+        else:
+            report_time.PredefinedTime = predefined_time
+        report_request.Time = report_time
+
+        report_columns = service.factory.create(
+            'ArrayOf{report_type}Column'.format(report_type=report_type)
+        )
+        setattr(report_columns, '{report_type}Column'.format(
+            report_type=report_type), list(columns))
+        report_request.Columns = report_columns
+        return report_request
+
+    @_utils.print_webfault
+    def submit_report(self, report_request):
+        """Submit a report request.
+
+        :param report_request:
+          Bing API report request, e.g. from `build_report_request`.
+
+        :rtype: str
+        :return:
+          Returned is the ID of the report request.
+        """
+        return self.reporting_service.SubmitGenerateReport(report_request)
+
+    @_utils.print_webfault
+    def poll_report(self, request_id):
+        """Get the status of a report request.
+
+        :type request_id: str
+        :param request_id:
+          ID of the report request.
+
+        :return:
+          Returned is the Bing API report request status.
+        """
+        return self.reporting_service.PollGenerateReport(
+            ReportRequestId=request_id
+        )
+
+    @_utils.print_webfault
+    def poll_reports(self, request_ids):
+        """Wait until all reports are generated. Pending reports are polled
+        together, `workers` of them at a time, so waiting on many reports
+        takes as long as on the slowest.
+
+        :type request_ids: iter
+        :param request_ids:
+          IDs of the report requests.
+
+        :rtype: dict
+        :return:
+          Returned are the download URLs keyed on request ID. The URL is None
+          for reports without data.
+        """
+        pending = list(request_ids)
+        urls = {}
+        deadline = _time.time() + self.poll_timeout
+        interval = self.poll_interval
+        while True:
+            statuses = _utils.thread_map(self.poll_report, pending,
+                                         workers=self.workers)
+            for request_id, status in zip(pending, statuses):
+                if status.Status == _c.REPORT_SUCCESS:
+                    urls[request_id] = status.ReportDownloadUrl
+                elif status.Status != _c.REPORT_PENDING:
+                    raise ReportFailed(
+                        'Report {request_id} failed with status '
+                        '{status}.'.format(request_id=request_id,
+                                           status=status.Status)
+                    )
+            pending = [
+                request_id for request_id in pending if request_id not in urls
+            ]
+            if not pending:
+                return urls
+            if _time.time() + interval > deadline:
+                raise ReportFailed(
+                    '{count} reports were not generated within {timeout} '
+                    'seconds.'.format(count=len(pending),
+                                      timeout=self.poll_timeout)
+                )
+            _logging.info('Waiting on %d reports.', len(pending))
+            _deadline.sleep(interval)
+            interval = min(interval * 2, 60)
+
+    @staticmethod
+    def download_report(url, timeout=None):
+        """Download a report and parse it into columns.
+
+        :type url: str | None
+        :param url:
+          URL of the report file, None for a report without data. Local
+          `file://` URLs can be used in place of report files.
+
+        :type timeout: float | None
+        :param timeout:
+          Socket timeout in seconds, see `_utils.download_file`.
+
+        :rtype: dict
+        :return:
+          Returned are the lists of cells keyed on column names.
+        """
+        if url is None:
+            return {}
+        path = _utils.download_file(url, timeout=timeout)
+        try:
+            return _models.read_report(path)
+        finally:
+            _os.remove(path)
+
+    def get_reports(self, report_requests):
+        """Submit report requests, wait until all of them are generated and
+        download them in parallel.
+
+        :type report_requests: iter
+        :param report_requests:
+          Bing API report requests, e.g. from `build_report_request`.
+
+        :rtype: [dict]
+        :return:
+          Returned are the columns of the reports in order.
+        """
+        request_ids = _utils.thread_map(self.submit_report, report_requests,
+                                        workers=self.workers)
+        urls = self.poll_reports(request_ids)
+        return _utils.thread_map(
+            _ft.partial(self.download_report, timeout=self.timeout),
+            [urls[request_id] for request_id in request_ids],
+            workers=self.workers,
+        )
+
+    def get_report(self, report_type, **kwargs):
+        """Get a single report. Takes the same arguments as
+        `build_report_request`.
+
+        :rtype: dict
+        :return:
+          Returned are the lists of cells keyed on column names.
+        """
+        return self.get_reports(
+            [self.build_report_request(report_type, **kwargs)]
+        )[0]
+
+    def get_account_reports(self, report_type, account_ids, **kwargs):
+        """Get a report of each account, all of them generated concurrently.
+        Takes the same arguments as `build_report_request`.
+
+        :type account_ids: iter
+        :param account_ids:
+          IDs of the accounts.
+
+        :rtype: dict
+        :return:
+          Returned are the columns of the reports keyed on account ID.
+        """
+        account_ids = list(account_ids)
+        reports = self.get_reports([
+            self.build_report_request(report_type, account_ids=[account_id],
+                                      **kwargs)
+            for account_id in account_ids
+        ])
+        return dict(zip(account_ids, reports))
@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 """ Wrapper class for Reviews. """
-import logging as _logging
 import operator as _op
 
 from py_bingads import _constants as _c
@@ -9,8 +8,6 @@ from py_bingads import models as _models
 
 from . import ad_extensions as _ad_extensions
 
-_logging.basicConfig(level=_logging.INFO)
-
 
 class MaximumExtensionsExceeded(ValueError):
     """ The maximum number of accepted extensions has been exceeded """
@@ -60,10 +57,10 @@ class Reviews(_ad_extensions.AdExtensions):
           Iterable of campaign IDs. If not provided, all campaign IDs for
           account will be used.
 
-        :rtype: dict
+        :rtype: _models.AdExtensionAssociationIndex
         :return:
-          Returned is a dict keyed on a campaign ID with values as a list of
-          corresponding reviews.
+          Returned is an index keyed like a dict on a campaign ID with values
+          as a list of corresponding reviews.
         """
         if not campaign_ids:
             campaign_ids = [c.id for c in self.get_campaigns()]
@@ -91,8 +88,9 @@ class Reviews(_ad_extensions.AdExtensions):
             reviews,
             key=_op.attrgetter('key')
         ))
+        remote_index = _models.AdExtensionIndex(self.get_reviews())
         remote_reviews = ((review.key, review) for review in sorted(
-            self.get_reviews(),
+            remote_index,
             key=_op.attrgetter('key')
         ))
 
@@ -112,6 +110,9 @@ class Reviews(_ad_extensions.AdExtensions):
                 reviews_to_keep.append(remote)
                 seen_keys.add(key)
 
+        # Also delete remote reviews identical to another remote review.
+        review_ids_to_delete.extend(remote_index.duplicate_ids)
+
         # Delete first to make room for the new. Bing also deletes campaign
         # associations along with the object.
         self.delete_ad_extensions(review_ids_to_delete)
@@ -123,10 +124,8 @@ class Reviews(_ad_extensions.AdExtensions):
         for id_, review in zip(added_review_ids, reviews_to_add):
             review.id = id_.id
 
-        # Associate new and existing reviews.
-        campaign_ids = [c.id for c in self.get_campaigns()]
-        self.associate_campaign_ad_extensions([
-            (campaign_id, review.id)
-            for campaign_id in campaign_ids
-            for review in reviews_to_add + reviews_to_keep
-        ])
+        # Associate new and existing reviews where not associated yet.
+        self.associate_all_campaigns(
+            added_ids=[review.id for review in reviews_to_add],
+            kept_ids=[review.id for review in reviews_to_keep],
+        )
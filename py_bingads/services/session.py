@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+""" Unit of work that batches changes to entities. """
+import collections as _collections
+import logging as _logging
+import threading as _threading
+
+from py_bingads import _constants as _c
+from py_bingads import _utils
+from py_bingads import models as _models
+
+# Lazily, since the services import this module.
+_ad_extensions = _utils.lazy_import('py_bingads.services.ad_extensions')
+_ad_groups = _utils.lazy_import('py_bingads.services.ad_groups')
+_campaigns = _utils.lazy_import('py_bingads.services.campaigns')
+
+# Kinds of entities keyed on the type names of their models.
+ENTITY_KINDS = {
+    _models.Campaign.TYPE_NAME: 'campaigns',
+    _models.AdGroup.TYPE_NAME: 'ad_groups',
+}
+ENTITY_KINDS.update(
+    (type_name, 'ad_extensions') for type_name in _models.AD_EXTENSION_CLASSES
+)
+
+# Operations in the order in which they are flushed. The operations of a
+# phase don't depend on each other and are sent concurrently, while later
+# phases may use the IDs of entities added in earlier ones.
+PHASES = (
+    ('add_campaigns',),
+    ('add_ad_groups', 'add_ad_extensions'),
+    ('update_campaigns', 'update_ad_groups', 'update_ad_extensions',
+     'associate_ad_extensions'),
+    ('delete_ad_groups', 'delete_ad_extensions'),
+    ('delete_campaigns',),
+)
+
+
+def _get_id(entity):
+    """Get the ID of a model, or return an ID as is.
+
+    >>> _get_id(_models.Campaign(id=10)), _get_id(10)
+    (10, 10)
+    """
+    return getattr(entity, 'id', entity)
+
+
+def _get_key(entity):
+    """Get a hashable key of a model or ID. Models without an ID yet are
+    keyed on their identity.
+
+    >>> _get_key(_models.Campaign(id=10)), _get_key(10)
+    (10, 10)
+    """
+    entity_id = _get_id(entity)
+    if entity_id is None:
+        return 'new', id(entity)
+    return entity_id
+
+
+def _is_unmodified(entity):
+    """Return whether an entity is a tracked model without modified fields.
+
+    >>> _is_unmodified(_models.Campaign(id=10).mark_clean())
+    True
+    """
+    return isinstance(entity, _models.TrackedModel) and \
+        not entity.dirty_fields
+
+
+class Session(object):
+    """Collect adds, updates, deletes and associations of entities and send
+    them in as few calls as possible. Changes are grouped per operation and
+    parent, e.g. all updated ad groups of a campaign, and sent in chunks of
+    `predicate_list_limit` when the session is flushed. Repeated changes of
+    an entity are coalesced, so only its last update is sent, an update of
+    an entity that is deleted is dropped, and so is an update of a campaign
+    or ad group without modified fields.
+
+    Used as a context manager, a session is flushed on exit unless an
+    exception is raised, in which case its changes are discarded. Changes
+    which could not be sent because a call failed stay pending::
+
+        with campaigns.session() as session:
+            for campaign in campaigns.get_campaigns():
+                campaign.status = 'Paused'
+                session.update(campaign)
+
+    Added models get their IDs when the session is flushed, so they can be
+    used as parents and in associations of the same session.
+    """
+
+    def __init__(self, bing_ads, workers=4):
+        """
+        :type bing_ads: py_bingads.services.BingAds
+        :param bing_ads:
+          Connection with which to send the changes.
+
+        :type workers: int
+        :param workers:
+          Number of calls to send in parallel.
+        """
+        self.bing_ads = bing_ads
+        self.workers = workers
+        self._pending = _collections.defaultdict(_collections.OrderedDict)
+        self._lock = _threading.Lock()
+
+    def __len__(self):
+        return sum(len(changes) for changes in self._pending.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        else:
+            self.discard()
+
+    @staticmethod
+    def _get_kind(entity):
+        """ Get the kind of an entity, e.g. `campaigns`. """
+        type_name = getattr(entity, 'TYPE_NAME', None)
+        _utils.validate_membership(type_name, ENTITY_KINDS, name='entity')
+        return ENTITY_KINDS[type_name]
+
+    @staticmethod
+    def _get_parent(kind, entity, parent):
+        """ Get the parent of an entity, only ad groups have one. """
+        if kind != 'ad_groups':
+            return None
+        if parent is None:
+            parent = entity.campaign_id
+        assert parent is not None, 'The campaign of ad groups is required.'
+        return parent
+
+    def add(self, entity, parent=None):
+        """Add an entity, e.g. a `Campaign`, `AdGroup` or
+        `Sitelink2AdExtension`. Its `id` is set once the session is flushed.
+
+        :type parent: _models.Campaign | int | None
+        :param parent:
+          Campaign or campaign ID of an ad group, defaults to its
+          `campaign_id`.
+        """
+        kind = self._get_kind(entity)
+        self._pending['add_' + kind][id(entity)] = (
+            self._get_parent(kind, entity, parent), entity
+        )
+
+    def update(self, entity, parent=None):
+        """Update an entity, e.g. a `Campaign`, `AdGroup` or
+        `Sitelink2AdExtension`. Takes the same arguments as `add`.
+        """
+        kind = self._get_kind(entity)
+        assert entity.id is not None, 'Only existing entities can be updated.'
+        self._pending['update_' + kind][entity.id] = (
+            self._get_parent(kind, entity, parent), entity
+        )
+
+    def delete(self, entity, parent=None):
+        """Delete an entity, e.g. a `Campaign`, `AdGroup` or
+        `Sitelink2AdExtension`. Takes the same arguments as `add`.
+        """
+        kind = self._get_kind(entity)
+        assert entity.id is not None, 'Only existing entities can be deleted.'
+        self._pending['update_' + kind].pop(entity.id, None)
+        self._pending['delete_' + kind][entity.id] = (
+            self._get_parent(kind, entity, parent), entity.id
+        )
+
+    def associate(self, ad_extension, entity,
+                  association_type=_c.CAMPAIGN):
+        """Associate an ad extension with an account, campaign or ad group.
+
+        :param ad_extension:
+          Ad extension model or ID.
+
+        :param entity:
+          Model or ID of the account, campaign or ad group.
+
+        :type association_type: str
+        :param association_type:
+          Type of the entity, one of `ASSOCIATION_TYPES`.
+        """
+        _utils.validate_membership(association_type, _c.ASSOCIATION_TYPES,
+                                   name='association_type')
+        key = (_get_key(ad_extension), _get_key(entity), association_type)
+        self._pending['associate_ad_extensions'][key] = (
+            association_type, (ad_extension, entity)
+        )
+
+    def discard(self):
+        """ Drop all pending changes. """
+        self._pending.clear()
+
+    def flush(self):
+        """Send all pending changes, one phase of `PHASES` at a time. Changes
+        are only dropped once they were sent, so if a call fails, its changes
+        and those of later calls and phases stay pending, and can be sent
+        again by another `flush`.
+
+        :rtype: int
+        :return:
+          Returned is the number of calls sent.
+        """
+        calls = 0
+        for phase in PHASES:
+            batches = []
+            for operation in phase:
+                changes = self._pending[operation]
+                groups = _collections.OrderedDict()
+                for key, (parent, item) in list(changes.items()):
+                    if operation.startswith('update_') and \
+                            _is_unmodified(item):
+                        del changes[key]
+                        continue
+                    groups.setdefault(_get_id(parent), []).append(
+                        (key, item))
+                for parent_id, keyed_items in groups.items():
+                    for chunk in _utils.chunked(
+                            keyed_items,
+                            chunk_size=self.bing_ads.predicate_list_limit):
+                        batches.append((operation, parent_id, chunk))
+            _utils.thread_map(self._send, batches, workers=self.workers)
+            calls += len(batches)
+        if calls:
+            _logging.info('Flushed session in %d calls.', calls)
+        return calls
+
+    def _send(self, batch):
+        """Send a chunk of the changes of an operation and drop them from
+        the pending changes.
+        """
+        operation, parent_id, chunk = batch
+        getattr(self, '_' + operation)(parent_id, [item for _, item in chunk])
+        with self._lock:
+            changes = self._pending[operation]
+            for key, item in chunk:
+                if key in changes and changes[key][1] is item:
+                    del changes[key]
+
+    def _get_wrapper(self, cls):
+        """Get a service wrapper of a class, e.g. `AdGroups`, for the
+        connection of the session, which may be an instance of any wrapper.
+        Wrappers of other classes share the state of the connection, e.g. its
+        service clients and interceptors.
+        """
+        if isinstance(self.bing_ads, cls):
+            return self.bing_ads
+        wrapper = cls.__new__(cls)
+        wrapper.__dict__ = self.bing_ads.__dict__
+        return wrapper
+
+    def _add_campaigns(self, _, campaigns):
+        """ Add campaigns and set their IDs. """
+        self._get_wrapper(_campaigns.Campaigns).add_campaigns(campaigns)
+
+    def _add_ad_groups(self, campaign_id, ad_groups):
+        """ Add ad groups to a campaign and set their IDs. """
+        self._get_wrapper(_ad_groups.AdGroups).add_ad_groups(
+            ad_groups, campaign_id=campaign_id)
+
+    def _add_ad_extensions(self, _, ad_extensions):
+        """ Add ad extensions and set their IDs. """
+        wrapper = self._get_wrapper(_ad_extensions.AdExtensions)
+        identities = wrapper.add_ad_extensions(
+            _models.ArrayOfAdExtension(ad_extensions=ad_extensions))
+        for ad_extension, identity in zip(ad_extensions, identities):
+            ad_extension.id = identity.id
+
+    def _update_campaigns(self, _, campaigns):
+        """ Update campaigns. """
+        self._get_wrapper(_campaigns.Campaigns).update_campaigns(campaigns)
+
+    def _update_ad_groups(self, campaign_id, ad_groups):
+        """ Update ad groups of a campaign. """
+        self._get_wrapper(_ad_groups.AdGroups).update_ad_groups(
+            ad_groups, campaign_id=campaign_id)
+
+    def _update_ad_extensions(self, _, ad_extensions):
+        """ Update ad extensions. """
+        self._get_wrapper(_ad_extensions.AdExtensions).update_ad_extensions(
+            _models.ArrayOfAdExtension(ad_extensions=ad_extensions))
+
+    def _associate_ad_extensions(self, association_type, pairs):
+        """ Associate ad extensions with entities of a type. """
+        wrapper = self._get_wrapper(_ad_extensions.AdExtensions)
+        wrapper.associate_ad_extensions(
+            [(_get_id(entity), _get_id(ad_extension))
+             for ad_extension, entity in pairs],
+            association_type=association_type,
+        )
+
+    def _delete_campaigns(self, _, campaign_ids):
+        """ Delete campaigns. """
+        self._get_wrapper(_campaigns.Campaigns).delete_campaigns(
+            campaign_ids)
+
+    def _delete_ad_groups(self, campaign_id, ad_group_ids):
+        """ Delete ad groups of a campaign. """
+        self._get_wrapper(_ad_groups.AdGroups).delete_ad_groups(
+            ad_group_ids, campaign_id=campaign_id)
+
+    def _delete_ad_extensions(self, _, ad_extension_ids):
+        """ Delete ad extensions. """
+        self._get_wrapper(_ad_extensions.AdExtensions).delete_ad_extensions(
+            ad_extension_ids)
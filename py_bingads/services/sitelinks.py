@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 """ Wrapper class for Sitelinks. """
 import logging as _logging
-import operator as _op
 
 from py_bingads import _constants as _c
 from py_bingads import _utils
@@ -9,27 +8,53 @@ from py_bingads import models as _models
 
 from . import ad_extensions as _ad_extensions
 
-_logging.basicConfig(level=_logging.INFO)
+
+# Sitelink migration statuses shared by all instances in the process, keyed
+# on customer and account ID.
+MIGRATION_STATUS_CACHE = _utils.TTLCache(ttl=3600)
+
+# Requests of the statuses of all accounts of a customer in flight.
+_STATUSES_IN_FLIGHT = _utils.SingleFlight()
 
 
 class Sitelinks(_ad_extensions.AdExtensions):
     """ Wrapper for Sitelinks service operations. """
 
-    def __init__(self, check_sitelink_migration_status=True, **kwargs):
+    def __init__(self, check_sitelink_migration_status=True,
+                 migration_status_cache=MIGRATION_STATUS_CACHE, **kwargs):
         """Initialize Sitelinks.
 
         :type check_sitelink_migration_status: bool
         :param check_sitelink_migration_status:
           Raise AssertionError on initialization if sitelink migration is
           not complete for account.
+
+        :type migration_status_cache: _utils.TTLCache
+        :param migration_status_cache:
+          Cache of sitelink migration statuses. By default it is shared by
+          all instances in the process; pass a cache with a `path` to share
+          it across processes as well.
         """
         _ad_extensions.AdExtensions.__init__(self, **kwargs)
+        self.migration_status_cache = migration_status_cache
 
         if check_sitelink_migration_status:
             assert self.sitelink_migration_status()
+        # Unpickled copies need no check, since this one passed it.
+        self.subclass_kwargs['check_sitelink_migration_status'] = False
+        if migration_status_cache is not MIGRATION_STATUS_CACHE:
+            self.subclass_kwargs['migration_status_cache'] = \
+                migration_status_cache
         self.sitelink_ad_extension_type = _c.SITELINK
         self.ad_extension_class = _models.Sitelink2AdExtension
 
+    def _migration_status_key(self, account_id):
+        """ Get the migration status cache key of an account. """
+        return '{customer_id}:{account_id}'.format(
+            customer_id=self.authorization_data.customer_id,
+            account_id=account_id,
+        )
+
     def sitelink_migration_status(self):
         """To prepare for the sitelink ad extensions migration by the end
         of September 2017, you will need to determine whether the account has
@@ -37,47 +62,79 @@ class Sitelinks(_ad_extensions.AdExtensions):
         All ad extension service operations available for both types of
         sitelinks; however you will need to determine which type to add,
         update, and retrieve.
+
+        The status is read from the migration status cache. On a miss, the
+        statuses of all accounts of the customer are requested and cached,
+        once for all instances waiting for them.
+        """
+        account_id = self.authorization_data.account_id
+        key = self._migration_status_key(account_id)
+        sitelink_migration_is_completed = self.migration_status_cache.get(key)
+        if sitelink_migration_is_completed is None:
+            # Concurrent instances of the customer share one request.
+            _STATUSES_IN_FLIGHT.do(
+                (self.env, self.authorization_data.customer_id,
+                 id(self.migration_status_cache)),
+                self._request_migration_statuses, key
+            )
+            sitelink_migration_is_completed = self.migration_status_cache.get(
+                key, default=False)
+        return sitelink_migration_is_completed
+
+    def _request_migration_statuses(self, key):
+        """ Request the statuses of all accounts unless `key` is cached. """
+        if self.migration_status_cache.get(key) is None:
+            self.sitelink_migration_statuses()
+
+    def sitelink_migration_statuses(self, account_ids=None):
+        """Get whether sitelink migration is completed for several accounts
+        of the customer at once, and store the statuses in the migration
+        status cache.
+
+        :type account_ids: [int] | None
+        :param account_ids:
+          List of account IDs. If not provided, all accounts of the customer
+          and the current account are used.
+
+        :rtype: dict
+        :return:
+          Returned is a dict keyed on account IDs with values of whether
+          sitelink migration is completed.
         """
-        sitelink_migration_is_completed = False
         sitelink_migration = 'SiteLinkAdExtension'
         customer_service = self.get_customer_service()
 
-        # Optionally you can find out which pilot features the customer is
-        # able to use. Even if the customer is in pilot for sitelink
-        # migrations, the accounts that it contains might not be migrated.
-        feature_pilot_flags = customer_service.GetCustomerPilotFeatures(
-            self.authorization_data.customer_id
-        )
+        if account_ids is None:
+            response = customer_service.GetAccountsInfo(
+                CustomerId=self.authorization_data.customer_id
+            )
+            account_ids = set(
+                info.Id for info in response.AccountInfo
+            ) if response else set()
+            account_ids.add(self.authorization_data.account_id)
 
-        # The pilot flag value for Sitelink ad extension migration is 253.
-        # Pilot flags apply to all accounts within a given customer; however,
-        # each account goes through migration individually and has its own
-        # migration status.
-        if 253 in feature_pilot_flags['int']:
-            # Account migration status below will be either NotStarted,
-            # InProgress, or Completed.
-            _logging.info('Customer is in pilot for Sitelink migration.')
-        else:
-            # Account migration status below will be NotInPilot.
-            _logging.info('Customer is not in pilot for Sitelink migration.')
-
-        # Even if you have multiple accounts per customer, each account will
-        # have its own migration status. This checks one account using the
-        # provided AuthorizationData.
-        infos = self.campaign_service.GetAccountMigrationStatuses(dict(
-            long=self.authorization_data.account_id
-        ), sitelink_migration)
-
-        for info in infos['AccountMigrationStatusesInfo']:
-            _logging.info(info)
-            for migration_status_info in info['MigrationStatusInfo']:
-                migration_status = migration_status_info[1][0].Status
-                migration_type = migration_status_info[1][0].MigrationType
-                if migration_status == 'Completed' and (
-                        sitelink_migration == migration_type):
-                    sitelink_migration_is_completed = True
+        # Each account has its own migration status, so check all of them.
+        statuses = {account_id: False for account_id in account_ids}
+        for account_ids_chunk in _utils.chunked(
+                sorted(statuses), chunk_size=self.predicate_list_limit):
+            infos = self.campaign_service.GetAccountMigrationStatuses(dict(
+                long=account_ids_chunk
+            ), sitelink_migration)
 
-        return sitelink_migration_is_completed
+            for info in infos['AccountMigrationStatusesInfo']:
+                _logging.info(info)
+                for migration_status_info in info['MigrationStatusInfo']:
+                    migration_status = migration_status_info[1][0].Status
+                    migration_type = migration_status_info[1][0].MigrationType
+                    if migration_status == 'Completed' and (
+                            sitelink_migration == migration_type):
+                        statuses[info['AccountId']] = True
+
+        self.migration_status_cache.update(
+            (self._migration_status_key(account_id), status)
+            for account_id, status in statuses.items()
+        )
+        return statuses
 
     @_utils.print_webfault
     def delete_all_sitelinks(self):
@@ -126,10 +183,10 @@ class Sitelinks(_ad_extensions.AdExtensions):
           Iterable of campaign IDs. If not provided, all campaign IDs for
           account will be used.
 
-        :rtype: dict
+        :rtype: _models.AdExtensionAssociationIndex
         :return:
-          Returned is a dict keyed on Campaign IDs with values of the
-          campaign's list of corresponding sitelinks.
+          Returned is an index keyed like a dict on Campaign IDs with values
+          of the campaign's list of corresponding sitelinks.
         """
         if not campaign_ids:
             campaign_ids = [c.id for c in self.get_campaigns()]
@@ -152,48 +209,81 @@ class Sitelinks(_ad_extensions.AdExtensions):
           List of sitelink objects to create.
           Returned are the list of sitelink ad extensions.
         """
-        if len(sitelinks) > 10:
-            raise RuntimeError(
-                'Cannot add more than 10 MAC sitelinks. '
-                'Account Id: %d, Campaign Id: %d'
-                % (self.authorization_data.account_id, campaign_id)
-            )
+        self.sync_sitelinks({campaign_id: sitelinks})
+
+    @_utils.print_webfault
+    def sync_sitelinks(self, campaign_sitelinks):
+        """Update sets of sitelinks of several campaigns in one pass.
+
+        The sitelink library is read once and indexed on sitelink content and
+        keys. Identical sitelinks in the library are reused, and each other
+        distinct sitelink is added or updated once, even if several campaigns
+        use it. All campaign associations are set in batches.
+
+        :type campaign_sitelinks: dict
+        :param campaign_sitelinks:
+          A dict keyed on campaign IDs with values of the list of sitelink
+          objects the campaign should have.
+        """
+        for campaign_id, sitelinks in campaign_sitelinks.items():
+            if len(sitelinks) > 10:
+                raise RuntimeError(
+                    'Cannot add more than 10 MAC sitelinks. '
+                    'Account Id: %d, Campaign Id: %d'
+                    % (self.authorization_data.account_id, campaign_id)
+                )
 
-        local_sitelinks = ((sitelink.key, sitelink) for sitelink in sorted(
-            sitelinks, key=_op.attrgetter('key')
-        ))
-        remote_sitelinks = ((sitelink.key, sitelink) for sitelink in sorted(
-            self.get_all_sitelinks(), key=_op.attrgetter('key')
-        ))
+        # One local sitelink per key, shared by all campaigns that use it.
+        local_sitelinks = {}
+        for sitelinks in campaign_sitelinks.values():
+            for sitelink in sitelinks:
+                local = local_sitelinks.setdefault(sitelink.key, sitelink)
+                if local != sitelink:
+                    raise ValueError(
+                        'Conflicting sitelinks for key: %s' % (sitelink.key,)
+                    )
+        if not local_sitelinks:
+            return
+
+        remote_index = _models.AdExtensionIndex(self.get_all_sitelinks())
+        if remote_index.duplicates:
+            _logging.info('Found %d duplicate sitelinks for account %d.',
+                          len(remote_index.duplicates),
+                          self.authorization_data.account_id)
+        remote_sitelinks = {
+            sitelink.key: sitelink for sitelink in remote_index
+        }
 
         sitelinks_to_add = []
         sitelinks_to_update = []
-        seen_keys = set()
-        for key, (remote, local) in _utils.merge(
-                remote_sitelinks, local_sitelinks):
-            if key in seen_keys:
-                raise ValueError('Duplicate key: %s' % key)
-            if local is None:  # Keep in remote sitelink in library.
-                continue
+        for key, local in local_sitelinks.items():
+            # Prefer reusing an identical sitelink over updating one.
+            remote = remote_index.get(local) or remote_sitelinks.get(key)
             if remote is None:  # Add local sitelink to library.
                 sitelinks_to_add.append(local)
-                seen_keys.add(key)
-            elif remote != local:  # Update remote sitelink to local changes.
-                local.id = remote.id
+                continue
+            local.id = remote.id
+            if remote != local:  # Update remote sitelink to local changes.
                 sitelinks_to_update.append(local)
-                seen_keys.add(key)
 
         # Add new local sitelinks to remote library.
-        added_sitelink_ids = self.add_ad_extensions(
-            _models.ArrayOfAdExtension(ad_extensions=sitelinks_to_add)
-        )
-        for id_, sitelink in zip(added_sitelink_ids, sitelinks_to_add):
-            sitelink.id = id_.id
-
-        self.update_ad_extensions(_models.ArrayOfAdExtension(
-            ad_extensions=sitelinks_to_update
-        ))
-        self.associate_campaign_ad_extensions(
-            [(campaign_id, sitelink.id) for sitelink
-             in sitelinks_to_add + sitelinks_to_update]
-        )
+        for sitelinks_chunk in _utils.chunked(
+                sitelinks_to_add, chunk_size=self.predicate_list_limit):
+            added_sitelink_ids = self.add_ad_extensions(
+                _models.ArrayOfAdExtension(ad_extensions=sitelinks_chunk)
+            )
+            for id_, sitelink in zip(added_sitelink_ids, sitelinks_chunk):
+                sitelink.id = id_.id
+
+        for sitelinks_chunk in _utils.chunked(
+                sitelinks_to_update, chunk_size=self.predicate_list_limit):
+            self.update_ad_extensions(_models.ArrayOfAdExtension(
+                ad_extensions=sitelinks_chunk
+            ))
+
+        associations = []
+        for campaign_id, sitelinks in campaign_sitelinks.items():
+            for sitelink in sitelinks:
+                sitelink.id = local_sitelinks[sitelink.key].id
+                associations.append((campaign_id, sitelink.id))
+        self.associate_campaign_ad_extensions(associations)
@@ -0,0 +1,381 @@
+#!/usr/bin/env python
+"""Direct rendering of the SOAP envelopes of large batch requests of the
+Campaign Management service. Building 5,000 negative keywords or 10,000
+associations as suds objects and marshalling them costs far more CPU than
+the request itself, so the envelopes of the operations in `RENDERERS` are
+rendered straight from the models into the bytes suds would send. Only the
+reply is still parsed by suds.
+
+suds numbers the prefixes of namespaces in hash order, which differs between
+processes, while these envelopes always use `ns1` for the Campaign
+Management and `ns2` for the Arrays namespace. Otherwise they are the same
+bytes, see `tests/test_soap.py`.
+"""
+import functools as _ft
+import re as _re
+
+import six as _six
+
+from py_bingads import deadline as _deadline
+from py_bingads import _utils
+
+_suds_transport = _utils.lazy_import('suds.transport')
+_proxy = _utils.lazy_import('py_bingads.services.proxy')
+
+ENVELOPE_NS = 'http://schemas.xmlsoap.org/soap/envelope/'
+XSI_NS = 'http://www.w3.org/2001/XMLSchema-instance'
+ARRAYS_NS = 'http://schemas.microsoft.com/2003/10/Serialization/Arrays'
+CAMPAIGN_MANAGEMENT_NS = 'https://bingads.microsoft.com/CampaignManagement/v11'
+
+# Header elements of the Campaign Management service in WSDL order.
+HEADER_NAMES = (
+    'ApplicationToken', 'AuthenticationToken', 'CustomerAccountId',
+    'CustomerId', 'DeveloperToken', 'Password', 'UserName',
+)
+
+# Prefixes of the Campaign Management and Arrays namespaces in bodies.
+_CM = 'ns1'
+_ARRAYS = 'ns2'
+
+# Same entities as the suds encoder, which keeps existing entities as is.
+_ESCAPE_RE = _re.compile(r'&(?!(?:amp|lt|gt|quot|apos);)|[<>"\']')
+_ENTITIES = {
+    '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&apos;',
+}
+
+
+def escape(value):
+    """Convert a value to text escaped the way suds does.
+
+    >>> print(escape('Shoes & <Socks>'))
+    Shoes &amp; &lt;Socks&gt;
+    >>> print(escape('&amp; stays'))
+    &amp; stays
+    >>> print(escape(10))
+    10
+    """
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+    elif not isinstance(value, _six.text_type):
+        return _six.text_type(value)
+    return _ESCAPE_RE.sub(lambda match: _ENTITIES[match.group()], value)
+
+
+def element(prefix, name, value, optional=False, nillable=False):
+    """Render an element with a simple value. Like suds, an element without
+    a value is left out if it's optional, nil if it's nillable and empty
+    otherwise.
+
+    >>> print(element('ns1', 'Id', 7))
+    <ns1:Id>7</ns1:Id>
+    >>> print(element('ns1', 'Id', None, optional=True))
+    <BLANKLINE>
+    >>> print(element('ns1', 'Name', None, nillable=True))
+    <ns1:Name xsi:nil="true"/>
+    >>> print(element('ns1', 'EntityId', None))
+    <ns1:EntityId/>
+    """
+    if value is None:
+        if optional:
+            return u''
+        if nillable:
+            return u'<{0}:{1} xsi:nil="true"/>'.format(prefix, name)
+        return u'<{0}:{1}/>'.format(prefix, name)
+    return u'<{0}:{1}>{2}</{0}:{1}>'.format(prefix, name, escape(value))
+
+
+def _array(prefix, name, items):
+    """ Render an array element from its rendered items. """
+    if not items:
+        return u'<{0}:{1}/>'.format(prefix, name)
+    return u'<{0}:{1}>{2}</{0}:{1}>'.format(prefix, name, u''.join(items))
+
+
+def _longs(name, longs):
+    """ Render an `ArrayOflong` element. """
+    return _array(_CM, name, [
+        u'<{0}:long>{1}</{0}:long>'.format(_ARRAYS, int(value))
+        for value in longs
+    ])
+
+
+def _shared_list(shared_list):
+    """ Render a `SharedList` element, e.g. of a `NegativeKeywordList`. """
+    type_attribute = u''
+    if shared_list.TYPE_NAME != 'SharedList':
+        type_attribute = u' xsi:type="{0}:{1}"'.format(
+            _CM, shared_list.TYPE_NAME)
+    return u''.join((
+        u'<{0}:SharedList{1}>'.format(_CM, type_attribute),
+        element(_CM, 'AssociationCount', None, nillable=True),
+        element(_CM, 'Id', shared_list.id, optional=True),
+        element(_CM, 'Name', shared_list.name, nillable=True),
+        element(_CM, 'Type', shared_list.TYPE_NAME, optional=True),
+        u'</{0}:SharedList>'.format(_CM),
+    ))
+
+
+def _negative_keyword(negative_keyword):
+    """ Render a `NegativeKeyword` as a `SharedListItem` element. """
+    return u''.join((
+        u'<{0}:SharedListItem xsi:type="{0}:NegativeKeyword">'.format(_CM),
+        element(_CM, 'Id', negative_keyword.id, optional=True),
+        element(_CM, 'MatchType', negative_keyword.match_type),
+        element(_CM, 'Text', negative_keyword.text, nillable=True),
+        u'</{0}:SharedListItem>'.format(_CM),
+    ))
+
+
+def _shared_entity_associations(associations):
+    """ Render an `ArrayOfSharedEntityAssociation` element. """
+    return _array(_CM, 'Associations', [
+        u''.join((
+            u'<{0}:SharedEntityAssociation>'.format(_CM),
+            element(_CM, 'EntityId', association.entity_id),
+            element(_CM, 'EntityType', association.entity_type,
+                    nillable=True),
+            element(_CM, 'SharedEntityId', association.shared_entity_id),
+            element(_CM, 'SharedEntityType',
+                    association.shared_entity_type, nillable=True),
+            u'</{0}:SharedEntityAssociation>'.format(_CM),
+        ))
+        for association in associations
+    ])
+
+
+def add_list_items_to_shared_list(shared_list, list_items):
+    """Render the request of `AddListItemsToSharedList`.
+
+    :type shared_list: _models.SharedList
+    :param shared_list:
+      The shared list, e.g. a `NegativeKeywordList`.
+
+    :type list_items: [_models.NegativeKeyword]
+    :param list_items:
+      The negative keywords to add to the list.
+    """
+    return _array(_CM, 'ListItems', [
+        _negative_keyword(list_item) for list_item in list_items
+    ]) + _shared_list(shared_list)
+
+
+def delete_list_items_from_shared_list(shared_list, list_item_ids):
+    """Render the request of `DeleteListItemsFromSharedList`.
+
+    :type shared_list: _models.SharedList
+    :param shared_list:
+      The shared list, e.g. a `NegativeKeywordList`.
+
+    :type list_item_ids: [int]
+    :param list_item_ids:
+      The IDs of the items to delete from the list.
+    """
+    return _longs('ListItemIds', list_item_ids) + _shared_list(shared_list)
+
+
+def set_shared_entity_associations(associations):
+    """Render the request of `SetSharedEntityAssociations`.
+
+    :type associations: [_models.SharedEntityAssociation]
+    """
+    return _shared_entity_associations(associations)
+
+
+def delete_shared_entity_associations(associations):
+    """Render the request of `DeleteSharedEntityAssociations`.
+
+    :type associations: [_models.SharedEntityAssociation]
+    """
+    return _shared_entity_associations(associations)
+
+
+def set_ad_extensions_associations(account_id, associations,
+                                   association_type):
+    """Render the request of `SetAdExtensionsAssociations`.
+
+    :type account_id: int
+    :param account_id:
+      The ID of the account of the ad extensions.
+
+    :type associations: [_models.AdExtensionIdToEntityIdAssociation]
+    :param associations:
+      The associations of ad extensions with entities.
+
+    :type association_type: str
+    :param association_type:
+      The type of all entities, one of `ASSOCIATION_TYPES`.
+    """
+    return u''.join((
+        element(_CM, 'AccountId', account_id, optional=True),
+        _array(_CM, 'AdExtensionIdToEntityIdAssociations', [
+            u''.join((
+                u'<{0}:AdExtensionIdToEntityIdAssociation>'.format(_CM),
+                element(_CM, 'AdExtensionId', association.ad_extension_id),
+                element(_CM, 'EntityId', association.entity_id),
+                u'</{0}:AdExtensionIdToEntityIdAssociation>'.format(_CM),
+            ))
+            for association in associations
+        ]),
+        element(_CM, 'AssociationType', association_type, optional=True),
+    ))
+
+
+def delete_ad_extensions(account_id, ad_extension_ids):
+    """Render the request of `DeleteAdExtensions`.
+
+    :type account_id: int
+    :param account_id:
+      The ID of the account of the ad extensions.
+
+    :type ad_extension_ids: [int]
+    :param ad_extension_ids:
+      The IDs of the ad extensions to delete.
+    """
+    return element(_CM, 'AccountId', account_id, optional=True) + \
+        _longs('AdExtensionIds', ad_extension_ids)
+
+
+# Renderers of the requests of operations, and whether their requests use
+# the Arrays namespace.
+RENDERERS = {
+    'AddListItemsToSharedList': (add_list_items_to_shared_list, False),
+    'DeleteListItemsFromSharedList': (
+        delete_list_items_from_shared_list, True),
+    'SetSharedEntityAssociations': (set_shared_entity_associations, False),
+    'DeleteSharedEntityAssociations': (
+        delete_shared_entity_associations, False),
+    'SetAdExtensionsAssociations': (set_ad_extensions_associations, False),
+    'DeleteAdExtensions': (delete_ad_extensions, True),
+}
+
+
+def render(operation, soapheaders, namespace=CAMPAIGN_MANAGEMENT_NS,
+           **kwargs):
+    """Render the envelope of a request.
+
+    :type operation: str
+    :param operation:
+      Name of the operation, one of `RENDERERS`.
+
+    :type soapheaders: dict
+    :param soapheaders:
+      Values of the header elements, e.g. the `soapheaders` option a
+      `ServiceClient` sets.
+
+    :type namespace: str
+    :param namespace:
+      Target namespace of the service.
+
+    :param kwargs:
+      Arguments of the renderer of the operation.
+
+    :rtype: bytes
+    :return:
+      Returned is the UTF-8 encoded envelope.
+    """
+    _utils.validate_membership(operation, RENDERERS, name='operation')
+    renderer, uses_arrays = RENDERERS[operation]
+    namespaces = [
+        ('SOAP-ENV', ENVELOPE_NS), ('xsi', XSI_NS), ('tns', namespace),
+        ('ns0', ENVELOPE_NS), (_CM, namespace),
+    ]
+    if uses_arrays:
+        namespaces.append((_ARRAYS, ARRAYS_NS))
+    parts = [u'<?xml version="1.0" encoding="UTF-8"?><SOAP-ENV:Envelope']
+    parts.extend(u' xmlns:{0}="{1}"'.format(prefix, uri)
+                 for prefix, uri in namespaces)
+    parts.append(u'><SOAP-ENV:Header>')
+    parts.extend(element('tns', name, soapheaders[name])
+                 for name in HEADER_NAMES
+                 if soapheaders.get(name) is not None)
+    parts.extend((
+        u'</SOAP-ENV:Header><ns0:Body>',
+        u'<{0}:{1}Request>'.format(_CM, operation),
+        renderer(**kwargs),
+        u'</{0}:{1}Request>'.format(_CM, operation),
+        u'</ns0:Body></SOAP-ENV:Envelope>',
+    ))
+    return u''.join(parts).encode('utf-8')
+
+
+def _send(operation, service, **kwargs):
+    """ Call an operation with a client, see `call`. """
+    return call(service, operation, **kwargs)
+
+
+def _reply(service, operation, **kwargs):
+    """Send a directly rendered envelope with the current options of a
+    client, and return the reply to inject into the suds call.
+    """
+    soap_client = service.soap_client
+    options = soap_client.options
+    envelope = render(operation, options.soapheaders or {},
+                      namespace=soap_client.wsdl.tns[1], **kwargs)
+    method = soap_client.wsdl.services[0].ports[0].methods[operation]
+    action = method.soap.action
+    if isinstance(action, _six.text_type):
+        action = action.encode('utf-8')
+    request = _suds_transport.Request(
+        getattr(options, 'location', None) or method.location, envelope
+    )
+    request.headers = {
+        'Content-Type': 'text/xml; charset=utf-8', 'SOAPAction': action,
+    }
+    request.headers.update(options.headers)
+    try:
+        reply = options.transport.send(request)
+    except _suds_transport.TransportError as error:
+        return dict(
+            reply=error.fp.read() if error.fp else b'',
+            status=error.httpcode,
+            description=str(error),
+        )
+    return dict(reply=reply.message)
+
+
+def call(service, operation, **kwargs):
+    """Call an operation with a directly rendered envelope. The request is
+    sent with the transport, location and HTTP headers suds would use, and
+    the reply is parsed by suds, so the response and errors are the same as
+    those of `service.<operation>(...)`. Like the client, the call refreshes
+    expired OAuth tokens once, and then renders and sends it again.
+
+    :type service: bingads.service_client.ServiceClient
+    :param service:
+      Client of the Campaign Management service, or a `ServiceProxy` of
+      it, whose interceptors the call then passes through.
+
+    :type operation: str
+    :param operation:
+      Name of the operation, one of `RENDERERS`.
+
+    :param kwargs:
+      Arguments of the renderer of the operation.
+
+    :return:
+      Returned is the response of the operation.
+    """
+    if isinstance(service, _proxy.ServiceProxy):
+        return service.invoke(operation, _ft.partial(_send, operation),
+                              **kwargs)
+    # pylint: disable=protected-access
+    # Getting the call of the operation sets the current auth headers.
+    getattr(service, operation)
+    refreshed = False
+    while True:
+        with _deadline.limited_timeout(service):
+            inject = _reply(service, operation, **kwargs)
+        try:
+            # The suds call, unlike the one of the client, doesn't retry
+            # with the same reply after refreshing the tokens.
+            return getattr(service.soap_client.service, operation)(
+                __inject=inject)
+        except Exception as error:  # pylint: disable=broad-except
+            if refreshed or not service.refresh_oauth_tokens_automatically \
+                    or not service._is_expired_token_exception(error):
+                raise
+        refreshed = True
+        authentication = service.authorization_data.authentication
+        authentication.request_oauth_tokens_by_refresh_token(
+            authentication.oauth_tokens.refresh_token)
+        service.set_options(**service._options)
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+"""Record the SOAP traffic of a job with its timings into a compact archive,
+and replay it offline with the recorded or scaled latencies, e.g. to compare
+the calls and wall time of a sync job across versions in CI::
+
+    with Recorder('sync.jsonl.gz') as recorder:
+        sitelinks = Sitelinks(transport_factory=recorder.transport, ...)
+        sitelinks.update_campaign_sitelinks(...)
+
+    replayer = Replayer('sync.jsonl.gz', latency_scale=0)
+    sitelinks = Sitelinks(transport_factory=replayer.transport, ...)
+    sitelinks.update_campaign_sitelinks(...)
+    print(replayer.calls)
+
+Archives hold the replies, WSDLs and schemas, but no requests, since their
+headers hold credentials. Requests are matched on their SOAP action and a
+fingerprint of their body instead. Clients with these transports don't
+cache WSDLs, so every WSDL is recorded and served. OAuth tokens are
+requested outside of the services, so replays should use a token store or
+username auth.
+"""
+from __future__ import print_function
+import argparse as _argparse
+import collections as _collections
+import gzip as _gzip
+import hashlib as _hashlib
+import io as _io
+import json as _json
+import re as _re
+import threading as _threading
+import time as _time
+
+from suds import transport as _suds_transport
+from suds.transport import https as _suds_https
+
+from py_bingads import _utils
+
+_DECLARATION = _re.compile(br' xmlns:([\w.-]+)="([^"]*)"')
+_BODY = _re.compile(br'<(?:[\w.-]+:)?Body>(.*)</(?:[\w.-]+:)?Body>', _re.S)
+_PREFIX = _re.compile(br'(</?|=")([\w.-]+):')
+
+
+class ReplayError(LookupError):
+    """ Raised when a request was not recorded. """
+
+
+def fingerprint(envelope):
+    """Hash the body of a SOAP envelope. Headers are left out, since they
+    hold credentials, and prefixes are replaced by their namespaces, since
+    suds numbers them in hash order.
+
+    >>> fingerprint(b'<a:Envelope xmlns:a="x" xmlns:ns1="urn:v11">'
+    ...             b'<a:Header>token</a:Header><a:Body><ns1:Get/></a:Body>'
+    ...             b'</a:Envelope>') == fingerprint(
+    ...     b'<b:Envelope xmlns:b="x" xmlns:ns0="urn:v11"><b:Body>'
+    ...     b'<ns0:Get/></b:Body></b:Envelope>')
+    True
+    """
+    namespaces = dict(_DECLARATION.findall(envelope))
+    match = _BODY.search(envelope)
+    body = match.group(1) if match else envelope
+    body = _PREFIX.sub(
+        lambda match: match.group(1) + b'{' + namespaces.get(
+            match.group(2), match.group(2)) + b'}',
+        body
+    )
+    return _hashlib.sha1(body).hexdigest()
+
+
+def _get_action(request):
+    """ Get the SOAP action of a request without quotes. """
+    action = request.headers.get('SOAPAction', b'')
+    if isinstance(action, bytes):
+        action = action.decode('utf-8')
+    return action.strip('"')
+
+
+def load(path):
+    """Load the exchanges of an archive in the order they were recorded.
+
+    :rtype: [dict]
+    """
+    with _gzip.open(path, 'rb') as archive:
+        return [_json.loads(line.decode('utf-8')) for line in archive]
+
+
+def summarize(exchanges):
+    """Count the calls and sum the latencies of exchanges per SOAP action.
+
+    >>> summarize([{'type': 'send', 'action': 'GetUser', 'latency': 0.5},
+    ...            {'type': 'open', 'url': 'wsdl', 'latency': 1.0}])
+    {'GetUser': (1, 0.5)}
+
+    :rtype: dict
+    :return:
+      Returned is a dict of call counts and total latencies in seconds
+      keyed on action.
+    """
+    summary = {}
+    for exchange in exchanges:
+        if exchange['type'] == 'send':
+            calls, latency = summary.get(exchange['action'], (0, 0.0))
+            summary[exchange['action']] = (calls + 1,
+                                           latency + exchange['latency'])
+    return summary
+
+
+class Recorder(object):
+    """Record the exchanges of transports created by `transport` and write
+    them to an archive when saved, e.g. on exit of a `with` block. Requests
+    are sent by a transport of `transport_cls`.
+    """
+
+    def __init__(self, path, transport_cls=_suds_https.HttpAuthenticated):
+        """
+        :type path: str
+        :param path:
+          Path of the gzipped JSON lines archive.
+
+        :type transport_cls: type
+        :param transport_cls:
+          Class of the suds transports sending the requests.
+        """
+        self.path = path
+        self.transport_cls = transport_cls
+        self.exchanges = []
+        self.calls = _collections.Counter()
+        self._lock = _threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.save()
+
+    def transport(self):
+        """ Create a recording suds transport for a service client. """
+        return _RecordingTransport(self)
+
+    def record(self, exchange):
+        """ Add an exchange, e.g. from a transport of another thread. """
+        with self._lock:
+            self.exchanges.append(exchange)
+            if exchange['type'] == 'send':
+                self.calls[exchange['action']] += 1
+
+    def save(self):
+        """ Atomically write the exchanges to the archive. """
+        with self._lock:
+            exchanges = list(self.exchanges)
+        with _utils.atomic_write(self.path, 'wb') as file:
+            with _gzip.GzipFile(fileobj=file, mode='wb') as archive:
+                for exchange in exchanges:
+                    archive.write(
+                        (_json.dumps(exchange, sort_keys=True) + '\n')
+                        .encode('utf-8')
+                    )
+
+
+class Replayer(object):
+    """Answer requests of transports created by `transport` from an
+    archive, after sleeping for the recorded latency times `latency_scale`.
+
+    Each request gets the next unused reply recorded for its action and
+    fingerprint, and once they are used up the last of them again. A request
+    that was not recorded, e.g. because a new version sends other fields,
+    gets the next reply of its action unless `strict`, and is counted in
+    `unmatched`. WSDLs and schemas are served as often as they are opened.
+    """
+
+    def __init__(self, path, latency_scale=1.0, strict=False):
+        """
+        :type path: str
+        :param path:
+          Path of an archive written by a `Recorder`.
+
+        :type latency_scale: float
+        :param latency_scale:
+          Factor of the recorded latencies, 0 to reply at once.
+
+        :type strict: bool
+        :param strict:
+          Whether to raise `ReplayError` for requests that were not
+          recorded.
+        """
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self.calls = _collections.Counter()
+        self.unmatched = _collections.Counter()
+        self._lock = _threading.Lock()
+        self._documents = {}
+        self._replies = _collections.defaultdict(list)
+        self._used = set()
+        for index, exchange in enumerate(load(path)):
+            exchange['index'] = index
+            if exchange['type'] == 'open':
+                self._documents[exchange['url']] = exchange
+            else:
+                self._replies[exchange['action'], exchange['key']].append(
+                    exchange)
+                self._replies[exchange['action'], None].append(exchange)
+
+    def transport(self):
+        """ Create a replaying suds transport for a service client. """
+        return _ReplayTransport(self)
+
+    def _next(self, exchanges):
+        """ Take the next unused exchange, or the last one. """
+        for exchange in exchanges:
+            if exchange['index'] not in self._used:
+                self._used.add(exchange['index'])
+                return exchange
+        return exchanges[-1]
+
+    def document(self, url):
+        """ Get the exchange of a WSDL or schema. """
+        if url not in self._documents:
+            raise ReplayError('No document of {url} was recorded.'.format(
+                url=url))
+        return self._documents[url]
+
+    def reply(self, action, key):
+        """ Get the exchange answering a request. """
+        with self._lock:
+            self.calls[action] += 1
+            exchanges = self._replies.get((action, key))
+            if exchanges is None:
+                self.unmatched[action] += 1
+                exchanges = self._replies.get((action, None))
+                if self.strict or exchanges is None:
+                    raise ReplayError(
+                        'No reply of {action} with fingerprint {key} was '
+                        'recorded.'.format(action=action, key=key))
+            return self._next(exchanges)
+
+    def wait(self, exchange):
+        """ Sleep for the scaled latency of an exchange. """
+        if self.latency_scale > 0:
+            _time.sleep(exchange['latency'] * self.latency_scale)
+
+
+class _RecordingTransport(_suds_transport.Transport):
+    """ Transport sending requests through another and recording them. """
+
+    def __init__(self, recorder):
+        """ Init. """
+        _suds_transport.Transport.__init__(self)
+        self.recorder = recorder
+        self.inner = recorder.transport_cls()
+        # Share the options, e.g. the timeout, with the inner transport.
+        self.inner.options = self.options
+
+    def open(self, request):
+        start = _time.time()
+        document = self.inner.open(request).read()
+        self.recorder.record(dict(
+            type='open', url=request.url, latency=_time.time() - start,
+            reply=document.decode('utf-8'),
+        ))
+        return _io.BytesIO(document)
+
+    def send(self, request):
+        start = _time.time()
+        exchange = dict(type='send', url=request.url,
+                        action=_get_action(request),
+                        key=fingerprint(request.message))
+        try:
+            reply = self.inner.send(request)
+        except _suds_transport.TransportError as error:
+            content = error.fp.read() if error.fp else b''
+            exchange.update(latency=_time.time() - start,
+                            status=error.httpcode, reason=str(error),
+                            reply=content.decode('utf-8'))
+            self.recorder.record(exchange)
+            raise _suds_transport.TransportError(
+                str(error), error.httpcode, _io.BytesIO(content))
+        exchange.update(latency=_time.time() - start, status=reply.code,
+                        reply=reply.message.decode('utf-8'))
+        self.recorder.record(exchange)
+        return reply
+
+
+class _ReplayTransport(_suds_transport.Transport):
+    """ Transport answering requests from a `Replayer`. """
+
+    def __init__(self, replayer):
+        """ Init. """
+        _suds_transport.Transport.__init__(self)
+        self.replayer = replayer
+
+    def open(self, request):
+        exchange = self.replayer.document(request.url)
+        self.replayer.wait(exchange)
+        return _io.BytesIO(exchange['reply'].encode('utf-8'))
+
+    def send(self, request):
+        exchange = self.replayer.reply(_get_action(request),
+                                       fingerprint(request.message))
+        self.replayer.wait(exchange)
+        content = exchange['reply'].encode('utf-8')
+        if 'reason' in exchange:
+            raise _suds_transport.TransportError(
+                exchange['reason'], exchange['status'], _io.BytesIO(content))
+        return _suds_transport.Reply(exchange['status'], {}, content)
+
+
+def main(argv=None):
+    """ Print the calls and latencies per action of archives. """
+    parser = _argparse.ArgumentParser(
+        description='Summarize recorded SOAP traffic.')
+    parser.add_argument('archives', nargs='+', help='recorded archives')
+    args = parser.parse_args(argv)
+    for path in args.archives:
+        print(path)
+        summary = summarize(load(path))
+        for action in sorted(summary):
+            calls, latency = summary[action]
+            print('  {action:<48}{calls:>8}{latency:>12.3f}'.format(
+                action=action, calls=calls, latency=latency))
+        print('  {total:<48}{calls:>8}{latency:>12.3f}'.format(
+            total='total',
+            calls=sum(calls for calls, _ in summary.values()),
+            latency=sum(latency for _, latency in summary.values())))
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,18 @@ def clean(ctx):
     )
 
 
+@_invoke.task
+def bench(ctx, runs=5):
+    """Measure the cold start of the package, the SOAP serializer and
+    hedged reads.
+    """
+    with ctx.shell.root_dir():
+        for name in ('cold_start', 'schema_cache', 'soap_serializer',
+                     'hedged_reads'):
+            ctx.run(ctx.c('python benchmarks/%s.py %s', name, runs),
+                    echo=True)
+
+
 @_invoke.task
 def deps(ctx):
     with ctx.shell.root_dir():
@@ -119,6 +131,7 @@ env = dict(
 namespace = _invoke.Collection()
 namespace.configure(env)
 
+namespace.add_task(bench)
 namespace.add_task(clean)
 namespace.add_task(deps)
 namespace.add_task(docs)
@@ -0,0 +1,50 @@
+""" Tests of the background refresh of OAuth tokens. """
+import gc
+
+from py_bingads import auth
+
+
+class OAuthTokens(object):
+    """ Stand-in of the OAuthTokens of the Bing Ads SDK. """
+
+    def __init__(self, access_token, access_token_expires_in_seconds,
+                 refresh_token):
+        self.access_token = access_token
+        self.access_token_expires_in_seconds = access_token_expires_in_seconds
+        self.refresh_token = refresh_token
+
+
+class Authentication(object):
+    """ Stand-in of an OAuth authentication of the Bing Ads SDK. """
+
+    def __init__(self):
+        self.oauth_tokens = OAuthTokens('a', 3600, 'r')
+
+
+def test_refresher_drops_tokens_of_collected_authentications():
+    refresher = auth.TokenRefresher()
+    authentication = Authentication()
+    refresher.register(authentication)
+    refresher.register(authentication)
+    key, = refresher._entries
+    assert key in auth._TOKENS
+
+    auth._refresh_lock(key)
+    del authentication
+    gc.collect()
+    assert refresher.refresh_due() == 0
+    assert not refresher._entries
+    assert key not in auth._TOKENS
+    assert key not in auth._REFRESH_LOCKS
+
+
+def test_refresher_never_reuses_own_keys():
+    refresher = auth.TokenRefresher()
+    keys = set()
+    for _ in range(3):
+        authentication = Authentication()
+        refresher.register(authentication)
+        keys.update(refresher._entries)
+        del authentication
+        gc.collect()
+    assert len(keys) == 3
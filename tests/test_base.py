@@ -0,0 +1,59 @@
+""" Tests of BingAds objects passed to other processes. """
+import pickle
+import threading
+import time
+
+import pytest
+
+KWARGS = dict(
+    account_id=1, customer_id=2, developer_token='token',
+    environment='sandbox', authentication_type='username', username='user',
+    password='password',
+)
+
+
+def test_pickle_keeps_subclass_kwargs():
+    pytest.importorskip('bingads')
+    from py_bingads.services import Bulk, Reporting
+
+    reporting = pickle.loads(pickle.dumps(
+        Reporting(poll_interval=1, workers=8, **KWARGS)))
+    assert (reporting.poll_interval, reporting.workers) == (1, 8)
+    bulk = pickle.loads(pickle.dumps(Bulk(poll_timeout=60, **KWARGS)))
+    assert bulk.poll_timeout == 60
+
+
+def test_reads_are_shared_by_instances_of_the_same_login():
+    pytest.importorskip('bingads')
+    from py_bingads.services import Campaigns
+
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def read():
+        calls.append(None)
+        started.set()
+        release.wait()
+        return 'response'
+
+    first = Campaigns(**KWARGS)
+    thread = threading.Thread(
+        target=first._read_once, args=('GetCampaignsByAccountId', read))
+    thread.start()
+    started.wait()
+    same_login = Campaigns(**KWARGS)
+    other_login = Campaigns(**dict(KWARGS, username='other'))
+    threads = [
+        threading.Thread(target=bing_ads._read_once,
+                         args=('GetCampaignsByAccountId', read))
+        for bing_ads in (same_login, other_login)
+    ]
+    for other in threads:
+        other.start()
+    while len(calls) < 2:
+        time.sleep(0.01)
+    release.set()
+    for other in [thread] + threads:
+        other.join()
+    assert len(calls) == 2
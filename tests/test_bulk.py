@@ -0,0 +1,106 @@
+""" Tests of reading bulk files from local stand-ins of result files. """
+import os
+import zipfile
+
+import pytest
+from six.moves.urllib.request import pathname2url
+
+from py_bingads import _utils
+from py_bingads import models
+
+ROWS = (
+    b'\xef\xbb\xbfType,Status,Id,Parent Id,Campaign,Keyword,Match Type,'
+    b'Sync Time\r\n'
+    b'Format Version,,,,,,,\r\n'
+    b'Account,,1,,,,,11/15/2017 21:29:41\r\n'
+    b'Campaign,Active,10,1,Shoes,,,\r\n'
+    b'Campaign Negative Keyword,Active,100,10,,free,Exact,\r\n'
+    b'Ad Group Negative Keyword,Deleted,101,20,,cheap,,\r\n'
+    b'Campaign Sitelink2 Ad Extension,Active,7,10,,,,\r\n'
+    b'Campaign Sitelink2 Ad Extension,Active,7,11,,,,\r\n'
+)
+
+
+@pytest.fixture
+def bulk_file_url(tmpdir):
+    """ URL of a zipped bulk file standing in for a download result. """
+    path = str(tmpdir.join('download.zip'))
+    with zipfile.ZipFile(path, 'w') as zip_file:
+        zip_file.writestr('download.csv', ROWS)
+    return 'file:' + pathname2url(path)
+
+
+def test_read_downloaded_bulk_file(bulk_file_url):
+    path = _utils.download_file(bulk_file_url)
+    try:
+        entities = list(models.read_bulk_file(path))
+    finally:
+        os.remove(path)
+
+    campaign, negative, deleted, first, second = entities
+    assert (campaign.id, campaign.name) == (10, 'Shoes')
+    assert (negative.parent_id, negative.match_type) == (10, 'Exact')
+    assert negative.to_bulk_row()['Type'] == 'Campaign Negative Keyword'
+    assert (deleted.parent_id, deleted.match_type) == (20, None)
+    assert deleted.shared_set_id is None
+    assert [(association.ad_extension.id, association.entity_id)
+            for association in (first, second)] == [(7, 10), (7, 11)]
+
+
+def test_mirror_keeps_associations_of_one_ad_extension(bulk_file_url):
+    path = _utils.download_file(bulk_file_url)
+    try:
+        with models.open_bulk_file(path) as stream:
+            mirror = models.AccountMirror(account_id=1)
+            mirror.apply(models.iter_bulk_rows(stream))
+    finally:
+        os.remove(path)
+
+    associations = mirror.get(models.AdExtensionAssociation)
+    assert [association.entity_id for association in associations] == [10, 11]
+    assert [keyword.id for keyword in mirror.get(models.NegativeKeyword)] \
+        == [100]
+
+
+def test_bulk_download_entities_from_url(bulk_file_url):
+    pytest.importorskip('bingads')
+    from py_bingads.services import Bulk
+
+    bulk = Bulk(
+        account_id=1, customer_id=2, developer_token='token',
+        environment='sandbox', authentication_type='username',
+        username='user', password='password',
+    )
+    entities = list(bulk.download_entities(url=bulk_file_url))
+    assert [type(entity).__name__ for entity in entities] == [
+        'Campaign', 'NegativeKeyword', 'NegativeKeyword',
+        'AdExtensionAssociation', 'AdExtensionAssociation',
+    ]
+
+
+def test_writer_maps_results_to_written_rows(tmpdir):
+    path = str(tmpdir.join('upload.csv'))
+    with models.BulkFileWriter(path, account_id=1) as writer:
+        writer.write(models.Campaign(id=10), status='Deleted')
+        writer.write(models.AdGroup(id=20, campaign_id=10), status='Deleted')
+        writer.write(models.NegativeKeyword(text='free', match_type='Exact'),
+                     parent_id=10)
+    with open(path, 'rb') as stream:
+        rows = list(models.iter_bulk_rows(stream))[1:]
+    assert [(row['Type'], row['Status'], row['Parent Id']) for row in rows] \
+        == [('Campaign', 'Deleted', '1'), ('Ad Group', 'Deleted', '10'),
+            ('Campaign Negative Keyword', 'Active', '10')]
+
+    result_path = str(tmpdir.join('result.csv'))
+    with open(result_path, 'wb') as stream:
+        stream.write(
+            b'Type,Id,Client Id,Error,Error Number\r\n'
+            b'Campaign,10,1,,\r\n'
+            b'Ad Group,20,2,AdGroupInvalid,1200\r\n'
+            b'Campaign Negative Keyword,100,3,,\r\n'
+        )
+    results = writer.read_results(result_path)
+    assert [(type(result.model).__name__, result.id, result.succeeded)
+            for result in results] == [
+                ('Campaign', 10, True), ('AdGroup', None, False),
+                ('NegativeKeyword', 100, True)]
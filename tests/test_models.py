@@ -0,0 +1,108 @@
+""" Tests of the Bing API objects created from models. """
+import pytest
+
+from py_bingads import models
+
+KWARGS = dict(
+    account_id=1, customer_id=2, developer_token='token',
+    environment='sandbox', authentication_type='username', username='user',
+    password='password',
+)
+
+
+class Element(object):
+    """ Stand-in of a suds object with Id, Name and Status. """
+
+    def __init__(self):
+        self.Id = self.Name = self.Status = 'unset'
+
+    def __iter__(self):
+        return iter([(name, getattr(self, name))
+                     for name in ('Id', 'Name', 'Status')])
+
+    def __setitem__(self, name, value):
+        setattr(self, name, value)
+
+
+class Array(object):
+    """ Stand-in of a suds array of campaigns or ad groups. """
+
+    def __init__(self):
+        self.Campaign = []
+        self.AdGroup = []
+
+
+class Service(object):
+    """Stand-in of a service with a factory of elements, whose updates
+    record the sent elements in `updates` and fail once `fail_after` of
+    them were sent.
+    """
+
+    def __init__(self, fail_after=None):
+        self.factory = self
+        self.updates = []
+        self.fail_after = fail_after
+
+    @staticmethod
+    def create(type_name):
+        if type_name.startswith('ArrayOf'):
+            return Array()
+        return Element()
+
+    def UpdateCampaigns(self, AccountId, Campaigns):
+        if len(self.updates) == self.fail_after:
+            raise RuntimeError('Update failed.')
+        self.updates.extend(Campaigns.Campaign)
+
+
+def test_adds_send_all_fields_and_updates_only_modified_ones():
+    for model in (models.Campaign(id=1, name='Shoes', status='Active'),
+                  models.AdGroup(id=1, name='Shoes', status='Active')):
+        model.mark_clean()
+        model.status = 'Paused'
+
+        obj = model.to_api_obj(Service())
+        assert (obj.Id, obj.Name, obj.Status) == (1, 'Shoes', 'Paused')
+        obj = model.to_api_obj(Service(), only_dirty=True)
+        assert (obj.Id, obj.Name, obj.Status) == (1, None, 'Paused')
+
+
+def test_new_models_send_all_fields_and_loaded_ones_only_edited_ones():
+    service = Service()
+    for model in (models.Campaign(id=1, name='Shoes', status='Active'),
+                  models.AdGroup(id=1, name='Shoes', status='Active')):
+        obj = model.to_api_obj(service, only_dirty=True)
+        assert (obj.Id, obj.Name, obj.Status) == (1, 'Shoes', 'Active')
+
+    for model_cls in (models.Campaign, models.AdGroup):
+        model = model_cls.from_api_obj(
+            model_cls(id=1, name='Shoes', status='Active')
+            .to_api_obj(service))
+        obj = model.to_api_obj(service, only_dirty=True)
+        assert (obj.Id, obj.Name, obj.Status) == (1, None, None)
+        model.name = 'Boots'
+        obj = model.to_api_obj(service, only_dirty=True)
+        assert (obj.Id, obj.Name, obj.Status) == (1, 'Boots', None)
+
+
+def test_campaigns_are_marked_clean_only_once_their_chunk_is_sent(
+        monkeypatch):
+    pytest.importorskip('bingads')
+    from py_bingads.services import Campaigns
+
+    campaigns = Campaigns(predicate_list_limit=1, **KWARGS)
+    service = Service(fail_after=1)
+    monkeypatch.setattr(campaigns, 'get_campaign_service', lambda: service,
+                        raising=False)
+    sent, failed = [
+        models.Campaign(id=index, name='Shoes').mark_clean()
+        for index in (1, 2)
+    ]
+    sent.status = failed.status = 'Paused'
+
+    with pytest.raises(RuntimeError):
+        campaigns.update_campaigns([sent, failed])
+    assert [(obj.Id, obj.Name, obj.Status) for obj in service.updates] == \
+        [(1, None, 'Paused')]
+    assert not sent.dirty_fields
+    assert failed.dirty_fields == {'status'}
@@ -0,0 +1,143 @@
+""" Tests of calls passing through the interceptors of services. """
+import os
+import time
+
+import pytest
+
+KWARGS = dict(
+    account_id=1, customer_id=2, developer_token='token',
+    environment='sandbox', authentication_type='username', username='user',
+    password='password',
+)
+
+REPLIES = {
+    'DeleteAdExtensions': b'<DeleteAdExtensionsResponse xmlns="https://'
+                          b'bingads.microsoft.com/CampaignManagement/v11"/>',
+    'GetAdGroupsByCampaignId': b'<GetAdGroupsByCampaignIdResponse xmlns="'
+                               b'https://bingads.microsoft.com/'
+                               b'CampaignManagement/v11"><AdGroups/>'
+                               b'</GetAdGroupsByCampaignIdResponse>',
+}
+
+
+@pytest.fixture
+def transport_cls():
+    """Class of stub transports answering `REPLIES`, which record the socket
+    timeouts they are sent with in `timeouts` and sleep for `latencies`.
+    """
+    pytest.importorskip('bingads')
+    import suds.transport
+    from bingads import service_client
+
+    wsdl = os.path.join(os.path.dirname(service_client.__file__), 'v11',
+                        'proxies', 'campaign_management_service.xml')
+
+    class StubTransport(suds.transport.Transport):
+        """ Transport without network access. """
+        timeouts = []
+        latencies = []
+
+        def open(self, request):
+            return open(wsdl, 'rb')
+
+        def send(self, request):
+            self.timeouts.append(self.options.timeout)
+            if self.latencies:
+                time.sleep(self.latencies.pop(0))
+            action = request.headers['SOAPAction'].strip(b'"').decode()
+            return suds.transport.Reply(200, {}, (
+                b'<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/'
+                b'envelope/"><s:Body>' + REPLIES[action] +
+                b'</s:Body></s:Envelope>'
+            ))
+
+    return StubTransport
+
+
+def test_calls_get_the_time_left_in_their_deadline(transport_cls):
+    from py_bingads import soap
+    from py_bingads.services import AdGroups
+
+    ad_groups = AdGroups(transport_factory=transport_cls, timeout=30,
+                         **KWARGS)
+    service = ad_groups.campaign_service
+    with ad_groups.deadline(5):
+        service.GetAdGroupsByCampaignId(CampaignId=1)
+        soap.call(service, 'DeleteAdExtensions', account_id=1,
+                  ad_extension_ids=[1])
+    service.GetAdGroupsByCampaignId(CampaignId=1)
+    in_deadline, direct, outside = transport_cls.timeouts
+    assert 0 < in_deadline <= 5 and 0 < direct <= 5
+    assert outside == 30
+
+
+def test_duplicates_are_charged(transport_cls):
+    from py_bingads import budget, hedging
+    from py_bingads.services import AdGroups
+
+    call_budget = budget.CallBudget()
+    ad_groups = AdGroups(
+        transport_factory=transport_cls, call_budget=call_budget,
+        hedging=hedging.Hedging(min_samples=1, max_fraction=1), **KWARGS)
+    ad_groups.campaign_service.GetAdGroupsByCampaignId(CampaignId=1)
+    transport_cls.latencies[:] = [0.5]
+    ad_groups.campaign_service.GetAdGroupsByCampaignId(CampaignId=1)
+    assert ad_groups.hedging.hedges == 1
+    assert call_budget.usage(1, 'GetAdGroupsByCampaignId') == 3
+
+
+def test_hedged_calls_end_when_their_scope_is_cancelled(transport_cls):
+    import threading
+    from py_bingads import deadline, hedging
+    from py_bingads.services import AdGroups
+
+    ad_groups = AdGroups(
+        transport_factory=transport_cls,
+        hedging=hedging.Hedging(min_samples=1, max_fraction=0), **KWARGS)
+    ad_groups.campaign_service.GetAdGroupsByCampaignId(CampaignId=1)
+    transport_cls.latencies[:] = [5]
+    with deadline.scope() as scope:
+        threading.Timer(0.05, scope.cancel, args=('Abandoned.',)).start()
+        start = time.time()
+        with pytest.raises(deadline.Cancelled):
+            ad_groups.campaign_service.GetAdGroupsByCampaignId(CampaignId=1)
+        assert time.time() - start < 1
+    ad_groups.campaign_service.GetAdGroupsByCampaignId(CampaignId=1)
+
+
+def test_dry_runs_plan_the_associations_of_added_ad_extensions(
+        transport_cls, monkeypatch):
+    from py_bingads import models
+    from py_bingads.services import Callouts, Sitelinks
+
+    campaigns = [models.Campaign(id=index) for index in (1, 2, 3)]
+    callouts = Callouts(transport_factory=transport_cls, dry_run=True,
+                        **KWARGS)
+    monkeypatch.setattr(callouts, 'get_campaigns', lambda: campaigns)
+    monkeypatch.setattr(callouts, 'get_callouts', lambda: [])
+    callouts.update_callouts([models.CalloutAdExtension(text=text)
+                              for text in ('Free shipping', 'Open 24/7')])
+    assert callouts.plan.report().splitlines() == [
+        'account 1: CampaignManagementService.AddAdExtensions 1 calls, '
+        '2 items',
+        'account 1: CampaignManagementService.SetAdExtensionsAssociations '
+        '1 calls, 6 items',
+    ]
+
+    sitelinks = Sitelinks(check_sitelink_migration_status=False,
+                          transport_factory=transport_cls, dry_run=True,
+                          **KWARGS)
+    monkeypatch.setattr(sitelinks, 'get_all_sitelinks', lambda: [])
+    shoes, boots = [
+        models.Sitelink2AdExtension(display_text=text,
+                                    final_url='https://example.com')
+        for text in ('Shoes', 'Boots')
+    ]
+    sitelinks.sync_sitelinks({1: [shoes, boots], 2: [shoes]})
+    assert sitelinks.plan.report().splitlines() == [
+        'account 1: CampaignManagementService.AddAdExtensions 1 calls, '
+        '2 items',
+        'account 1: CampaignManagementService.SetAdExtensionsAssociations '
+        '1 calls, 3 items',
+    ]
+    assert sorted([shoes.id, boots.id]) == [-2, -1]
@@ -0,0 +1,110 @@
+""" Tests of reports served by a local file server stand-in. """
+import threading
+import time
+
+import pytest
+from six.moves import BaseHTTPServer, SimpleHTTPServer
+
+from py_bingads.services.reporting import Reporting
+
+REPORT = (
+    b'\xef\xbb\xbf"Report Name: Campaigns"\r\n'
+    b'"Rows: 2"\r\n'
+    b'\r\n'
+    b'"CampaignId","CampaignName","Clicks","Spend"\r\n'
+    b'"10","Shoes","1,024","12.50"\r\n'
+    b'"11","Boots","3",""\r\n'
+    b'\r\n'
+    b'"\xc2\xa92017 Microsoft Corporation. All rights reserved. "\r\n'
+)
+
+
+class QuietHandler(SimpleHTTPServer.SimpleHTTPRequestHandler):
+    """ Serve files of the current directory without logging requests. """
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def report_server(tmpdir):
+    """ URL of a local HTTP server serving a report file. """
+    tmpdir.join('report.csv').write_binary(REPORT)
+    with tmpdir.as_cwd():
+        server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), QuietHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            yield 'http://127.0.0.1:{port}/report.csv'.format(
+                port=server.server_address[1])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_download_report(report_server):
+    report = Reporting.download_report(report_server)
+    assert report == {
+        'CampaignId': [10, 11],
+        'CampaignName': ['Shoes', 'Boots'],
+        'Clicks': [1024, 3],
+        'Spend': [12.5, None],
+    }
+    assert Reporting.download_report(None) == {}
+
+
+class Status(object):
+    """ Status of a report request. """
+
+    def __init__(self, status, url=None):
+        self.Status = status
+        self.ReportDownloadUrl = url
+
+
+class FakeReportingService(object):
+    """ Reporting service generating each report after a number of polls. """
+
+    def __init__(self, url, polls=2, latency=0.1):
+        self.url = url
+        self.polls = polls
+        self.latency = latency
+        self.counts = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def SubmitGenerateReport(self, report_request):
+        return 'request-{0}'.format(report_request)
+
+    def PollGenerateReport(self, ReportRequestId):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            count = self.counts[ReportRequestId] = \
+                self.counts.get(ReportRequestId, 0) + 1
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        if count < self.polls:
+            return Status('Pending')
+        return Status('Success', self.url)
+
+
+def test_get_reports_polls_concurrently(report_server, monkeypatch):
+    pytest.importorskip('bingads')
+    reporting = Reporting(
+        poll_interval=0, workers=4, account_id=1, customer_id=2,
+        developer_token='token', environment='sandbox',
+        authentication_type='username', username='user', password='password',
+    )
+    service = FakeReportingService(report_server)
+    monkeypatch.setattr(reporting, 'get_reporting_service', lambda: service,
+                        raising=False)
+
+    reports = reporting.get_reports(range(4))
+    assert [report['CampaignId'] for report in reports] == [[10, 11]] * 4
+    assert service.counts == {
+        'request-{0}'.format(index): 2 for index in range(4)
+    }
+    assert service.max_in_flight > 1
@@ -0,0 +1,177 @@
+""" Tests of batching changes of entities in sessions. """
+import os
+
+import pytest
+
+from py_bingads import models
+
+KWARGS = dict(
+    account_id=1, customer_id=2, developer_token='token',
+    environment='sandbox', authentication_type='username', username='user',
+    password='password',
+)
+
+
+class Response(object):
+    """ Stand-in of a suds response. """
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class Service(object):
+    """Stand-in of the Campaign Management service with the factory of a
+    real client, which records the operations and arguments of the calls it
+    is sent in `calls`, and fails calls of an operation once as many were
+    sent as `fail_after` has for it.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.calls = []
+        self.fail_after = {}
+        self.last_id = 100
+
+    def new_ids(self, count):
+        """ Get IDs of added entities. """
+        self.last_id += count
+        return list(range(self.last_id - count + 1, self.last_id + 1))
+
+    def __getattr__(self, operation):
+        def call(**kwargs):
+            if self.fail_after.get(operation) == \
+                    operations(self).count(operation):
+                raise RuntimeError('{0} failed.'.format(operation))
+            self.calls.append((operation, kwargs))
+            if operation == 'AddCampaigns':
+                ids = self.new_ids(len(kwargs['Campaigns'].Campaign))
+                return Response(CampaignIds=Response(long=ids))
+            if operation == 'AddAdGroups':
+                ids = self.new_ids(len(kwargs['AdGroups'].AdGroup))
+                return Response(AdGroupIds=Response(long=ids))
+            if operation == 'AddAdExtensions':
+                ids = self.new_ids(len(kwargs['AdExtensions'].AdExtension))
+                return Response(AdExtensionIdentities=Response(
+                    AdExtensionIdentity=[Response(Id=id_) for id_ in ids]))
+            return None
+        return call
+
+
+@pytest.fixture
+def campaigns(monkeypatch):
+    """ Campaigns with a stand-in service, which is `campaigns.service`. """
+    pytest.importorskip('bingads')
+    import suds.transport
+    from bingads import service_client
+    from py_bingads.services import Campaigns
+
+    wsdl = os.path.join(os.path.dirname(service_client.__file__), 'v11',
+                        'proxies', 'campaign_management_service.xml')
+
+    class StubTransport(suds.transport.Transport):
+        """ Transport only serving the WSDL. """
+
+        def open(self, request):
+            return open(wsdl, 'rb')
+
+    campaigns = Campaigns(transport_factory=StubTransport,
+                          predicate_list_limit=2, **KWARGS)
+    campaigns.service = Service(campaigns.campaign_service.factory)
+    monkeypatch.setattr(campaigns, 'get_campaign_service',
+                        lambda: campaigns.service, raising=False)
+    return campaigns
+
+
+def operations(service):
+    """ Get the operations of the calls sent to a service in order. """
+    return [operation for operation, _ in service.calls]
+
+
+def test_changes_are_coalesced_per_entity_and_parent(campaigns):
+    paused, deleted, unmodified = [
+        models.Campaign(id=index, status='Active').mark_clean()
+        for index in (1, 2, 3)
+    ]
+    ad_groups = [
+        models.AdGroup(id=index, campaign_id=campaign_id).mark_clean()
+        for index, campaign_id in ((11, 1), (12, 1), (13, 1), (21, 2))
+    ]
+    with campaigns.session(workers=1) as session:
+        for campaign in (paused, deleted, unmodified):
+            session.update(campaign)
+        paused.status = 'Paused'
+        session.update(paused)
+        deleted.status = 'Paused'
+        session.delete(deleted)
+        for ad_group in ad_groups:
+            ad_group.status = 'Paused'
+            session.update(ad_group)
+        assert len(session) == 7
+
+    assert operations(campaigns.service) == [
+        'UpdateCampaigns', 'UpdateAdGroups', 'UpdateAdGroups',
+        'UpdateAdGroups', 'DeleteCampaigns',
+    ]
+    (_, update), = [call for call in campaigns.service.calls
+                    if call[0] == 'UpdateCampaigns']
+    assert [(campaign.Id, campaign.Status)
+            for campaign in update['Campaigns'].Campaign] == [(1, 'Paused')]
+    assert [
+        (kwargs['CampaignId'],
+         [ad_group.Id for ad_group in kwargs['AdGroups'].AdGroup])
+        for operation, kwargs in campaigns.service.calls
+        if operation == 'UpdateAdGroups'
+    ] == [(1, [11, 12]), (1, [13]), (2, [21])]
+    assert not len(session)
+
+
+def test_phases_use_the_ids_of_entities_added_before(campaigns):
+    campaign = models.Campaign(name='Shoes')
+    ad_group = models.AdGroup(name='Boots')
+    callout = models.CalloutAdExtension(text='Free shipping')
+    with campaigns.session() as session:
+        session.delete(models.Campaign(id=1))
+        session.associate(callout, campaign)
+        session.add(ad_group, parent=campaign)
+        session.add(callout)
+        session.add(campaign)
+
+    assert operations(campaigns.service)[0] == 'AddCampaigns'
+    assert sorted(operations(campaigns.service)[1:3]) == \
+        ['AddAdExtensions', 'AddAdGroups']
+    assert operations(campaigns.service)[3:] == \
+        ['SetAdExtensionsAssociations', 'DeleteCampaigns']
+    assert ad_group.campaign_id == campaign.id
+    _, associate = campaigns.service.calls[3]
+    association, = associate['AdExtensionIdToEntityIdAssociations'] \
+        .AdExtensionIdToEntityIdAssociation
+    assert (association.AdExtensionId, association.EntityId) == \
+        (callout.id, campaign.id)
+
+
+def test_changes_stay_pending_until_they_are_sent(campaigns):
+    updated = [
+        models.Campaign(id=index, status='Active').mark_clean()
+        for index in (1, 2, 3)
+    ]
+    session = campaigns.session(workers=1)
+    for campaign in updated:
+        campaign.status = 'Paused'
+        session.update(campaign)
+    session.delete(models.Campaign(id=4))
+    campaigns.service.fail_after['UpdateCampaigns'] = 1
+
+    with pytest.raises(RuntimeError):
+        session.flush()
+    assert operations(campaigns.service) == ['UpdateCampaigns']
+    assert len(session) == 2
+    assert [bool(campaign.dirty_fields) for campaign in updated] == \
+        [False, False, True]
+
+    campaigns.service.fail_after.clear()
+    assert session.flush() == 2
+    assert operations(campaigns.service) == \
+        ['UpdateCampaigns', 'UpdateCampaigns', 'DeleteCampaigns']
+    (_, update), = campaigns.service.calls[1:2]
+    assert [campaign.Id for campaign in update['Campaigns'].Campaign] == [3]
+    assert not len(session)
@@ -0,0 +1,216 @@
+""" Tests of the directly rendered SOAP envelopes. """
+import functools
+import io
+import os
+import re
+
+import pytest
+
+from py_bingads import models
+
+KWARGS = dict(
+    account_id=1, customer_id=2, developer_token='token',
+    environment='sandbox', authentication_type='username', username='user',
+    password='password',
+)
+
+# Canonical prefixes of the namespaces suds numbers in hash order.
+PREFIXES = {
+    'http://schemas.xmlsoap.org/soap/envelope/': 'ns0',
+    'https://bingads.microsoft.com/CampaignManagement/v11': 'ns1',
+    'http://schemas.microsoft.com/2003/10/Serialization/Arrays': 'ns2',
+}
+_ENVELOPE = re.compile(r'<SOAP-ENV:Envelope((?: xmlns:[\w-]+="[^"]*")*)>')
+_DECLARATION = re.compile(r' xmlns:([\w-]+)="([^"]*)"')
+_PREFIX = re.compile(r'\b(ns\d+):')
+
+RESPONSE = (
+    b'<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">'
+    b'<s:Body><DeleteAdExtensionsResponse xmlns="https://bingads.microsoft.'
+    b'com/CampaignManagement/v11"/></s:Body></s:Envelope>'
+)
+EXPIRED_TOKEN_FAULT = (
+    b'<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">'
+    b'<s:Body><s:Fault><faultcode>s:Server</faultcode>'
+    b'<faultstring>Invalid client data.</faultstring><detail>'
+    b'<AdApiFaultDetail xmlns="https://adapi.microsoft.com"><Errors>'
+    b'<AdApiError><Code>109</Code><ErrorCode>AuthenticationTokenExpired'
+    b'</ErrorCode><Message>Expired.</Message></AdApiError></Errors>'
+    b'</AdApiFaultDetail></detail></s:Fault></s:Body></s:Envelope>'
+)
+
+
+def normalize(envelope):
+    """Rename the numbered namespace prefixes to `PREFIXES`, and reorder
+    their declarations, which suds numbers in hash order, accordingly.
+    Anything else is left as is.
+    """
+    text = envelope.decode('utf-8')
+    match = _ENVELOPE.search(text)
+    declarations = _DECLARATION.findall(match.group(1))
+    renamed = {
+        prefix: PREFIXES[uri] for prefix, uri in declarations
+        if _PREFIX.match(prefix + ':')
+    }
+    numbered = iter(sorted(
+        (renamed[prefix], uri) for prefix, uri in declarations
+        if prefix in renamed
+    ))
+    text = text[:match.start(1)] + ''.join(
+        ' xmlns:{0}="{1}"'.format(
+            *(next(numbered) if prefix in renamed else (prefix, uri)))
+        for prefix, uri in declarations
+    ) + text[match.end(1):]
+    return _PREFIX.sub(lambda match: renamed[match.group(1)] + ':', text)
+
+
+def requests(service):
+    """Yield operations with the arguments of suds and of the renderer."""
+    negative_keywords = [
+        models.NegativeKeyword(
+            id=index if index % 2 else None, match_type='exact',
+            text=u'caf\xe9 & <b> &amp; "{0}"'.format(index),
+        )
+        for index in range(3)
+    ]
+    shared_list = models.NegativeKeywordList(id=5, name="Brand's")
+    shared_entity_associations = [
+        models.SharedEntityAssociation(
+            entity_id=index, entity_type='Campaign', shared_entity_id=5,
+            shared_entity_type='NegativeKeywordList',
+        )
+        for index in range(3)
+    ] + [models.SharedEntityAssociation(entity_id=1)]
+    ad_extension_associations = [
+        models.AdExtensionIdToEntityIdAssociation(
+            ad_extension_id=index, entity_id=index + 1,
+        )
+        for index in range(3)
+    ]
+    ids = [1, 2, 3]
+    yield 'AddListItemsToSharedList', dict(
+        SharedList=shared_list.to_api_obj(service),
+        ListItems=models.ArrayOfNegativeKeyword(
+            negative_keywords=negative_keywords).to_api_obj(service),
+    ), dict(shared_list=shared_list, list_items=negative_keywords)
+    yield 'DeleteListItemsFromSharedList', dict(
+        SharedList=shared_list.to_api_obj(service),
+        ListItemIds=dict(long=ids),
+    ), dict(shared_list=shared_list, list_item_ids=ids)
+    for operation in ('SetSharedEntityAssociations',
+                      'DeleteSharedEntityAssociations'):
+        yield operation, dict(
+            Associations=models.ArrayOfSharedEntityAssociation(
+                shared_entity_associations=shared_entity_associations
+            ).to_api_obj(service),
+        ), dict(associations=shared_entity_associations)
+    yield 'SetAdExtensionsAssociations', dict(
+        AccountId=1,
+        AdExtensionIdToEntityIdAssociations=(
+            models.ArrayOfAdExtensionIdToEntityIdAssociation(
+                ad_extension_associations).to_api_obj(service)
+        ),
+        AssociationType='Campaign',
+    ), dict(account_id=1, associations=ad_extension_associations,
+            association_type='Campaign')
+    yield 'DeleteAdExtensions', dict(
+        AccountId=1,
+        AdExtensionIds=models.ArrayOflong(longs=ids).to_api_obj(),
+    ), dict(account_id=1, ad_extension_ids=ids)
+
+
+@pytest.fixture
+def replies(monkeypatch):
+    """Replies of a stub transport of all service clients, which records
+    the requests it is sent in `replies.sent`.
+    """
+    pytest.importorskip('bingads')
+    import suds.transport
+    from bingads import service_client
+
+    wsdl = os.path.join(os.path.dirname(service_client.__file__), 'v11',
+                        'proxies', 'campaign_management_service.xml')
+
+    class Replies(list):
+        """ Replies to send in order, the last one repeatedly. """
+        sent = []
+
+    replies = Replies([RESPONSE])
+
+    class StubTransport(suds.transport.Transport):
+        """ Transport without network access. """
+
+        def open(self, request):
+            return open(wsdl, 'rb')
+
+        def send(self, request):
+            replies.sent.append(request)
+            reply = replies.pop(0) if len(replies) > 1 else replies[0]
+            if reply == EXPIRED_TOKEN_FAULT:
+                raise suds.transport.TransportError(
+                    'Internal Server Error', 500, io.BytesIO(reply))
+            return suds.transport.Reply(200, {}, reply)
+
+    monkeypatch.setattr(service_client, 'Client', functools.partial(
+        service_client.Client, transport=StubTransport()))
+    return replies
+
+
+def test_envelopes_are_those_of_suds(replies):
+    from py_bingads import soap
+    from py_bingads.services import Campaigns
+
+    service = Campaigns(**KWARGS).campaign_service.service
+    service.set_options(nosend=True)
+    operations = set()
+    for operation, suds_kwargs, soap_kwargs in requests(service):
+        envelope = soap.render(
+            operation, service.soap_client.options.soapheaders,
+            **soap_kwargs)
+        assert normalize(envelope) == envelope.decode('utf-8')
+        suds_envelope = getattr(service, operation)(**suds_kwargs).envelope
+        assert normalize(suds_envelope) == envelope.decode('utf-8')
+        operations.add(operation)
+    assert operations == set(soap.RENDERERS)
+    assert not replies.sent
+
+
+class OAuthTokens(object):
+    """ Stand-in of the OAuthTokens of the Bing Ads SDK. """
+
+    def __init__(self, access_token):
+        self.access_token = access_token
+        self.refresh_token = 'refresh'
+
+
+class Authentication(object):
+    """ Stand-in of an OAuth authentication of the Bing Ads SDK. """
+
+    def __init__(self):
+        self.oauth_tokens = OAuthTokens('expired')
+        self.refreshes = 0
+
+    def enrich_headers(self, headers):
+        headers['AuthenticationToken'] = self.oauth_tokens.access_token
+
+    def request_oauth_tokens_by_refresh_token(self, refresh_token):
+        assert refresh_token == 'refresh'
+        self.refreshes += 1
+        self.oauth_tokens = OAuthTokens('fresh')
+
+
+def test_call_is_sent_again_after_refreshing_tokens(replies):
+    from py_bingads import soap
+    from py_bingads.services import Campaigns
+
+    service = Campaigns(**KWARGS).campaign_service.service
+    authentication = Authentication()
+    service.authorization_data.authentication = authentication
+    replies[:] = [EXPIRED_TOKEN_FAULT, RESPONSE]
+
+    soap.call(service, 'DeleteAdExtensions', account_id=1,
+              ad_extension_ids=[1])
+    assert authentication.refreshes == 1
+    expired, fresh = [request.message for request in replies.sent]
+    assert b'>expired</' in expired and b'>fresh</' in fresh
+    assert expired.replace(b'>expired</', b'>fresh</') == fresh
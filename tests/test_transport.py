@@ -0,0 +1,57 @@
+""" Tests of recording and replaying SOAP traffic. """
+import os
+
+import pytest
+
+KWARGS = dict(
+    account_id=1, customer_id=2, developer_token='token',
+    environment='sandbox', authentication_type='username', username='user',
+    password='password',
+)
+
+# Reply of GetCampaignsByAccountId without campaigns.
+RESPONSE = (
+    b'<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">'
+    b'<s:Body><GetCampaignsByAccountIdResponse xmlns="https://bingads.'
+    b'microsoft.com/CampaignManagement/v11"><Campaigns/>'
+    b'</GetCampaignsByAccountIdResponse></s:Body></s:Envelope>'
+)
+
+
+def get_campaigns(transport_factory):
+    """ Get the campaigns of the account with transports of a factory. """
+    from py_bingads.services import Campaigns
+
+    campaigns = Campaigns(transport_factory=transport_factory, **KWARGS)
+    return campaigns.campaign_service.GetCampaignsByAccountId(AccountId=1)
+
+
+def test_every_recording_has_the_wsdl_and_replays(tmpdir):
+    pytest.importorskip('bingads')
+    import suds.transport
+    from bingads import service_client
+    from py_bingads import transport
+
+    wsdl = os.path.join(os.path.dirname(service_client.__file__), 'v11',
+                        'proxies', 'campaign_management_service.xml')
+
+    class StubTransport(suds.transport.Transport):
+        """ Transport without network access. """
+
+        def open(self, request):
+            return open(wsdl, 'rb')
+
+        def send(self, request):
+            return suds.transport.Reply(200, {}, RESPONSE)
+
+    for name in ('first', 'second'):
+        path = str(tmpdir.join(name + '.jsonl.gz'))
+        with transport.Recorder(path, transport_cls=StubTransport) as recorder:
+            get_campaigns(recorder.transport)
+        assert sorted(set(
+            exchange['type'] for exchange in transport.load(path))) == \
+            ['open', 'send']
+
+    replayer = transport.Replayer(path, latency_scale=0, strict=True)
+    get_campaigns(replayer.transport)
+    assert replayer.calls == {'GetCampaignsByAccountId': 1}
@@ -0,0 +1,126 @@
+""" Tests of calls shared by threads and of deadlines. """
+import io
+import threading
+import time
+
+import pytest
+
+from py_bingads import _utils, budget, deadline, rate_limit
+
+
+def lead(flights, func):
+    """ Start a call in a thread and wait until it is in flight. """
+    started = threading.Event()
+    release = threading.Event()
+
+    def call():
+        started.set()
+        release.wait()
+        return func()
+
+    def run():
+        try:
+            flights.do('key', call)
+        except KeyError:
+            pass
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    started.wait()
+    return release
+
+
+def test_waiting_call_raises_when_its_scope_is_cancelled():
+    flights = _utils.SingleFlight()
+    release = lead(flights, lambda: 'response')
+    with deadline.scope() as outer:
+        with deadline.scope(60):
+            threading.Timer(0.05, outer.cancel, args=('Abandoned.',)).start()
+            with pytest.raises(deadline.Cancelled):
+                flights.do('key', lambda: 'response')
+    with deadline.scope(0.05):
+        with pytest.raises(deadline.DeadlineExceeded):
+            flights.do('key', lambda: 'response')
+    release.set()
+
+
+def test_waiting_calls_raise_copies_of_the_error():
+    flights = _utils.SingleFlight()
+    error = KeyError('id')
+
+    def fail():
+        raise error
+
+    release = lead(flights, fail)
+    errors = []
+
+    def wait():
+        try:
+            flights.do('key', fail)
+        except KeyError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=wait) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    while len(flights._flights['key'].waiters) < 2:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert [exc.args for exc in errors] == [('id',)] * 2
+    assert len(set(map(id, errors + [error]))) == 3
+
+
+def test_sleep_wakes_when_an_enclosing_scope_is_cancelled():
+    with deadline.scope() as outer:
+        with deadline.scope(60):
+            threading.Timer(0.05, outer.cancel, args=('Abandoned.',)).start()
+            start = time.time()
+            with pytest.raises(deadline.Cancelled):
+                deadline.sleep(30)
+            assert time.time() - start < 5
+
+
+def test_waits_for_budget_and_tokens_end_when_their_scope_is_cancelled(
+        tmpdir):
+    call_budget = budget.CallBudget(limit=1, window=3600, wait=True)
+    limiter = rate_limit.RateLimiter(str(tmpdir), rates={
+        rate_limit.READ: rate_limit.Rate(per_second=0.001, burst=1),
+    })
+    call_budget.charge(1, 'GetCampaignsByAccountId')
+    limiter.acquire('token', rate_limit.READ)
+    for wait in (
+            lambda: call_budget.charge(1, 'GetCampaignsByAccountId'),
+            lambda: limiter.acquire('token', rate_limit.READ)):
+        with deadline.scope() as outer:
+            threading.Timer(0.05, outer.cancel, args=('Abandoned.',)).start()
+            start = time.time()
+            with pytest.raises(deadline.Cancelled):
+                wait()
+            assert time.time() - start < 5
+
+
+def test_downloads_time_out_with_their_scope(monkeypatch, tmpdir):
+    timeouts = []
+
+    class Request(object):
+        """ Stand-in of `urllib.request` recording socket timeouts. """
+
+        @staticmethod
+        def urlopen(url, **kwargs):
+            timeouts.append(kwargs.get('timeout'))
+            return io.BytesIO(b'file')
+
+    monkeypatch.setattr(_utils, '_urllib_request', Request)
+    path = str(tmpdir.join('file'))
+    _utils.download_file('http://localhost/file', path=path)
+    _utils.download_file('http://localhost/file', path=path, timeout=30)
+    with deadline.scope(5) as scope:
+        _utils.download_file('http://localhost/file', path=path, timeout=30)
+        scope.cancel()
+        with pytest.raises(deadline.Cancelled):
+            _utils.download_file('http://localhost/file', path=path)
+    assert timeouts[:2] == [None, 30]
+    assert 0 < timeouts[2] <= 5 and len(timeouts) == 3